@@ -0,0 +1,110 @@
+"""
+Regenerates the parser benchmark corpus.
+
+The files are committed so every run measures exactly the same input; this
+script only exists to document how they were built and to rebuild them
+deterministically (fixed seed) if the corpus needs to change.
+
+Usage:
+    python benchmarks/corpus/generate.py
+"""
+
+import gzip
+import random
+from pathlib import Path
+
+CORPUS_DIR = Path(__file__).resolve().parent
+SEED = 42
+
+
+def tiny_page() -> str:
+    return (
+        "<!DOCTYPE html><html lang='en'><head><meta charset='utf-8'>"
+        "<title>Tiny</title>"
+        '<meta name="robots" content="index, follow">'
+        '<meta name="description" content="A tiny page.">'
+        "</head><body><h1>Tiny</h1></body></html>"
+    )
+
+
+def malformed_page() -> str:
+    """A page with the kind of broken markup found on real sites."""
+    return (
+        "<html><head><title>Broken <b>title</title>"
+        '<meta name=robots content="noindex, nofollow">'
+        "<meta name='description' content='Unclosed quote>"
+        '<meta name="viewport" content="width=device-width">'
+        "<script>if (a < b && c > d) { document.write('<div>'); }</script>"
+        "<style>p { color: red; </style>"
+        "</head><body><div><p>Unclosed paragraph<div><span>Nested"
+        "<table><tr><td>cell<td>cell</table>"
+        "<p>Stray &amp entity &copy &#xZZ; <img src=x alt='a\"b'>"
+        "</body>"
+    )
+
+
+def spa_shell(rng: random.Random, target_size: int = 2_000_000) -> str:
+    """A 2 MB single-page-app shell: a small head and a huge inline bundle."""
+    words = ["state", "props", "render", "dispatch", "effect", "memo", "ref", "ctx"]
+    names = [
+        "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(8))
+        for _ in range(2000)
+    ]
+    chunks = []
+    size = 0
+    while size < target_size:
+        name = rng.choice(names)
+        chunk = (
+            f"function {name}({rng.choice(words)}){{return "
+            f"{rng.choice(words)}.{rng.choice(words)}({rng.randint(0, 99999)})}};"
+        )
+        chunks.append(chunk)
+        size += len(chunk)
+    bundle = "".join(chunks)
+    return (
+        "<!DOCTYPE html><html><head><meta charset='utf-8'><title>App</title>"
+        '<meta name="robots" content="index, follow">'
+        '<meta name="description" content="A single page application shell.">'
+        '<meta name="viewport" content="width=device-width, initial-scale=1">'
+        f"<script>{bundle}</script></head>"
+        '<body><div id="root"></div><noscript>Enable JavaScript</noscript></body></html>'
+    )
+
+
+def large_sitemap(rng: random.Random, count: int = 50_000) -> str:
+    sections = ["blog", "products", "category", "help", "news", "pt-br/blog"]
+    vocabulary = [
+        "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(3, 9)))
+        for _ in range(300)
+    ]
+    entries = []
+    for n in range(count):
+        slug = "-".join(vocabulary[(n * step) % len(vocabulary)] for step in (7, 31, 97))
+        entries.append(
+            f"<url><loc>https://www.example.com/{sections[n % len(sections)]}/{slug}-{n}</loc>"
+            f"<lastmod>2025-{n % 12 + 1:02d}-{n % 28 + 1:02d}</lastmod>"
+            f"<changefreq>weekly</changefreq><priority>0.{n % 9 + 1}</priority></url>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+        + "\n".join(entries)
+        + "\n</urlset>\n"
+    )
+
+
+def main():
+    rng = random.Random(SEED)
+    (CORPUS_DIR / "tiny.html").write_text(tiny_page(), encoding="utf-8")
+    (CORPUS_DIR / "malformed.html").write_text(malformed_page(), encoding="utf-8")
+    (CORPUS_DIR / "spa_shell_2mb.html.gz").write_bytes(
+        gzip.compress(spa_shell(rng).encode(), mtime=0)
+    )
+    (CORPUS_DIR / "sitemap_50k.xml.gz").write_bytes(
+        gzip.compress(large_sitemap(rng).encode(), mtime=0)
+    )
+    print(f"Corpus written to {CORPUS_DIR}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+End-to-end throughput benchmark for the three commands.
+
+Starts the synthetic server, writes an input workbook for each size, runs
+each command as a separate process (exactly like a user would) and records
+throughput, latency percentiles, peak RSS and CPU time as JSON.
+
+Usage:
+    python benchmarks/e2e.py --sizes 1000 10000 100000 --output bench.json
+    python benchmarks/e2e.py --baseline previous.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from synthetic_server import ServerConfig, SyntheticSeoServer, page_description
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+MAIN = REPO_ROOT / "main.py"
+COMMANDS = ["scan-metas", "compare-metas", "sitemap-check"]
+LATENCY_COLUMNS = [
+    "DNS (ms)",
+    "Connect (ms)",
+    "TLS (ms)",
+    "TTFB (ms)",
+    "Download (ms)",
+    "Decode (ms)",
+    "Parse (ms)",
+    "Extract (ms)",
+]
+REPORTS = {
+    "scan-metas": "results/scan_metas_results.xlsx",
+    "compare-metas": "results/compare_metas_results.xlsx",
+    "sitemap-check": "results/sitemap_check_results.xlsx",
+}
+
+
+def write_input(command: str, server: SyntheticSeoServer, size: int, path: Path):
+    """Writes the input workbook a command needs for `size` URLs."""
+    urls = [server.page_url(n) for n in range(size)]
+    if command == "scan-metas":
+        df = pd.DataFrame({"URL": urls})
+    elif command == "compare-metas":
+        df = pd.DataFrame(
+            {
+                "URL": urls,
+                "Meta Name": ["description"] * size,
+                "Expected Content": [
+                    page_description(n) if n % 2 == 0 else "Outdated description"
+                    for n in range(size)
+                ],
+            }
+        )
+    else:
+        df = pd.DataFrame(
+            {"Sitemap": [server.sitemap_url] * size, "Expected URLs": urls}
+        )
+    df.to_excel(path, index=False)
+
+
+def command_line(command: str, input_path: Path, workers_args: List[str]) -> List[str]:
+    args = [sys.executable, str(MAIN), command, str(input_path)]
+    if command == "scan-metas":
+        args += ["URL", "--checks", "robots", "description"]
+    return args + ["--delay", "0", "--timings"] + workers_args
+
+
+def latency_percentiles(report_path: Path) -> tuple[Optional[float], Optional[float]]:
+    """Reads the timing columns of a report and returns the p50/p99 fetch latency."""
+    if not report_path.exists():
+        return None, None
+    df = pd.read_excel(report_path)
+    columns = [column for column in LATENCY_COLUMNS if column in df.columns]
+    if not columns:
+        return None, None
+    latencies = df[columns].dropna().sum(axis=1).to_numpy()
+    if latencies.size == 0:
+        return None, None
+    p50, p99 = np.percentile(latencies, [50, 99])
+    return round(float(p50), 1), round(float(p99), 1)
+
+
+def run_one(command: str, size: int, server: SyntheticSeoServer, workdir: Path) -> dict:
+    input_path = workdir / f"{command}-{size}.xlsx"
+    write_input(command, server, size, input_path)
+
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        command_line(command, input_path, []),
+        cwd=workdir,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    seconds = time.perf_counter() - start
+
+    p50, p99 = latency_percentiles(workdir / REPORTS[command])
+    return {
+        "command": command,
+        "urls": size,
+        "exit_code": process.returncode,
+        "seconds": round(seconds, 3),
+        "urls_per_second": round(size / seconds, 1),
+        "latency_p50_ms": p50,
+        "latency_p99_ms": p99,
+        "peak_rss_mb": round(usage.ru_maxrss / 1024, 1),
+        "cpu_seconds": round(usage.ru_utime + usage.ru_stime, 3),
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_comparison(results: List[dict], baseline_path: Path):
+    baseline = {
+        (entry["command"], entry["urls"]): entry
+        for entry in json.loads(baseline_path.read_text())["results"]
+    }
+    print(f"\nCompared with {baseline_path}:")
+    for entry in results:
+        previous = baseline.get((entry["command"], entry["urls"]))
+        if previous is None:
+            continue
+        ratio = entry["urls_per_second"] / previous["urls_per_second"]
+        print(
+            f"  {entry['command']:<14} {entry['urls']:>7} URLs: "
+            f"{entry['urls_per_second']:>8.1f} URLs/s ({ratio:.2f}x), "
+            f"peak RSS {entry['peak_rss_mb']} MB (was {previous['peak_rss_mb']} MB)"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1000])
+    parser.add_argument("--commands", nargs="+", choices=COMMANDS, default=COMMANDS)
+    parser.add_argument("--page-size", type=int, default=20_000)
+    parser.add_argument("--head-position", choices=["top", "bottom"], default="top")
+    parser.add_argument("--latency", default="lognormal:20,0.5")
+    parser.add_argument("--error-rate", type=float, default=0.01)
+    parser.add_argument("--charset", default="utf-8")
+    parser.add_argument("--output", type=Path, default=Path("bench_results.json"))
+    parser.add_argument("--baseline", type=Path, help="A previous results file to compare with.")
+    args = parser.parse_args()
+
+    config = ServerConfig(
+        pages=max(args.sizes),
+        page_size=args.page_size,
+        head_position=args.head_position,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        charset=args.charset,
+    )
+
+    results = []
+    with SyntheticSeoServer(config) as server, tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            for command in args.commands:
+                print(f"Running {command} with {size} URLs...", flush=True)
+                entry = run_one(command, size, server, Path(tmp))
+                print(f"  {json.dumps(entry)}", flush=True)
+                results.append(entry)
+
+    output = {
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "revision": git_revision(),
+        },
+        "server": vars(config),
+        "results": results,
+    }
+    args.output.write_text(json.dumps(output, indent=2))
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        print_comparison(results, args.baseline)
+
+
+if __name__ == "__main__":
+    main()
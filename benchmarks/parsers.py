@@ -0,0 +1,195 @@
+"""
+Micro-benchmark of the Crawler's extraction paths over a committed corpus.
+
+For every corpus file and parser backend it measures the time per operation
+(parse + extract, as Crawler does it per URL), the memory blocks still held
+by the result (tracemalloc's retained blocks) and the peak traced memory
+during one operation.
+
+The 'lxml.html' backend is the Crawler's own path (an lxml tree queried with
+compiled XPath). The other HTML backends run the same lookups through
+BeautifulSoup with that parser, called explicitly, for comparison.
+
+Usage:
+    python benchmarks/parsers.py --output parsers.json
+    python benchmarks/parsers.py --baseline parsers.json --threshold 0.15
+
+With --baseline, the run fails (exit code 1) if any case got slower, or
+needed more peak memory, by more than the threshold.
+"""
+
+import argparse
+import gzip
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+CORPUS_DIR = Path(__file__).resolve().parent / "corpus"
+sys.path.insert(0, str(REPO_ROOT / "src"))
+
+from bs4 import BeautifulSoup  # noqa: E402
+from core.crawler import Crawler  # noqa: E402
+
+CRAWLER_BACKEND = Crawler.HTML_PARSER
+SOUP_BACKENDS = ["html.parser", "lxml"]
+HTML_BACKENDS = [CRAWLER_BACKEND, *SOUP_BACKENDS]
+XML_BACKENDS = ["xml"]
+HTML_FILES = ["tiny.html", "malformed.html", "spa_shell_2mb.html.gz"]
+XML_FILES = ["sitemap_50k.xml.gz"]
+
+
+def load(name: str) -> bytes:
+    data = (CORPUS_DIR / name).read_bytes()
+    return gzip.decompress(data) if name.endswith(".gz") else data
+
+
+class CorpusCrawler(Crawler):
+    """A Crawler that 'fetches' a corpus document instead of going to the network."""
+
+    def __init__(self, content: bytes, xml_parser: str = "xml"):
+        super().__init__("https://corpus.invalid/", None, [])
+        self.content = content
+        self.XML_PARSER = xml_parser
+
+    def html_search(self) -> str:
+        self.raw_content = self.content
+        return self.content.decode("utf-8", errors="replace")
+
+
+def soup_find_meta_by_name(content: bytes, backend: str, meta_name: str) -> bool:
+    """find_meta_by_name done with BeautifulSoup and the given parser."""
+    soup = BeautifulSoup(content.decode("utf-8", errors="replace"), backend)
+    return len(soup.find_all("meta", {"name": meta_name})) > 0
+
+
+def soup_get_meta_content_by_name(content: bytes, backend: str, meta_name: str):
+    """get_meta_content_by_name done with BeautifulSoup and the given parser."""
+    soup = BeautifulSoup(content.decode("utf-8", errors="replace"), backend)
+    tag = soup.find("meta", {"name": meta_name})
+    return tag.get("content") if tag is not None else None
+
+
+def build_cases() -> Dict[str, Callable[[], object]]:
+    cases: Dict[str, Callable[[], object]] = {}
+    for name in HTML_FILES:
+        content = load(name)
+        cases[f"find_meta_by_name/{name}/{CRAWLER_BACKEND}"] = (
+            lambda c=content: CorpusCrawler(c).find_meta_by_name("robots")
+        )
+        cases[f"get_meta_content_by_name/{name}/{CRAWLER_BACKEND}"] = (
+            lambda c=content: CorpusCrawler(c).get_meta_content_by_name("description")
+        )
+        for backend in SOUP_BACKENDS:
+            cases[f"find_meta_by_name/{name}/{backend}"] = (
+                lambda c=content, b=backend: soup_find_meta_by_name(c, b, "robots")
+            )
+            cases[f"get_meta_content_by_name/{name}/{backend}"] = (
+                lambda c=content, b=backend: soup_get_meta_content_by_name(
+                    c, b, "description"
+                )
+            )
+    for name in XML_FILES:
+        content = load(name)
+        for backend in XML_BACKENDS:
+            cases[f"fetch_sitemap_urls/{name}/{backend}"] = (
+                lambda c=content, b=backend: CorpusCrawler(c, b).fetch_sitemap_urls()
+            )
+    return cases
+
+
+def measure(operation: Callable[[], object], min_time: float, repeats: int) -> dict:
+    """Times an operation and traces its memory use."""
+    operation()
+
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            operation()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        loops *= 2
+
+    best = elapsed / loops
+    for _ in range(repeats - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            operation()
+        best = min(best, (time.perf_counter() - start) / loops)
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = operation()
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+    del result
+
+    return {
+        "ns_per_op": round(best * 1e9),
+        "loops": loops,
+        "retained_blocks": blocks,
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+def find_regressions(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float) -> List[str]:
+    regressions = []
+    for case, current in results.items():
+        previous = baseline.get(case)
+        if previous is None:
+            continue
+        for metric in ("ns_per_op", "peak_kb"):
+            if current[metric] > previous[metric] * (1 + threshold):
+                change = current[metric] / previous[metric] - 1
+                regressions.append(f"{case}: {metric} +{change:.0%}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--filter", default="", help="Only run cases containing this text.")
+    parser.add_argument("--min-time", type=float, default=0.2)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--baseline", type=Path)
+    parser.add_argument("--threshold", type=float, default=0.15)
+    args = parser.parse_args()
+
+    results = {}
+    for case, operation in build_cases().items():
+        if args.filter not in case:
+            continue
+        results[case] = measure(operation, args.min_time, args.repeats)
+        stats = results[case]
+        print(
+            f"{case:<60} {stats['ns_per_op'] / 1e6:>10.3f} ms/op "
+            f"{stats['retained_blocks']:>9} retained blocks "
+            f"{stats['peak_kb']:>11.1f} KB peak",
+            flush=True,
+        )
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        regressions = find_regressions(
+            results, json.loads(args.baseline.read_text()), args.threshold
+        )
+        if regressions:
+            print(f"\nRegressions beyond {args.threshold:.0%}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.threshold:.0%}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Startup benchmark of the CLI: how long it takes before a command starts.
+
+It runs `python -X importtime -c "import cli"` to attribute import time to
+modules, and times `main.py --help` end to end, both in fresh interpreters.
+The best of several runs is kept, to filter out noise.
+
+Usage:
+    python benchmarks/startup.py
+    python benchmarks/startup.py --budget-ms 150 --top 15
+
+The run fails (exit code 1) if `main.py --help` takes longer than the budget.
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def import_times() -> Dict[str, Tuple[int, int]]:
+    """Returns the (self, cumulative) import time in microseconds per module."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import cli"],
+        cwd=REPO_ROOT / "src",
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, _, module = match.groups()
+            times[module] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def help_wall_time() -> float:
+    """Returns the wall time of `main.py --help` in milliseconds."""
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, str(REPO_ROOT / "main.py"), "--help"],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        check=True,
+    )
+    return (time.perf_counter() - start) * 1000
+
+
+def interpreter_wall_time() -> float:
+    """Returns the wall time of an empty interpreter run, for reference."""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], check=True)
+    return (time.perf_counter() - start) * 1000
+
+
+def slowest_imports(times: Dict[str, Tuple[int, int]], top: int) -> List[str]:
+    ranked = sorted(times.items(), key=lambda item: item[1][0], reverse=True)
+    return [f"{module:<50} {self_us / 1000:>8.1f} ms" for module, (self_us, _) in ranked[:top]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=150.0)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    times = min(
+        (import_times() for _ in range(args.repeats)),
+        key=lambda t: t.get("cli", (0, 0))[1],
+    )
+    help_ms = min(help_wall_time() for _ in range(args.repeats))
+    baseline_ms = min(interpreter_wall_time() for _ in range(args.repeats))
+
+    print(f"import cli:            {times.get('cli', (0, 0))[1] / 1000:>8.1f} ms")
+    print(f"main.py --help:        {help_ms:>8.1f} ms")
+    print(f"bare interpreter:      {baseline_ms:>8.1f} ms")
+    print("\nSlowest imports (self time):")
+    for line in slowest_imports(times, args.top):
+        print(f"  {line}")
+
+    if help_ms > args.budget_ms:
+        print(f"\nStartup over budget: {help_ms:.1f} ms > {args.budget_ms:.0f} ms")
+        sys.exit(1)
+    print(f"\nStartup within budget ({args.budget_ms:.0f} ms).")
+
+
+if __name__ == "__main__":
+    main()
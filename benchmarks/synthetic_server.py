@@ -0,0 +1,236 @@
+"""
+A local HTTP server that serves synthetic SEO pages and sitemaps for benchmarks.
+
+Routes:
+    /page/<n>               An HTML page with robots/description meta tags.
+    /sitemap_index.xml      A sitemap index pointing to the nested indexes.
+    /sitemaps/index-<k>.xml A nested sitemap index pointing to gzipped children.
+    /sitemaps/<k>.xml.gz    A gzipped urlset listing a slice of the pages.
+
+Everything is derived from the request path and the seed, so two runs with
+the same configuration serve exactly the same content and errors.
+"""
+
+import argparse
+import gzip
+import hashlib
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+
+URLS_PER_SITEMAP = 1000
+SITEMAPS_PER_INDEX = 10
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """Parses a latency distribution spec into a sampler returning seconds.
+
+    Supported specs (values in milliseconds):
+        none, fixed:<ms>, uniform:<low>,<high>, lognormal:<median>,<sigma>
+
+    Args:
+        spec (str): The distribution spec.
+
+    Returns:
+        Callable[[random.Random], float]: A function drawing one latency.
+    """
+    kind, _, params = spec.partition(":")
+    values = [float(value) for value in params.split(",") if value]
+
+    if kind == "none":
+        return lambda rng: 0.0
+    if kind == "fixed":
+        return lambda rng: values[0] / 1000
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1]) / 1000
+    if kind == "lognormal":
+        median, sigma = values
+        return lambda rng: rng.lognormvariate(0, sigma) * median / 1000
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+@dataclass
+class ServerConfig:
+    pages: int = 1000
+    page_size: int = 20_000
+    head_position: str = "top"
+    latency: str = "none"
+    error_rate: float = 0.0
+    charset: str = "utf-8"
+    seed: int = 1
+
+
+def page_description(n: int) -> str:
+    return f"Description for synthetic page {n}"
+
+
+class SyntheticSeoServer:
+    """Runs the synthetic server on a background thread."""
+
+    def __init__(self, config: ServerConfig, host: str = "127.0.0.1", port: int = 0):
+        self.config = config
+        self.sample_latency = parse_latency(config.latency)
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def page_url(self, n: int) -> str:
+        return f"{self.base_url}/page/{n}"
+
+    @property
+    def sitemap_url(self) -> str:
+        return f"{self.base_url}/sitemap_index.xml"
+
+    def start(self) -> "SyntheticSeoServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "SyntheticSeoServer":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _rng_for(self, path: str) -> random.Random:
+        digest = hashlib.sha256(f"{self.config.seed}:{path}".encode()).digest()
+        return random.Random(int.from_bytes(digest[:8], "big"))
+
+    def render_page(self, n: int) -> bytes:
+        """Builds the HTML of page n, padded to roughly page_size bytes."""
+        config = self.config
+        metas = (
+            f'<meta charset="{config.charset}">'
+            '<meta name="robots" content="index, follow">'
+            f'<meta name="description" content="{page_description(n)}">'
+            '<meta name="viewport" content="width=device-width, initial-scale=1">'
+        )
+        filler_size = max(config.page_size - 400, 0)
+        filler = "<p>Página sintética – conteúdo de preenchimento.</p>" * (
+            filler_size // 56 + 1
+        )
+
+        if config.head_position == "bottom":
+            script = "<script>var state = '" + "x" * filler_size + "';</script>"
+            html = f"<html><head><title>Page {n}</title>{script}{metas}</head><body></body></html>"
+        else:
+            html = f"<html><head><title>Page {n}</title>{metas}</head><body>{filler[:filler_size]}</body></html>"
+        return html.encode(config.charset, errors="replace")
+
+    def render_sitemap_index(self, children: list[str]) -> bytes:
+        entries = "".join(f"<sitemap><loc>{loc}</loc></sitemap>" for loc in children)
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+            f"{entries}</sitemapindex>"
+        ).encode()
+
+    def render_urlset(self, k: int) -> bytes:
+        first = k * URLS_PER_SITEMAP
+        last = min(first + URLS_PER_SITEMAP, self.config.pages)
+        entries = "".join(
+            f"<url><loc>{self.page_url(n)}</loc></url>" for n in range(first, last)
+        )
+        return gzip.compress(
+            (
+                '<?xml version="1.0" encoding="UTF-8"?>'
+                '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+                f"{entries}</urlset>"
+            ).encode(),
+            mtime=0,
+        )
+
+    def _route(self, path: str) -> tuple[int, str, bytes]:
+        config = self.config
+        sitemap_count = -(-config.pages // URLS_PER_SITEMAP)
+        index_count = -(-sitemap_count // SITEMAPS_PER_INDEX)
+
+        if match := re.fullmatch(r"/page/(\d+)", path):
+            n = int(match.group(1))
+            if self._rng_for(path).random() < config.error_rate:
+                return 500, "text/plain", b"Internal Server Error"
+            return (
+                200,
+                f"text/html; charset={config.charset}",
+                self.render_page(n),
+            )
+        if path == "/sitemap_index.xml":
+            children = [
+                f"{self.base_url}/sitemaps/index-{i}.xml" for i in range(index_count)
+            ]
+            return 200, "application/xml", self.render_sitemap_index(children)
+        if match := re.fullmatch(r"/sitemaps/index-(\d+)\.xml", path):
+            i = int(match.group(1))
+            first = i * SITEMAPS_PER_INDEX
+            last = min(first + SITEMAPS_PER_INDEX, sitemap_count)
+            children = [
+                f"{self.base_url}/sitemaps/{k}.xml.gz" for k in range(first, last)
+            ]
+            return 200, "application/xml", self.render_sitemap_index(children)
+        if match := re.fullmatch(r"/sitemaps/(\d+)\.xml\.gz", path):
+            return 200, "application/x-gzip", self.render_urlset(int(match.group(1)))
+        return 404, "text/plain", b"Not Found"
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                delay = server.sample_latency(server._rng_for(self.path + "#latency"))
+                if delay:
+                    time.sleep(delay)
+
+                status, content_type, body = server._route(self.path)
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve synthetic SEO pages locally.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--page-size", type=int, default=20_000)
+    parser.add_argument("--head-position", choices=["top", "bottom"], default="top")
+    parser.add_argument("--latency", default="none")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--charset", default="utf-8")
+    args = parser.parse_args()
+
+    config = ServerConfig(
+        pages=args.pages,
+        page_size=args.page_size,
+        head_position=args.head_position,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        charset=args.charset,
+    )
+    server = SyntheticSeoServer(config, port=args.port)
+    print(f"Serving {config.pages} synthetic pages on {server.base_url}")
+    server._server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
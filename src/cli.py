@@ -1,35 +1,56 @@
+import os
 import sys
 import argparse
 import logging
-from pathlib import Path
-import questionary
-from commands.scan_metas import ScanMetasCommand
-from commands.compare_metas import CompareMetasCommand
-from commands.sitemap_check import SitemapCheckCommand
+from typing import Iterable, Optional
+from core.logging_setup import add_json_log, configure_logging, shutdown_logging
+from core.profiling import create_profiler
+from core.tracing import tracer
+from commands.registry import default_commands
 
-log_directory = Path("./logs")
-log_directory.mkdir(exist_ok=True)
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[logging.FileHandler(log_directory / "app.log")],
-)
+# The outcomes of an interactive prompt that aren't an argument value.
+_CANCELLED = object()
+_SKIPPED = object()
 
 
 class CliApp:
     def __init__(self):
         """
         Initializes the application and registers all available commands.
+
+        Commands are registered through lightweight descriptors; a command's
+        module (and pandas, bs4, requests...) is only imported when the
+        command is about to run or its options are needed.
         """
         logging.info("CliApp initialized.")
-        self.commands = {
-            "scan-metas": ScanMetasCommand(),
-            "compare-metas": CompareMetasCommand(),
-            "sitemap-check": SitemapCheckCommand(),
-        }
-        self.parser = self._setup_parser()
-
-    def _setup_parser(self) -> argparse.ArgumentParser:
+        self.engine_option_dests: set[str] = set()
+        self.command_specs = default_commands()
+        self._parser: Optional[argparse.ArgumentParser] = None
+
+    @property
+    def commands(self) -> dict:
+        """The command instances, by name. Loads every command."""
+        return {name: spec.load() for name, spec in self.command_specs.items()}
+
+    @property
+    def parser(self) -> argparse.ArgumentParser:
+        """The parser with every command's options. Loads every command."""
+        if self._parser is None:
+            self._parser = self._setup_parser()
+        return self._parser
+
+    def _setup_parser(
+        self, load: Optional[Iterable[str]] = None
+    ) -> argparse.ArgumentParser:
+        """Builds the argument parser.
+
+        Args:
+            load (Optional[Iterable[str]]): The commands whose options are
+                added (importing their modules). The other commands are only
+                listed with their description. Every command when None.
+        """
+        loaded = set(self.command_specs if load is None else load)
+
         parser = argparse.ArgumentParser(
             description="SEO Helper - a CLI Tool to improve technical SEO stuff"
         )
@@ -38,17 +59,83 @@ class CliApp:
             dest="command", required=True, help="Available commands"
         )
 
-        for name, command_instance in self.commands.items():
+        for name, spec in self.command_specs.items():
+
+            command_parser = subparsers.add_parser(
+                name, help=spec.description, description=spec.description
+            )
 
-            command_parser = subparsers.add_parser(name)
+            if name not in loaded:
+                continue
 
+            command_instance = spec.load()
             command_instance.setup_args(command_parser)
 
-            command_parser.set_defaults(func=command_instance.execute)
+            engine_group = command_instance.add_engine_args(command_parser)
+            self.engine_option_dests.update(
+                action.dest for action in engine_group._group_actions
+            )
+
+            command_parser.set_defaults(func=command_instance.run)
+
+        parser.add_argument(
+            "--profile",
+            metavar="PATH",
+            help="Profile the run and write the result to PATH (collapsed stacks or pstats).",
+        )
+        parser.add_argument(
+            "--profile-mode",
+            choices=["sample", "cprofile"],
+            default="sample",
+            help="Use a sampling profiler (default) or cProfile on every thread.",
+        )
+        parser.add_argument(
+            "--profile-top",
+            type=int,
+            default=15,
+            help="How many functions to list in the profile summary (default: 15).",
+        )
+        parser.add_argument(
+            "--trace",
+            metavar="PATH",
+            help="Record per-task spans (submit, fetch, parse...) as a Chrome/Perfetto trace in PATH.",
+        )
+        parser.add_argument(
+            "--metrics-port",
+            type=int,
+            metavar="PORT",
+            help="Serve Prometheus metrics on http://127.0.0.1:PORT/metrics during the run.",
+        )
+        parser.add_argument(
+            "--metrics-textfile",
+            metavar="PATH",
+            help="Periodically write Prometheus metrics to PATH (node_exporter textfile collector).",
+        )
+        parser.add_argument(
+            "--metrics-interval",
+            type=float,
+            default=15.0,
+            help="Seconds between metrics textfile writes (default: 15).",
+        )
+        parser.add_argument(
+            "--no-daemon",
+            action="store_true",
+            help="Run locally even if a serve daemon is running.",
+        )
+        parser.add_argument(
+            "--log-json",
+            metavar="PATH",
+            help="Also write the log as JSON lines to PATH.",
+        )
 
         return parser
 
+    def _requested_command(self, argv: list[str]) -> Optional[str]:
+        """Returns the first command name found in argv, if any."""
+        return next((arg for arg in argv if arg in self.command_specs), None)
+
     def _choose_command(self) -> argparse.ArgumentParser | None:
+        import questionary
 
         subparsers_action = next(
             (
@@ -89,11 +176,14 @@ class CliApp:
         self, command_parser: argparse.ArgumentParser
     ) -> dict | None:
         """Collects required and optional arguments from the user interactively."""
+        import questionary
 
         interactive_args = {}
 
         actions = [
-            action for action in command_parser._actions if action.dest != "help"
+            action
+            for action in command_parser._actions
+            if action.dest != "help" and action.dest not in self.engine_option_dests
         ]
         required_actions = [action for action in actions if action.required]
         optional_actions = [action for action in actions if not action.required]
@@ -101,11 +191,11 @@ class CliApp:
         print("\nPlease provide the following information:\n")
 
         for action in required_actions:
-            user_input = questionary.text(f"{action.help}").ask()
-            if user_input is None:
+            value = self._ask_argument(command_parser, action, f"{action.help}")
+            if value is _CANCELLED:
                 print("\nOperation cancelled. Exiting.")
                 return None
-            interactive_args[action.dest] = user_input
+            interactive_args[action.dest] = value
 
         if optional_actions:
             configure_optionals = questionary.confirm(
@@ -116,20 +206,63 @@ class CliApp:
                 print("\nPlease configure the optional arguments:\n")
                 for action in optional_actions:
                     prompt = f"{action.help} (Default: {action.default})"
-                    user_input = questionary.text(prompt).ask()
+                    value = self._ask_argument(
+                        command_parser, action, prompt, optional=True
+                    )
 
-                    if user_input is None:
+                    if value is _CANCELLED:
                         print("\nOperation cancelled. Exiting.")
                         return None
 
-                    if user_input.strip():
-                        if action.nargs == "+":
-                            interactive_args[action.dest] = user_input.split()
-                        else:
-                            interactive_args[action.dest] = user_input
+                    if value is not _SKIPPED:
+                        interactive_args[action.dest] = value
 
         return interactive_args
 
+    @staticmethod
+    def _ask_argument(
+        command_parser: argparse.ArgumentParser,
+        action: argparse.Action,
+        prompt: str,
+        optional: bool = False,
+    ):
+        """Asks for one argument until the answer converts like argparse would.
+
+        The answer is split for options taking several values, run through
+        the option's type and choices, and wrapped in a list for append
+        options, so the command gets the same values as from the command line.
+
+        Returns:
+            The converted value, _SKIPPED for an empty optional answer, or
+            _CANCELLED if the user cancelled the prompt.
+        """
+        import questionary
+
+        while True:
+            user_input = questionary.text(prompt).ask()
+            if user_input is None:
+                return _CANCELLED
+            if optional and not user_input.strip():
+                return _SKIPPED
+
+            many = action.nargs in ("+", "*", argparse.REMAINDER)
+            answers = user_input.split() if many else [user_input]
+            type_func = command_parser._registry_get("type", action.type, action.type)
+            try:
+                values = [type_func(answer) for answer in answers]
+            except (argparse.ArgumentTypeError, TypeError, ValueError) as e:
+                print(f"Invalid value: {e}")
+                continue
+            invalid = [v for v in values if action.choices and v not in action.choices]
+            if invalid:
+                choices = ", ".join(map(str, action.choices))
+                print(f"Invalid choice: {invalid[0]} (choose from {choices})")
+                continue
+
+            if many or isinstance(action, argparse._AppendAction):
+                return values
+            return values[0]
+
     def _execute_command(
         self,
         command_parser: argparse.ArgumentParser,
@@ -170,29 +303,113 @@ class CliApp:
         if not args_dict:
             return
 
-        logging.info(f"Command chose: { command_name},")
-        logging.info(f"Collected arguments: { args_dict},")
+        logging.info("Command chose: %s", command_name)
+        logging.info("Collected arguments: %s", args_dict)
         self._execute_command(command_parser, args_dict, command_name)
 
-    def run_direct_mode(self):
+    def _run_profiled(self, args: argparse.Namespace):
+        """Runs the command under the profiler and reports where the time went."""
+        profiler = create_profiler(args.profile_mode)
+        profiler.start()
         try:
-            args = self.parser.parse_args()
             args.func(args)
+        finally:
+            profiler.stop()
+            profiler.dump(args.profile)
+            print(f"\n========== Profile ({args.profile_mode}) ==========")
+            for line in profiler.summary(args.profile_top):
+                print(line)
+            print(f"Profile written to {args.profile}")
+            logging.info("Profile written to %s", args.profile)
+
+    def _start_metrics_exporters(self, args: argparse.Namespace) -> list:
+        """Starts the metrics endpoint and/or textfile writer requested in args."""
+        from core.metrics import MetricsServer, TextfileExporter
+
+        exporters = []
+        if getattr(args, "metrics_port", None) is not None:
+            exporters.append(MetricsServer(args.metrics_port))
+            print(f"Serving metrics on http://127.0.0.1:{args.metrics_port}/metrics")
+        if getattr(args, "metrics_textfile", None):
+            exporters.append(
+                TextfileExporter(args.metrics_textfile, args.metrics_interval)
+            )
+        for exporter in exporters:
+            exporter.start()
+        return exporters
+
+    def run_direct_mode(self, argv: Optional[list[str]] = None):
+        """Parses the command line (sys.argv when argv is None) and runs it."""
+        if argv is None:
+            argv = sys.argv[1:]
+        exporters = []
+        parser = self._parser or self._setup_parser(
+            load=[self._requested_command(argv)]
+        )
+        try:
+            args = parser.parse_args(argv)
+            if getattr(args, "log_json", None):
+                add_json_log(args.log_json)
+            exporters = self._start_metrics_exporters(args)
+            if getattr(args, "trace", None):
+                tracer.start()
+            if getattr(args, "profile", None):
+                self._run_profiled(args)
+            else:
+                args.func(args)
         except Exception as e:
             logging.error(
-                f"An unexpected error occurred in direct mode: {e}", exc_info=True
+                "An unexpected error occurred in direct mode: %s", e, exc_info=True
             )
             print(f"\nAn unexpected error occurred: {e}")
+        finally:
+            for exporter in exporters:
+                exporter.stop()
+            if tracer.enabled:
+                tracer.stop()
+                tracer.dump(args.trace)
+                print(f"Trace written to {args.trace}")
+
+    def _forward_to_daemon(self, argv: list[str]) -> bool:
+        """
+        Runs the command line on the serve daemon, if one is running.
+
+        Commands reading standard input, the serve and worker commands and
+        runs with --no-daemon always run locally.
+
+        Returns:
+            bool: True if the daemon ran the command.
+        """
+        command = self._requested_command(argv)
+        if command in (None, "serve", "worker") or "--no-daemon" in argv or "-" in argv:
+            return False
+
+        from core.daemon import find_daemon, submit_job
+
+        daemon = find_daemon()
+        if daemon is None:
+            return False
+
+        logging.info("Forwarding %s to the daemon at %s", command, daemon["address"])
+        exit_code, output = submit_job(daemon, argv, os.getcwd())
+        print(output, end="")
+        if exit_code:
+            sys.exit(exit_code)
+        return True
 
     def run(self):
         if len(sys.argv) <= 1:
             logging.info("Running in interactive mode.")
             self.run_interactive_mode()
-        else:
+        elif not self._forward_to_daemon(sys.argv[1:]):
             logging.info("Running in direct mode.")
             self.run_direct_mode()
 
 
 def main():
-    app = CliApp()
-    app.run()
+    configure_logging()
+    try:
+        app = CliApp()
+        app.run()
+    finally:
+        shutdown_logging()
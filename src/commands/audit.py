@@ -0,0 +1,344 @@
+import argparse
+import json
+import logging
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import requests as rq
+from core.crawler import Crawler
+from core.results import STATUS_COLUMN_TYPES, STATUS_OK, error_status
+from core.session import CrawlSession
+from core.urls import canonicalize_url
+from reporting.result_writers import SectionedResultWriter
+from .base_command import Command
+
+logger = logging.getLogger(__name__)
+
+EXISTS = "exists"
+COMPARE = "compare"
+SITEMAP = "sitemap"
+HEADER = "header"
+# The report's sections, in order.
+CHECK_TYPES = (EXISTS, COMPARE, SITEMAP, HEADER)
+
+PLAN_KEYS = {"urls", "exists", "headers", "sitemap", "compare"}
+REPORT_COLUMNS = [
+    "Check",
+    "URL",
+    "Target",
+    "Expected",
+    "Found",
+    "Passed?",
+    *STATUS_COLUMN_TYPES,
+]
+REPORT_COLUMN_TYPES = {
+    "Check": "category",
+    "Passed?": "boolean",
+    **STATUS_COLUMN_TYPES,
+}
+
+
+class Check(NamedTuple):
+    """One check on a URL: its type, what it looks at and the expected value."""
+
+    kind: str
+    target: str
+    expected: Optional[str] = None
+
+
+class AuditTask(NamedTuple):
+    """A URL and every check the plan runs on it."""
+
+    url: str
+    checks: List[Check]
+
+
+class AuditCommand(Command):
+
+    @staticmethod
+    def setup_args(parser: argparse.ArgumentParser):
+        parser.description = (
+            "Runs several checks from a JSON plan, fetching each URL only once."
+        )
+
+        parser.add_argument(
+            "plan",
+            help=(
+                "Path to the JSON plan: 'urls' ({file, column}) with 'exists' (meta "
+                "names), 'headers' ({name: expected or null}) and 'sitemap' (URL) "
+                "checks on them, and 'compare' ({file, url_col, name_col, content_col})."
+            ),
+        )
+
+    def _load_plan(self, path: str) -> Optional[dict]:
+        """
+        Reads and validates the audit plan.
+
+        Args:
+            path (str): The JSON plan file.
+
+        Returns:
+            Optional[dict]: The plan, or None (after printing why) if it is invalid.
+        """
+        try:
+            with open(path, encoding="utf-8") as f:
+                plan = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error: could not read the plan '{path}': {e}")
+            return None
+
+        if not isinstance(plan, dict):
+            print("Error: the plan must be a JSON object.")
+            return None
+        unknown = set(plan) - PLAN_KEYS
+        if unknown:
+            print(f"Error: unknown plan keys: {', '.join(sorted(unknown))}.")
+            return None
+        if not plan.keys() & {"exists", "headers", "sitemap", "compare"}:
+            print("Error: the plan has no checks.")
+            return None
+        if plan.keys() & {"exists", "headers", "sitemap"} and "urls" not in plan:
+            print("Error: 'exists', 'headers' and 'sitemap' checks need 'urls'.")
+            return None
+        return plan
+
+    def _read_urls(self, source: dict) -> Optional[List[str]]:
+        """Reads the URL list of the plan's 'urls' entry."""
+        column = source.get("column", "URL")
+        required_columns = [{"name": column, "description": "which contains the URLs"}]
+        chunks = self._get_input_chunks(
+            self._normalize_filepath(source["file"]), required_columns
+        )
+        if chunks is None:
+            return None
+
+        column = required_columns[0]["name"]
+        urls = []
+        for chunk in chunks:
+            chunk_urls = self._get_validated_urls_from_column(column, chunk)
+            if chunk_urls is None:
+                return None
+            urls.extend(chunk_urls)
+        return urls
+
+    def _read_comparisons(self, source: dict) -> Optional[List[Tuple]]:
+        """Reads the (URL, meta name, expected content) rows of the 'compare' entry."""
+        required_columns = [
+            {
+                "name": source.get("url_col", "URL"),
+                "description": "which contains the URLs",
+            },
+            {
+                "name": source.get("name_col", "Meta Name"),
+                "description": "which contains the meta tag names",
+            },
+            {
+                "name": source.get("content_col", "Expected Content"),
+                "description": "which contains the expected content",
+            },
+        ]
+        chunks = self._get_input_chunks(
+            self._normalize_filepath(source["file"]), required_columns
+        )
+        if chunks is None:
+            return None
+
+        url_col, name_col, content_col = [col["name"] for col in required_columns]
+        return [
+            values
+            for chunk in chunks
+            for values in self._clean_dataframe(chunk, url_col)[
+                [url_col, name_col, content_col]
+            ].itertuples(index=False, name=None)
+        ]
+
+    def _fetch_sitemap(self, sitemap_url: str) -> Optional[set]:
+        """Fetches every URL listed in the sitemap (and its children)."""
+        print(f"Fetching and parsing sitemap {sitemap_url}...")
+        with CrawlSession(self.session_options) as session:
+            sitemap_urls = Crawler(sitemap_url, session, []).fetch_sitemap_urls()
+
+        if sitemap_urls is None:
+            print("Could not read the sitemap...")
+            return None
+        print(f"Sitemap parsed successfully. {len(sitemap_urls)} URLs found.")
+        return set(sitemap_urls)
+
+    @staticmethod
+    def _build_tasks(
+        plan: dict, urls: List[str], comparisons: List[Tuple]
+    ) -> List[AuditTask]:
+        """
+        Groups the plan's checks by URL, so each URL is fetched once.
+
+        URLs are matched on their canonical form (lowercased host, no default
+        port or fragment); a URL listed twice in 'urls' is checked once.
+
+        Args:
+            plan (dict): The validated plan.
+            urls (List[str]): The URLs of the 'urls' entry.
+            comparisons (List[Tuple]): The rows of the 'compare' entry.
+
+        Returns:
+            List[AuditTask]: One task per distinct URL, in input order.
+        """
+        checks_by_url: Dict[str, AuditTask] = {}
+
+        def task_for(url: str) -> AuditTask:
+            key = canonicalize_url(url)
+            if key not in checks_by_url:
+                checks_by_url[key] = AuditTask(url.strip(), [])
+            return checks_by_url[key]
+
+        url_checks = [Check(EXISTS, name) for name in plan.get("exists", [])]
+        url_checks += [
+            Check(HEADER, name, None if expected is None else str(expected))
+            for name, expected in plan.get("headers", {}).items()
+        ]
+        if plan.get("sitemap"):
+            url_checks.append(Check(SITEMAP, plan["sitemap"]))
+
+        listed = set()
+        for url in urls if url_checks else []:
+            key = canonicalize_url(url)
+            if key not in listed:
+                listed.add(key)
+                task_for(url).checks.extend(url_checks)
+
+        for url, meta_name, expected_content in comparisons:
+            task_for(str(url)).checks.append(
+                Check(COMPARE, str(meta_name), str(expected_content))
+            )
+
+        return list(checks_by_url.values())
+
+    def _audit_url(
+        self, task: AuditTask, sitemap_urls: set, session: rq.Session
+    ) -> List[tuple]:
+        """
+        Fetches and parses a URL once and evaluates every check of the plan on it.
+
+        Designed to be run in a separate thread. Sitemap checks need no fetch.
+
+        Args:
+            task (AuditTask): The URL and its checks.
+            sitemap_urls (set): The URLs listed in the plan's sitemap.
+            session (rq.Session): The session used to fetch the page.
+
+        Returns:
+            List[tuple]: One report row per check: the check type, the URL,
+                the target (meta name, header or sitemap), the expected and
+                found values, whether it passed, the status and error.
+        """
+        url = task.url
+        crawler = Crawler(url, session, [])
+        try:
+            needs_page = any(check.kind != SITEMAP for check in task.checks)
+            loaded = crawler.fetch_page() if needs_page else False
+            failed = needs_page and not loaded
+            error = str(crawler.fetch_error) if failed else None
+            status = error_status(crawler.fetch_error) if failed else None
+
+            rows = []
+            for kind, target, expected in task.checks:
+                found, passed = None, None
+                if kind == SITEMAP:
+                    passed = url in sitemap_urls
+                elif not loaded:
+                    rows.append(
+                        (kind, url, target, expected, None, None, status, error)
+                    )
+                    continue
+                elif kind == EXISTS:
+                    found = crawler.get_meta_content_by_name(target)
+                    passed = crawler.find_meta_by_name(target)
+                elif kind == COMPARE:
+                    content = crawler.get_meta_content_by_name(target)
+                    passed = str(content).strip() == str(expected).strip()
+                    found = content or "Not Found"
+                elif kind == HEADER:
+                    found = crawler.response_headers.get(target)
+                    if expected is None:
+                        passed = found is not None
+                    else:
+                        passed = (
+                            found is not None and expected.lower() in found.lower()
+                        )
+                rows.append(
+                    (kind, url, target, expected, found, passed, STATUS_OK, None)
+                )
+            return rows
+
+        except Exception as e:
+            logger.error("Error auditing URL %s: %s", url, e)
+            return [
+                (kind, url, target, expected, None, None, error_status(e), str(e))
+                for kind, target, expected in task.checks
+            ]
+        finally:
+            crawler.record_timings()
+
+    def execute(self, args: argparse.Namespace):
+        """
+        Runs every check of the plan, fetching and parsing each URL only once.
+
+        The plan's inputs are read, the checks grouped by URL, and each page
+        is downloaded and parsed a single time for its meta tag, content and
+        header checks. The report has one row per check, in one section per
+        check type (exists, compare, sitemap, header).
+
+        Args:
+            args (argparse.Namespace): The command-line arguments, with the plan path.
+        """
+        print(">>> 'audit' command activated! <<<")
+
+        if self.run_options.shard is not None:
+            print("Error: audit doesn't take --shard.")
+            return
+
+        plan = self._load_plan(args.plan)
+        if plan is None:
+            return
+
+        urls: List[str] = []
+        if "urls" in plan:
+            urls = self._read_urls(plan["urls"])
+            if urls is None:
+                return
+
+        comparisons: List[Tuple] = []
+        if "compare" in plan:
+            comparisons = self._read_comparisons(plan["compare"])
+            if comparisons is None:
+                return
+
+        sitemap_urls: set = set()
+        if plan.get("sitemap"):
+            sitemap_urls = self._fetch_sitemap(plan["sitemap"])
+            if sitemap_urls is None:
+                return
+
+        tasks = self._build_tasks(plan, urls, comparisons)
+        check_count = sum(len(task.checks) for task in tasks)
+        print(f"Auditing {len(tasks)} URLs ({check_count} checks)...")
+
+        writer = self._create_result_writer(
+            "audit_results", REPORT_COLUMNS, REPORT_COLUMN_TYPES
+        )
+        with SectionedResultWriter(writer, CHECK_TYPES) as sections:
+
+            def write_rows(rows: List[tuple]):
+                for row in rows:
+                    sections.write(row[0], row)
+
+            self._run_concurrent_tasks(
+                tasks=tasks,
+                task_function=lambda task, session: self._audit_url(
+                    task, sitemap_urls, session
+                ),
+                desc_provider=lambda task: task.url,
+                pbar_color="magenta",
+                url_provider=lambda task: task.url,
+                on_result=write_rows,
+            )
+
+        if not sections.rows_written:
+            print("No data was processed. No report will be generated.")
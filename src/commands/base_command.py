@@ -1,13 +1,95 @@
 import argparse
+import contextlib
+import logging
+import threading
+import time
 from abc import ABC, abstractmethod
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Callable, Iterable, List, Optional, Dict
+import itertools
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from collections.abc import Sized
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional
 import requests as rq
-from tqdm import tqdm
 import pandas as pd
 from reporting.excel_reader import ExcelReader
+from reporting.input_source import InputSource, detect_format
+from reporting.result_writers import ResultWriter, create_result_writer
+from core import metrics
+from core.dns_cache import dns_cache
+from core.negative_cache import unreachable_hosts
+from core.prewarm import prewarm
+from core.progress import ProgressReporter
+from core.results import STATUS_SHORT_CIRCUITED
+from core.run_options import RunOptions
+from core.session import CrawlSession, SessionOptions
+from core.sharding import (
+    SHARD_COLUMN,
+    parse_shard,
+    select_shard,
+    shard_suffix,
+    with_input_row,
+)
+from core.timing import TimingCollector, set_queue_wait
+from core.tracing import tracer
+from core.urls import canonical_host
 import questionary
 
+logger = logging.getLogger(__name__)
+
+MAX_WORKERS = 10
+TASK_WINDOW = MAX_WORKERS * 10
+PREWARM_SAMPLE = 10_000
+_NO_TASK = object()
+
+
+class WarmPool:
+    """
+    The sessions and worker threads kept alive between runs.
+
+    A long-lived process (the serve daemon) installs one as `warm_pool`, so
+    consecutive commands reuse the pooled keep-alive connections, latency
+    histograms and worker threads instead of building and tearing them down
+    every time. Runs are expected to be sequential: a session is shared by
+    every run with the same hedging settings, and is handed out with the
+    run's options and fresh timing stats.
+    """
+
+    def __init__(self, max_workers: int = MAX_WORKERS):
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="warm-worker"
+        )
+        self._sessions: Dict[tuple, CrawlSession] = {}
+        self._lock = threading.Lock()
+
+    def session(self, options: SessionOptions) -> CrawlSession:
+        """Returns the open session to use for a run with these options."""
+        key = (options.hedge, options.hedge_budget)
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                session = self._sessions[key] = CrawlSession(options)
+        session.options = options
+        session.timing_stats = TimingCollector()
+        return session
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+warm_pool: Optional[WarmPool] = None
+
+
+class TaskPlan(NamedTuple):
+    """A run read from its input but not started: its tasks and report layout."""
+
+    name: str
+    columns: List[str]
+    column_types: Dict[str, str]
+    tasks: Iterable
+
 
 class Command(ABC):
     """
@@ -17,6 +99,11 @@ class Command(ABC):
     with the CLI application.
     """
 
+    session_options: SessionOptions = SessionOptions()
+    run_options: RunOptions = RunOptions()
+    interactive: bool = True
+    queueable: bool = False
+
     @staticmethod
     @abstractmethod
     def setup_args(subparser: argparse.ArgumentParser):
@@ -27,9 +114,165 @@ class Command(ABC):
         """
         pass
 
+    @staticmethod
+    def add_engine_args(parser: argparse.ArgumentParser) -> argparse._ArgumentGroup:
+        """
+        Adds the options shared by every command to tune the crawl engine.
+
+        Returns:
+            argparse._ArgumentGroup: The group holding the engine options.
+        """
+        group = parser.add_argument_group("engine options")
+        group.add_argument(
+            "--hedge",
+            action="store_true",
+            help="Send a duplicate request when a fetch runs past its host's p95 latency.",
+        )
+        group.add_argument(
+            "--hedge-budget",
+            type=float,
+            default=0.05,
+            help="Maximum share of extra requests that hedging may send (default: 0.05).",
+        )
+        group.add_argument(
+            "--no-prewarm",
+            dest="prewarm",
+            action="store_false",
+            help="Skip resolving hosts and opening connections before the crawl starts.",
+        )
+        group.add_argument(
+            "--timings",
+            action="store_true",
+            help="Add per-request timing columns (DNS, connect, TLS, TTFB, parse...) to the report.",
+        )
+        group.add_argument(
+            "--progress",
+            choices=["bar", "jsonl", "none"],
+            default="bar",
+            help="Progress output: a terminal bar (default), JSON lines on stderr, or none.",
+        )
+        group.add_argument(
+            "--cache-input",
+            action="store_true",
+            help="Keep a Parquet copy of the input workbook so later runs load it faster.",
+        )
+        group.add_argument(
+            "--output-format",
+            choices=["xlsx", "csv", "jsonl", "parquet"],
+            default="xlsx",
+            help="Report format: the styled Excel report (default) or csv, jsonl, parquet.",
+        )
+        group.add_argument(
+            "--output-compression",
+            choices=["gzip", "bz2", "xz", "snappy", "zstd"],
+            help="Compress the report (gzip/bz2/xz for csv and jsonl; snappy/gzip/zstd for parquet).",
+        )
+        group.add_argument(
+            "--shard",
+            type=parse_shard,
+            metavar="K/N",
+            help="Only process shard K of N (tasks grouped by host), to split a run across machines.",
+        )
+        group.add_argument(
+            "--delay",
+            type=float,
+            default=1.0,
+            help="Politeness pause, in seconds, after each request (default: 1.0).",
+        )
+        return group
+
+    def plan(self, args: argparse.Namespace) -> Optional[TaskPlan]:
+        """
+        Reads the input and returns the run's tasks and report layout.
+
+        Implemented by the queueable commands, whose runs are made of
+        independent per-URL tasks that the job queue can spread over worker
+        processes. The tasks may be a generator over the input.
+
+        Args:
+            args (argparse.Namespace): The parsed command-line arguments.
+
+        Returns:
+            Optional[TaskPlan]: The plan, or None if the input can't be read.
+        """
+        raise NotImplementedError(f"{type(self).__name__} can't be queued")
+
+    def task_function(
+        self, args: argparse.Namespace
+    ) -> Callable[[Any, rq.Session], tuple]:
+        """Returns the function that runs one task of the plan into a report row."""
+        raise NotImplementedError(f"{type(self).__name__} can't be queued")
+
+    @staticmethod
+    def task_url(task) -> str:
+        """Returns the URL a task of the plan fetches."""
+        return task
+
+    @staticmethod
+    def decode_task(payload):
+        """Rebuilds a task from its JSON form in the job queue."""
+        return payload
+
+    @staticmethod
+    def task_values(task) -> tuple:
+        """Returns the input values a task's report row starts with."""
+        return (task,)
+
+    def _run_plan(
+        self, args: argparse.Namespace, plan: TaskPlan, pbar_color: str
+    ) -> int:
+        """
+        Runs a plan's tasks on the engine and streams their rows to the report.
+
+        Returns:
+            int: The number of report rows written.
+        """
+        with self._create_result_writer(
+            plan.name, plan.columns, plan.column_types
+        ) as writer:
+            self._run_concurrent_tasks(
+                tasks=plan.tasks,
+                task_function=self.task_function(args),
+                desc_provider=lambda task: str(self.task_url(task)),
+                pbar_color=pbar_color,
+                url_provider=lambda task: str(self.task_url(task)),
+                on_result=writer.write,
+            )
+
+        if not writer.rows_written:
+            print("No data was processed. No report will be generated.")
+        return writer.rows_written
+
+    def _ask(self, problem: str, request: str) -> Optional[str]:
+        """
+        Asks the user to correct an input (a file path, a column name...).
+
+        Args:
+            problem (str): What is wrong, e.g. "File 'x.xlsx' not found.".
+            request (str): What to enter instead.
+
+        Returns:
+            Optional[str]: The answer, or None if the user cancelled. Always
+                None when the command can't prompt (e.g. in the daemon), after
+                printing the problem.
+        """
+        if not self.interactive:
+            print(f"Error: {problem}")
+            return None
+        return questionary.text(f"{problem} {request}").ask()
+
+    def run(self, args: argparse.Namespace):
+        """
+        Applies the engine options from args and executes the command.
+        """
+        self.session_options = SessionOptions.from_args(args)
+        self.run_options = RunOptions.from_args(args)
+        self.execute(args)
+
     def _normalize_filepath(self, filepath: str) -> str:
         """
-        Ensures the given filepath ends with .xlsx.
+        Ensures the given filepath ends with .xlsx, unless it is standard input
+        ('-') or another supported input format (CSV, JSONL, Parquet...).
 
         Args:
             filepath (str): The initial file path.
@@ -37,9 +280,82 @@ class Command(ABC):
         Returns:
             str: The normalized file path.
         """
-        if not filepath.endswith(".xlsx"):
-            return f"{filepath}.xlsx"
-        return filepath
+        if detect_format(filepath) is not None:
+            return filepath
+        return f"{filepath}.xlsx"
+
+    def _create_result_writer(
+        self,
+        name: str,
+        columns: List[str],
+        column_types: Optional[Dict[str, str]] = None,
+    ) -> ResultWriter:
+        """
+        Creates the streaming report writer for the selected output format.
+
+        With --shard, the report is named '<name>.shard-K-of-N' and starts
+        with the SHARD_COLUMN column, used by the merge command.
+
+        Args:
+            name (str): The report name, written to 'results/<name>.<format>'.
+            columns (List[str]): The report columns, in order.
+            column_types (Optional[Dict[str, str]]): The types of the typed columns.
+
+        Returns:
+            ResultWriter: The writer, to be passed as the engine's on_result.
+        """
+        shard = self.run_options.shard
+        if shard is not None:
+            name += shard_suffix(shard)
+            columns = [SHARD_COLUMN, *columns]
+            column_types = {**(column_types or {}), SHARD_COLUMN: "int"}
+
+        return create_result_writer(
+            self.run_options.output_format,
+            f"results/{name}",
+            columns,
+            column_types,
+            self.run_options.output_compression,
+        )
+
+    @staticmethod
+    def _run_task(
+        task_function: Callable, task, session: rq.Session, submitted_at: float
+    ):
+        """Runs one task on a worker thread, recording how long it was queued."""
+        set_queue_wait(time.perf_counter() - submitted_at)
+        metrics.queue_depth.dec()
+        metrics.tasks_in_flight.inc()
+        try:
+            with tracer.span("task"):
+                return task_function(task, session)
+        finally:
+            metrics.tasks_in_flight.dec()
+
+    @contextlib.contextmanager
+    def _crawl_resources(self) -> Iterator[tuple]:
+        """
+        Yields the (session, executor) for one run: the warm pool's when one
+        is installed, otherwise a new session and thread pool closed at the end.
+        """
+        if warm_pool is not None:
+            yield warm_pool.session(self.session_options), warm_pool.executor
+            return
+        with CrawlSession(self.session_options) as session, ThreadPoolExecutor(
+            max_workers=MAX_WORKERS
+        ) as executor:
+            yield session, executor
+
+    def _print_timing_summary(self, session: rq.Session):
+        """Prints the per-host timing percentiles collected by a CrawlSession."""
+        if not isinstance(session, CrawlSession):
+            return
+
+        lines = session.timing_stats.summary_lines()
+        if lines:
+            print("\nPer-host timings:")
+            for line in lines:
+                print(line)
 
     def _run_concurrent_tasks(
         self,
@@ -47,57 +363,148 @@ class Command(ABC):
         task_function: Callable,
         desc_provider: Callable,
         pbar_color: str = "green",
+        url_provider: Optional[Callable] = None,
+        on_result: Optional[Callable[[dict], None]] = None,
     ) -> List[dict]:
         """
         A generic engine to run tasks concurrently with a progress bar.
 
+        Tasks are pulled from the iterable lazily: at most TASK_WINDOW of them
+        are submitted at any time, and a new one is submitted whenever one
+        completes, so generators over very large inputs are never materialized.
+
+        With --shard, only the tasks whose host falls in the shard are run,
+        and each result is prefixed with the task's position in the input.
+
         Args:
             tasks (Iterable): A list or iterable of items to process (e.g., URLs or DataFrame rows).
             task_function (Callable): A lambda or function that takes one item from the tasks list
                                      and returns a dictionary.
-            pbar_color (str): The color for the tqdm progress bar.
+            pbar_color (str): The color of the progress bar.
+            url_provider (Optional[Callable]): Returns the URL a task will fetch. When given,
+                                     the hosts of the first PREWARM_SAMPLE tasks are resolved
+                                     and connected to before the crawl.
+            on_result (Optional[Callable[[dict], None]]): Called with each result as it
+                                     completes (e.g., a report writer). When given, results
+                                     are not kept in memory.
 
         Returns:
-            List[dict]: A list containing the dictionary results from each task.
+            List[dict]: A list containing the dictionary results from each task
+                        (empty when on_result is given).
         """
 
         results = []
 
-        tasks_list = list(tasks)
-        if not tasks_list:
+        should_prewarm = url_provider is not None and self.run_options.prewarm
+        shard = self.run_options.shard
+        if shard is None:
+            total = len(tasks) if isinstance(tasks, Sized) else None
+            task_iter = enumerate(tasks)
+        else:
+            total = None
+            task_iter = select_shard(tasks, shard, url_provider or desc_provider)
+        head = list(itertools.islice(task_iter, PREWARM_SAMPLE if should_prewarm else 1))
+        if not head:
             return []
+        task_iter = itertools.chain(head, task_iter)
+
+        short_circuited_before = unreachable_hosts.short_circuited
+
+        with self._crawl_resources() as (session, executor), dns_cache.installed():
+            if should_prewarm:
+                print("Pre-warming DNS and connections...")
+                report = prewarm(
+                    session, (url_provider(task) for _, task in head), dns_cache
+                )
+                print(
+                    f"Pre-warmed {report.connected}/{report.hosts} hosts "
+                    f"in {report.seconds:.2f}s."
+                )
+
+            crawl_start = time.perf_counter()
+            future_to_task = {}
+
+            def submit_next() -> bool:
+                item = next(task_iter, _NO_TASK)
+                if item is _NO_TASK:
+                    return False
+                index, task = item
+                metrics.queue_depth.inc()
+                with tracer.span("submit"):
+                    future = executor.submit(
+                        self._run_task,
+                        task_function,
+                        task,
+                        session,
+                        time.perf_counter(),
+                    )
+                future_to_task[future] = (index, task)
+                return True
+
+            while len(future_to_task) < TASK_WINDOW and submit_next():
+                pass
+
+            with ProgressReporter(
+                total=total,
+                mode=self.run_options.progress,
+                desc_provider=desc_provider,
+                colour=pbar_color,
+            ) as progress:
+                while future_to_task:
+                    done, _ = wait(
+                        future_to_task,
+                        timeout=progress.interval,
+                        return_when=FIRST_COMPLETED,
+                    )
+                    for future in done:
+                        with tracer.span("result"):
+                            index, original_task = future_to_task.pop(future)
+                            result = future.result()
+                            if shard is not None:
+                                result = with_input_row(index, result)
+                            if on_result is not None:
+                                on_result(result)
+                            else:
+                                results.append(result)
+                            host = (
+                                canonical_host(url_provider(original_task))
+                                if url_provider is not None
+                                else None
+                            )
+                            progress.advance(original_task, host)
+                        submit_next()
+                    progress.tick()
+
+            print(f"Crawl finished in {time.perf_counter() - crawl_start:.2f}s.")
+            self._print_timing_summary(session)
+
+        short_circuited = unreachable_hosts.short_circuited - short_circuited_before
+        if short_circuited:
+            print(
+                f"{short_circuited} fetches were short-circuited because their host "
+                "was unreachable (DNS, connection refused or TLS error); their "
+                f"rows have the '{STATUS_SHORT_CIRCUITED}' status."
+            )
+            logger.info("%d fetches short-circuited by unreachable hosts", short_circuited)
 
-        with rq.Session() as session:
-            with ThreadPoolExecutor(max_workers=10) as executor:
-
-                future_to_task = {
-                    executor.submit(task_function, task, session): task
-                    for task in tasks_list
-                }
-
-                with tqdm(
-                    total=len(tasks_list),
-                    bar_format="{l_bar}{bar:40}| {n_fmt}/{total_fmt} [{elapsed}]",
-                    colour=pbar_color,
-                ) as pbar:
-                    for future in as_completed(future_to_task):
-                        original_task = future_to_task[future]
-
-                        description = desc_provider(original_task)
-                        pbar.set_description(f"Processing {description[:50]}")
-
-                        result = future.result()
-                        results.append(result)
-                        pbar.update(1)
         return results
 
-    def _get_valid_sheet_data(self, filepath: str) -> pd.DataFrame | None:
+    def _get_valid_sheet_data(
+        self, filepath: str, required_columns: Optional[List[Dict]] = None
+    ) -> pd.DataFrame | None:
         """
         Interactively validates the file path and reads the spreadsheet.
         It will keep asking the user for a correct path until one is provided or the operation is cancelled.
 
+        When required_columns is given, the header is read first and the columns
+        are validated against it (see _ensure_multiple_columns_exist); only those
+        columns are then loaded. The names found in the file are written back
+        into required_columns.
+
         Args:
             filepath (str): The initial file path provided by the user.
+            required_columns (Optional[List[Dict]]): The columns to read, as
+                dicts with a "name" and a "description". Reads every column when None.
 
         Returns:
             pd.DataFrame | None: The loaded DataFrame if successful, or None if the user cancels.
@@ -107,12 +514,27 @@ class Command(ABC):
             try:
                 print(f"Reading from file: {filepath}")
                 excel_reader = ExcelReader(filepath)
-                sheet_data = excel_reader.read_spreadsheet()
-                return sheet_data
+                if required_columns is None:
+                    return excel_reader.read_spreadsheet(
+                        use_cache=self.run_options.cache_input
+                    )
+
+                header = excel_reader.read_header()
+                validated_columns = self._resolve_columns(required_columns, header)
+                if validated_columns is None:
+                    return None
+                for col_to_find, name in zip(required_columns, validated_columns):
+                    col_to_find["name"] = name
+
+                return excel_reader.read_spreadsheet(
+                    columns=validated_columns,
+                    use_cache=self.run_options.cache_input,
+                )
             except FileNotFoundError:
-                new_filepath = questionary.text(
-                    f"File '{filepath}' not found. Please enter the correct file path:"
-                ).ask()
+                new_filepath = self._ask(
+                    f"File '{filepath}' not found.",
+                    "Please enter the correct file path:",
+                )
 
                 if new_filepath is None:
                     print("Operation canceled.")
@@ -120,6 +542,54 @@ class Command(ABC):
 
                 filepath = self._normalize_filepath(new_filepath)
 
+    def _get_input_chunks(
+        self, filepath: str, required_columns: List[Dict]
+    ) -> Iterable[pd.DataFrame] | None:
+        """
+        Opens any supported input and returns its required columns in chunks.
+
+        Excel workbooks are read by _get_valid_sheet_data and returned as a
+        single chunk. Other inputs (CSV, JSONL, Parquet, plain URL lists or
+        standard input) are streamed, so their rows are only read as the
+        returned iterable is consumed. As with _get_valid_sheet_data, the
+        column names found in the input are written back into required_columns.
+
+        Args:
+            filepath (str): The input path, or '-' for standard input.
+            required_columns (List[Dict]): The columns to read, with "name" and "description".
+
+        Returns:
+            Iterable[pd.DataFrame] | None: The chunks of rows, or None if the user cancels.
+        """
+        if detect_format(filepath) == "xlsx":
+            sheet_data = self._get_valid_sheet_data(filepath, required_columns)
+            return None if sheet_data is None else [sheet_data]
+
+        while True:
+            try:
+                print(f"Reading from: {'standard input' if filepath == '-' else filepath}")
+                source = InputSource(filepath)
+                header = source.read_header()
+                if header is not None:
+                    validated_columns = self._resolve_columns(required_columns, header)
+                    if validated_columns is None:
+                        return None
+                    for col_to_find, name in zip(required_columns, validated_columns):
+                        col_to_find["name"] = name
+
+                return source.iter_chunks([col["name"] for col in required_columns])
+            except FileNotFoundError:
+                new_filepath = self._ask(
+                    f"File '{filepath}' not found.",
+                    "Please enter the correct file path:",
+                )
+
+                if new_filepath is None:
+                    print("Operation canceled.")
+                    return None
+
+                filepath = self._normalize_filepath(new_filepath)
+
     def _get_validated_urls_from_column(
         self, column: str, sheet_data: pd.DataFrame
     ) -> list[str] | None:
@@ -139,15 +609,38 @@ class Command(ABC):
                 urls_to_check = ExcelReader.read_column(sheet_data, column)
                 return urls_to_check
             except KeyError:
-                new_column = questionary.text(
-                    f"Column '{column}' not found in the spreadsheet. Please enter the correct column name:"
-                ).ask()
+                new_column = self._ask(
+                    f"Column '{column}' not found in the spreadsheet.",
+                    "Please enter the correct column name:",
+                )
 
                 if new_column is None:
                     print("Operation canceled.")
                     return None
                 column = new_column
 
+    def _iter_validated_urls(
+        self, column: str, chunks: Iterable[pd.DataFrame]
+    ) -> Iterator[str]:
+        """
+        Yields the URLs of a column over the chunks of the input.
+
+        The streamed counterpart of _get_validated_urls_from_column: if the
+        user cancels the column prompt, the input ends there.
+
+        Args:
+            column (str): The column name provided by the user.
+            chunks (Iterable[pd.DataFrame]): The chunks of the input.
+
+        Yields:
+            str: Each URL, in input order.
+        """
+        for chunk in chunks:
+            urls = self._get_validated_urls_from_column(column, chunk)
+            if urls is None:
+                return
+            yield from urls
+
     def _ensure_multiple_columns_exist(
         self, required_columns: List[Dict], sheet_data: pd.DataFrame
     ) -> Optional[List[str]]:
@@ -165,8 +658,23 @@ class Command(ABC):
                                     (preserving original casing from the file),
                                     or None if the user cancels the operation.
         """
+        return self._resolve_columns(required_columns, sheet_data.columns.tolist())
+
+    def _resolve_columns(
+        self, required_columns: List[Dict], actual_sheet_columns: List[str]
+    ) -> Optional[List[str]]:
+        """
+        Matches each required column against the given column names, case-insensitively,
+        prompting the user for a new name whenever one is not found.
+
+        Args:
+            required_columns (List[Dict]): The columns to find, with "name" and "description".
+            actual_sheet_columns (List[str]): The column names present in the file.
+
+        Returns:
+            Optional[List[str]]: The matching column names, or None if the user cancels.
+        """
         validated_columns = []
-        actual_sheet_columns = sheet_data.columns.tolist()
 
         for col_to_find in required_columns:
             current_col_name = col_to_find["name"]
@@ -175,7 +683,7 @@ class Command(ABC):
                 matching_column = None
 
                 for actual_col in actual_sheet_columns:
-                    if actual_col.lower() == current_col_name.lower():
+                    if str(actual_col).lower() == current_col_name.lower():
                         matching_column = actual_col
                         break
 
@@ -184,9 +692,10 @@ class Command(ABC):
                     break
                 else:
                     description = col_to_find["description"]
-                    new_col_name = questionary.text(
-                        f"Column '{current_col_name}', {description} not found. Please enter the correct column name:"
-                    ).ask()
+                    new_col_name = self._ask(
+                        f"Column '{current_col_name}', {description} not found.",
+                        "Please enter the correct column name:",
+                    )
 
                     if new_col_name is None:
                         print("Operation canceled.")
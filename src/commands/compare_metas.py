@@ -1,24 +1,35 @@
 import argparse
 import logging
 import requests as rq
-from tqdm import tqdm
+from typing import NamedTuple, Optional
 import pandas as pd
 from core.crawler import Crawler
-from reporting.excel_writer import ExcelWriter
-from .base_command import Command
+from core.results import STATUS_COLUMN_TYPES, STATUS_OK, error_status
+from core.timing import TIMING_COLUMN_TYPES
+from .base_command import Command, TaskPlan
 
 logger = logging.getLogger(__name__)
 
 
+class MetaCheckTask(NamedTuple):
+    """One input row of compare-metas: the meta tag to audit on a URL."""
+
+    url: str
+    meta_name: str
+    expected_content: str
+
+
 class CompareMetasCommand(Command):
 
+    queueable = True
+
     @staticmethod
     def setup_args(parser: argparse.ArgumentParser):
         parser.description = "Audits meta tag contents against an Excel spreadsheet."
 
         parser.add_argument(
             "file_path",
-            help="Path to the .xlsx file with URL, Meta Name, and Expected Content columns.",
+            help="Path to the file (.xlsx, .csv, .jsonl, .parquet) with URL, Meta Name, and Expected Content columns.",
         )
 
         parser.add_argument(
@@ -39,73 +50,59 @@ class CompareMetasCommand(Command):
             help="Name of the column with the expected content (default: 'Expected Content').",
         )
 
-    def _process_row(
-        self,
-        row: pd.Series,
-        url_col: str,
-        name_col: str,
-        content_col: str,
-        session: rq.Session,
-    ):
-        """Processes a single row from the DataFrame to audit a meta tag.
+    def _process_row(self, task: MetaCheckTask, session: rq.Session) -> tuple:
+        """Processes a single row from the input to audit a meta tag.
 
         Designed to be run in a separate thread.
 
         Args:
-            row (pd.Series): A single row from the input DataFrame.
-            args (argparse.Namespace): The command-line arguments.
+            task (MetaCheckTask): The URL, meta tag name and expected content.
             session (rq.Session): The requests.Session object for making HTTP requests.
 
         Returns:
-            dict: A dictionary containing the complete audit result for the row.
+            tuple: The report row: the task's values, the found content, whether
+                it matches, the status and error message, then the timings if
+                enabled. The found content and match are None when the page
+                could not be fetched.
         """
 
-        url = row[url_col]
-        meta_name = row[name_col]
-        expected_content = row[content_col]
+        url, meta_name, expected_content = task
+        timings: tuple = ()
+        crawler = Crawler(str(url), session, [])
 
         try:
-            crawler = Crawler(str(url), session, [])
             found_content = crawler.get_meta_content_by_name(str(meta_name))
-            is_match = str(found_content).strip() == str(expected_content).strip()
 
-            return {
-                url_col: url,
-                name_col: meta_name,
-                content_col: expected_content,
-                "Found Content": found_content or "Not Found",
-                "Match?": is_match,
-            }
-        except Exception as e:
-            logger.error(f"Error processing URL {url}: {e}")
-            return {
-                url_col: url,
-                name_col: meta_name,
-                content_col: expected_content,
-                "Found Content": f"Error: {e}",
-                "Match?": False,
-            }
+            if self.run_options.timings:
+                timings = crawler.timings.as_row()
 
-    def execute(self, args: argparse.Namespace):
-        """Executes the meta tag content comparison concurrently.
+            if crawler.fetch_error is not None:
+                error = str(crawler.fetch_error)
+                status = error_status(crawler.fetch_error)
+                return (*task, None, None, status, error, *timings)
 
-        Reads a spreadsheet with URLs, meta tag names, and expected content.
-        It then crawls each URL, compares the found content with the expected
-        content, and generates a detailed audit report in Excel.
+            is_match = str(found_content).strip() == str(expected_content).strip()
+            found = found_content or "Not Found"
+            return (*task, found, is_match, STATUS_OK, None, *timings)
+        except Exception as e:
+            logger.error("Error processing URL %s: %s", url, e)
+            return (*task, None, None, error_status(e), str(e))
+        finally:
+            crawler.record_timings()
+
+    def plan(self, args: argparse.Namespace) -> Optional[TaskPlan]:
+        """Reads the rows to audit and lays out the report.
 
         Args:
             args (argparse.Namespace): The command-line arguments, including
                 file_path and the names of the relevant columns.
-        """
-        print(">>> 'compare-metas' command activated! <<<")
-        print(f"Received arguments: {args}")
 
+        Returns:
+            Optional[TaskPlan]: The MetaCheckTasks and report layout, or None
+                if the input could not be read.
+        """
         filepath = self._normalize_filepath(args.file_path)
 
-        sheet_data = self._get_valid_sheet_data(filepath)
-        if sheet_data is None:
-            raise ValueError("No valid sheet data found in the file")
-
         required_columns = [
             {"name": args.url_col, "description": "which contains the URLs"},
             {"name": args.name_col, "description": "which contains the meta tag names"},
@@ -115,37 +112,69 @@ class CompareMetasCommand(Command):
             },
         ]
 
-        validated_columns = self._ensure_multiple_columns_exist(
-            required_columns, sheet_data
+        chunks = self._get_input_chunks(filepath, required_columns)
+        if chunks is None:
+            return None
+
+        url_col, name_col, content_col = [col["name"] for col in required_columns]
+
+        tasks_to_process = (
+            MetaCheckTask._make(values)
+            for chunk in chunks
+            for values in self._clean_dataframe(chunk, url_col)[
+                [url_col, name_col, content_col]
+            ].itertuples(index=False, name=None)
         )
 
-        if validated_columns is None:
-            return
+        columns = [
+            url_col,
+            name_col,
+            content_col,
+            "Found Content",
+            "Match?",
+            *STATUS_COLUMN_TYPES,
+        ]
+        column_types = {name_col: "category", "Match?": "boolean"}
+        column_types.update(STATUS_COLUMN_TYPES)
+        if self.run_options.timings:
+            columns += list(TIMING_COLUMN_TYPES)
+            column_types.update(TIMING_COLUMN_TYPES)
+
+        return TaskPlan(
+            "compare_metas_results", columns, column_types, tasks_to_process
+        )
 
-        url_col, name_col, content_col = validated_columns
+    def task_function(self, args: argparse.Namespace):
+        return self._process_row
 
-        sheet_data = self._clean_dataframe(sheet_data, url_col)
+    @staticmethod
+    def task_url(task: MetaCheckTask) -> str:
+        return str(task.url)
 
-        tasks_to_process = [row for index, row in sheet_data.iterrows()]
+    @staticmethod
+    def decode_task(payload) -> MetaCheckTask:
+        return MetaCheckTask._make(payload)
 
-        task_function = lambda task, session: self._process_row(
-            task, url_col, name_col, content_col, session
-        )
+    @staticmethod
+    def task_values(task: MetaCheckTask) -> tuple:
+        return tuple(task)
 
-        desc_provider = lambda task: task[url_col]
+    def execute(self, args: argparse.Namespace):
+        """Executes the meta tag content comparison concurrently.
 
-        report_data = self._run_concurrent_tasks(
-            tasks=tasks_to_process,
-            task_function=task_function,
-            desc_provider=desc_provider,
-            pbar_color="red",
-        )
+        Reads a spreadsheet with URLs, meta tag names, and expected content.
+        It then crawls each URL, compares the found content with the expected
+        content, and generates a detailed audit report in Excel.
+
+        Args:
+            args (argparse.Namespace): The command-line arguments, including
+                file_path and the names of the relevant columns.
+        """
+        print(">>> 'compare-metas' command activated! <<<")
+        print(f"Received arguments: {args}")
 
-        if not report_data:
-            print("No data was processed. No report will be generated.")
+        plan = self.plan(args)
+        if plan is None:
             return
 
-        df = pd.DataFrame(report_data)
-        ExcelWriter.create_spreadsheet_with_results(
-            df, "results/compare_metas_results.xlsx"
-        )
+        self._run_plan(args, plan, pbar_color="red")
@@ -0,0 +1,163 @@
+import argparse
+import logging
+import re
+from typing import Dict, List, Optional
+import pandas as pd
+from core.sharding import SHARD_COLUMN
+from reporting.input_source import detect_format
+from .base_command import Command
+
+logger = logging.getLogger(__name__)
+
+SHARD_NAME = re.compile(r"^(?P<name>.+)\.shard-(?P<shard>\d+)-of-(?P<count>\d+)$")
+
+
+class MergeResultsCommand(Command):
+
+    @staticmethod
+    def setup_args(parser: argparse.ArgumentParser):
+        parser.description = (
+            "Merges the per-shard reports of a --shard run into one report, in input order."
+        )
+
+        parser.add_argument(
+            "reports",
+            nargs="+",
+            help="The per-shard report files (.xlsx, .csv, .jsonl, .parquet).",
+        )
+        parser.add_argument(
+            "--name",
+            help="Name of the merged report in results/ (default: the shards' name without the shard suffix).",
+        )
+
+    @staticmethod
+    def _report_name(path: str) -> str:
+        """Returns a report's file name without its directory and extensions."""
+        name = re.split(r"[\\/]", path)[-1]
+        for suffix in (".gz", ".bz2", ".xz"):
+            name = name.removesuffix(suffix)
+        return name.rsplit(".", 1)[0]
+
+    def _read_report(self, path: str) -> Optional[pd.DataFrame]:
+        """
+        Reads one per-shard report, keeping only its result rows.
+
+        Args:
+            path (str): The report file.
+
+        Returns:
+            Optional[pd.DataFrame]: The rows, or None if the file can't be read
+                or was not written by a --shard run.
+        """
+        report_format = detect_format(path)
+        try:
+            if report_format == "xlsx":
+                sheets = pd.read_excel(path, sheet_name=None)
+                df = pd.concat(sheets.values(), ignore_index=True)
+            elif report_format == "csv":
+                df = pd.read_csv(path, keep_default_na=False, na_values=[""])
+            elif report_format == "jsonl":
+                df = pd.read_json(path, lines=True, dtype=False)
+            elif report_format == "parquet":
+                df = pd.read_parquet(path)
+            else:
+                print(f"Error: '{path}' is not a report format that can be merged.")
+                return None
+        except (OSError, ValueError) as e:
+            logger.error("Could not read shard report %s: %s", path, e)
+            print(f"Error: could not read '{path}': {e}")
+            return None
+
+        if SHARD_COLUMN not in df.columns:
+            print(f"Error: '{path}' has no '{SHARD_COLUMN}' column; was it run with --shard?")
+            return None
+
+        # Excel sheets end with the signature row, which has no input row.
+        df[SHARD_COLUMN] = pd.to_numeric(df[SHARD_COLUMN], errors="coerce")
+        return df.dropna(subset=[SHARD_COLUMN])
+
+    def _check_shards(self, paths: List[str]):
+        """Warns when the reports don't cover every shard of the run."""
+        shards_by_count: Dict[int, set] = {}
+        for path in paths:
+            match = SHARD_NAME.match(self._report_name(path))
+            if match:
+                count = int(match["count"])
+                shards_by_count.setdefault(count, set()).add(int(match["shard"]))
+
+        for count, shards in shards_by_count.items():
+            missing = sorted(set(range(1, count + 1)) - shards)
+            if missing:
+                listed = ", ".join(f"{shard}/{count}" for shard in missing)
+                print(f"Warning: the shards {listed} are missing from the merge.")
+
+    @staticmethod
+    def _column_types(df: pd.DataFrame) -> Dict[str, str]:
+        """Infers the report column types back from the loaded shards."""
+        column_types = {}
+        for column in df.columns:
+            values = df[column]
+            if values.isna().all():
+                continue
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                column_types[column] = "category"
+            elif pd.api.types.is_bool_dtype(values.dtype) or (
+                values.dtype == object and values.dropna().map(type).eq(bool).all()
+            ):
+                column_types[column] = "boolean"
+            elif pd.api.types.is_integer_dtype(values.dtype):
+                column_types[column] = "int"
+            elif pd.api.types.is_float_dtype(values.dtype):
+                column_types[column] = "float"
+        return column_types
+
+    def execute(self, args: argparse.Namespace):
+        """
+        Merges per-shard reports into the final report.
+
+        Every shard report starts with the input position of each result, so
+        the merged rows are sorted on it and the column is dropped. The
+        shards are loaded in memory for the sort.
+
+        Args:
+            args (argparse.Namespace): The parsed command-line arguments.
+        """
+        if self.run_options.shard is not None:
+            print("Error: merge combines shards and doesn't take --shard.")
+            return
+
+        frames = []
+        for path in args.reports:
+            df = self._read_report(path)
+            if df is None:
+                return
+            frames.append(df)
+
+        self._check_shards(args.reports)
+
+        merged = pd.concat(frames, ignore_index=True)
+        merged = merged.sort_values(SHARD_COLUMN, kind="stable")
+        duplicates = merged[SHARD_COLUMN].duplicated()
+        if duplicates.any():
+            print(
+                f"Warning: {int(duplicates.sum())} input rows appear in more than "
+                "one shard; keeping the first."
+            )
+            merged = merged[~duplicates]
+
+        columns = [column for column in merged.columns if column != SHARD_COLUMN]
+        merged = merged[columns]
+
+        name = args.name
+        if not name:
+            first = self._report_name(args.reports[0])
+            match = SHARD_NAME.match(first)
+            name = match["name"] if match else f"{first}_merged"
+
+        with self._create_result_writer(
+            name, columns, self._column_types(merged)
+        ) as writer:
+            for row in merged.itertuples(index=False, name=None):
+                writer.write(row)
+
+        print(f"Merged {writer.rows_written} rows from {len(frames)} shard reports.")
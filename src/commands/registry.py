@@ -0,0 +1,149 @@
+"""
+Lightweight descriptors for the CLI commands.
+
+The command modules pull in pandas, bs4, requests and the spreadsheet
+libraries, so the CLI only imports the module of the command that actually
+runs. Everything needed to list the commands (name and description) lives
+here, without any heavy import.
+"""
+
+import argparse
+import importlib
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .base_command import Command
+
+
+@dataclass
+class CommandSpec:
+    """Describes a command and where to load its implementation from.
+
+    Attributes:
+        name (str): The subcommand name on the command line.
+        description (str): A one-line description, shown in --help and in the
+            interactive menu.
+        module (str): The module holding the command class.
+        class_name (str): The name of the Command subclass in that module.
+    """
+
+    name: str
+    description: str
+    module: str
+    class_name: str
+    _instance: Optional["Command"] = field(default=None, repr=False, compare=False)
+
+    def load(self) -> "Command":
+        """Imports the command's module and returns its (cached) instance."""
+        if self._instance is None:
+            self._instance = self.create()
+        return self._instance
+
+    def create(self) -> "Command":
+        """Imports the command's module and returns a new instance."""
+        command_class = getattr(importlib.import_module(self.module), self.class_name)
+        return command_class()
+
+    def prepare(self, argv: List[str]) -> Tuple["Command", argparse.Namespace]:
+        """Parses a command line for this command, as the CLI would.
+
+        Used to run a command outside of the CLI (e.g. a queued job): the
+        returned instance has its own engine options.
+
+        Args:
+            argv (List[str]): The command's arguments, without its name.
+
+        Returns:
+            Tuple[Command, argparse.Namespace]: A new, configured instance and
+                the parsed arguments.
+
+        Raises:
+            SystemExit: If the arguments are invalid (argparse prints why).
+        """
+        from core.run_options import RunOptions
+        from core.session import SessionOptions
+
+        command = self.create()
+        parser = argparse.ArgumentParser(
+            prog=f"seo-helper {self.name}", description=self.description
+        )
+        command.setup_args(parser)
+        command.add_engine_args(parser)
+        args = parser.parse_args(argv)
+        command.session_options = SessionOptions.from_args(args)
+        command.run_options = RunOptions.from_args(args)
+        return command, args
+
+
+def default_commands() -> Dict[str, CommandSpec]:
+    """Returns fresh descriptors for every command the CLI offers."""
+    specs = [
+        CommandSpec(
+            "scan-metas",
+            "Scans a list of URLs for specific meta tags.",
+            "commands.scan_metas",
+            "ScanMetasCommand",
+        ),
+        CommandSpec(
+            "compare-metas",
+            "Audits meta tag contents against an Excel spreadsheet.",
+            "commands.compare_metas",
+            "CompareMetasCommand",
+        ),
+        CommandSpec(
+            "sitemap-check",
+            "Scan a sitemap and audits against a excel spreadsheet",
+            "commands.sitemap_check",
+            "SitemapCheckCommand",
+        ),
+        CommandSpec(
+            "sitemap-health",
+            "Checks that every URL of a sitemap answers 200, doesn't redirect and isn't noindex.",
+            "commands.sitemap_health",
+            "SitemapHealthCommand",
+        ),
+        CommandSpec(
+            "status-check",
+            "Reports the HTTP status and redirects of a list of URLs, without downloading them.",
+            "commands.status_check",
+            "StatusCheckCommand",
+        ),
+        CommandSpec(
+            "audit",
+            "Runs several checks from a JSON plan, fetching each URL only once.",
+            "commands.audit",
+            "AuditCommand",
+        ),
+        CommandSpec(
+            "merge",
+            "Merges the per-shard reports of a --shard run into one report, in input order.",
+            "commands.merge_results",
+            "MergeResultsCommand",
+        ),
+        CommandSpec(
+            "submit",
+            "Queues a scan-metas, compare-metas or status-check run for the queue workers.",
+            "commands.submit",
+            "SubmitCommand",
+        ),
+        CommandSpec(
+            "worker",
+            "Runs queued jobs on worker processes, sharing a per-host rate budget.",
+            "commands.worker",
+            "WorkerCommand",
+        ),
+        CommandSpec(
+            "status",
+            "Shows the queued jobs and their progress.",
+            "commands.status",
+            "StatusCommand",
+        ),
+        CommandSpec(
+            "serve",
+            "Runs a local daemon that keeps sessions and workers warm between commands.",
+            "commands.serve",
+            "ServeCommand",
+        ),
+    ]
+    return {spec.name: spec for spec in specs}
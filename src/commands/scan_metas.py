@@ -1,24 +1,29 @@
 import argparse
+from typing import Optional
 
-import questionary
-from reporting.excel_reader import ExcelReader
-from reporting.excel_writer import ExcelWriter
 import requests as rq
 from core.crawler import Crawler
+from core.results import STATUS_COLUMN_TYPES, STATUS_OK, error_status
+from core.selectors import SelectorSet, meta_checks, parse_selector_check
+from core.timing import TIMING_COLUMN_TYPES
 import logging
-import pandas as pd
-from .base_command import Command
+from .base_command import Command, TaskPlan
 
 logger = logging.getLogger(__name__)
 
 
 class ScanMetasCommand(Command):
 
+    queueable = True
+
     @staticmethod
     def setup_args(parser: argparse.ArgumentParser):
         parser.description = "Scans a list of URLs for specific meta tags."
 
-        parser.add_argument("file_path", help="Path to the .xlsx file with URLs.")
+        parser.add_argument(
+            "file_path",
+            help="Path to the file with URLs (.xlsx, .csv, .jsonl, .parquet, .txt) or - for stdin.",
+        )
         parser.add_argument(
             "column_name", help="Name of the column containing the URLs."
         )
@@ -28,8 +33,38 @@ class ScanMetasCommand(Command):
             default=["robots"],
             help="A list of meta tags to check (e.g., robots description viewport).",
         )
+        parser.add_argument(
+            "--select",
+            action="append",
+            default=[],
+            type=parse_selector_check,
+            metavar="NAME[:RESULT]=EXPR",
+            help=(
+                "An extra check, as a CSS selector or an XPath expression (starting "
+                "with '/'), reported in the NAME column. RESULT is 'exists' (default), "
+                "'value' (the first match's text, or attribute with '::attr(name)' in "
+                "CSS) or 'count'. Can be repeated, e.g. "
+                "--select 'canonical:value=link[rel=canonical]::attr(href)' "
+                "--select 'hreflang:count=//link[@hreflang]'."
+            ),
+        )
+
+    @staticmethod
+    def _selector_set(args: argparse.Namespace) -> SelectorSet:
+        """Compiles the run's checks: the --checks meta tags, then the --select ones.
 
-    def _process_url(self, url: str, checks: list[str], session: rq.Session) -> dict:
+        Raises:
+            ValueError: If a check can't be compiled or two checks share a name.
+        """
+        return SelectorSet([*meta_checks(args.checks), *args.select])
+
+    def _process_url(
+        self,
+        url: str,
+        checks: list[str],
+        session: rq.Session,
+        selectors: Optional[SelectorSet] = None,
+    ) -> tuple:
         """Processes a single URL to scan for specified meta tags.
 
         Designed to be run in a separate thread.
@@ -38,64 +73,101 @@ class ScanMetasCommand(Command):
             url (str): The URL to be processed.
             checks (list[str]): A list of meta tag names to scan for.
             session (rq.Session): The requests.Session object for making HTTP requests.
+            selectors (Optional[SelectorSet]): The compiled checks of the run,
+                which replace `checks` when given.
 
         Returns:
-            dict: A dictionary containing the URL and the scan results.
+            tuple: The report row: the URL, one result per check (True/False,
+                a value or a count), the status and error message, then the
+                timings if enabled. The checks are None when the page could
+                not be fetched.
         """
+        if selectors is not None:
+            checks = selectors.names
+        timings: tuple = ()
+        crawler = Crawler(url, session, checks, selectors=selectors)
         try:
-            crawler = Crawler(url, session, checks)
             results = crawler.execute_scan()
 
-            return {"URL": url, **results}
+            if self.run_options.timings:
+                timings = crawler.timings.as_row()
 
-        except Exception as e:
-            logger.error(f"'{url}' generated an exception: {e}")
+            if crawler.fetch_error is not None:
+                missing = (None for _ in checks)
+                error = str(crawler.fetch_error)
+                status = error_status(crawler.fetch_error)
+                return (url, *missing, status, error, *timings)
 
-            error_results = {check: "Error" for check in checks}
-            return {"URL": url, **error_results}
+            found = (results[check] for check in checks)
+            return (url, *found, STATUS_OK, None, *timings)
 
-    def execute(self, args: argparse.Namespace):
-        """Executes the meta tag scan concurrently based on user arguments.
+        except Exception as e:
+            logger.error("'%s' generated an exception: %s", url, e)
 
-        Reads a list of URLs from a spreadsheet, processes them in parallel to
-        check for the existence of specified meta tags, and generates an Excel
-        report with the results.
+            return (url, *(None for _ in checks), error_status(e), str(e))
+        finally:
+            crawler.record_timings()
+
+    def plan(self, args: argparse.Namespace) -> Optional[TaskPlan]:
+        """Reads the URLs to scan and lays out the report: one column per check.
 
         Args:
             args (argparse.Namespace): The command-line arguments, including
-                file_path, column_name, and checks.
+                file_path, column_name, checks and select.
+
+        Returns:
+            Optional[TaskPlan]: The URLs and report layout, or None if a check
+                is invalid or the input could not be read.
         """
-        print(">>> 'scan-metas' command activated! <<<")
+        try:
+            selectors = self._selector_set(args)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return None
 
         filepath = self._normalize_filepath(args.file_path)
-        sheet_data = self._get_valid_sheet_data(filepath)
-        if sheet_data is None:
-            return
-
-        column = args.column_name
-        urls_to_check = self._get_validated_urls_from_column(column, sheet_data)
-        if urls_to_check is None:
-            return
-
-        task_function = lambda url, session: self._process_url(
-            url, args.checks, session
+        required_columns = [
+            {"name": args.column_name, "description": "which contains the URLs"}
+        ]
+        chunks = self._get_input_chunks(filepath, required_columns)
+        if chunks is None:
+            return None
+
+        column = required_columns[0]["name"]
+        urls_to_check = self._iter_validated_urls(column, chunks)
+
+        columns = ["URL", *selectors.names, *STATUS_COLUMN_TYPES]
+        column_types = selectors.column_types()
+        column_types.update(STATUS_COLUMN_TYPES)
+        if self.run_options.timings:
+            columns += list(TIMING_COLUMN_TYPES)
+            column_types.update(TIMING_COLUMN_TYPES)
+
+        return TaskPlan("scan_metas_results", columns, column_types, urls_to_check)
+
+    def task_function(self, args: argparse.Namespace):
+        # Compiled once here, then shared by every URL of the run.
+        selectors = self._selector_set(args)
+        return lambda url, session: self._process_url(
+            url, args.checks, session, selectors
         )
 
-        desc_provider = lambda task: task
+    def execute(self, args: argparse.Namespace):
+        """Executes the meta tag scan concurrently based on user arguments.
+
+        Reads a list of URLs from a spreadsheet, processes them in parallel to
+        check for the existence of specified meta tags (and the --select
+        checks), and generates an Excel report with the results.
 
-        report_data = self._run_concurrent_tasks(
-            tasks=urls_to_check,
-            task_function=task_function,
-            desc_provider=desc_provider,
-            pbar_color="green",
-        )
+        Args:
+            args (argparse.Namespace): The command-line arguments, including
+                file_path, column_name, checks and select.
+        """
+        print(">>> 'scan-metas' command activated! <<<")
 
-        if not report_data:
-            print("No data was processed. No report will be generated.")
+        plan = self.plan(args)
+        if plan is None:
             return
 
-        logger.info("Scan concluído. Gerando relatório.")
-        report_df = pd.DataFrame(report_data)
-        ExcelWriter.create_spreadsheet_with_results(
-            report_df, "results/scan_metas_results.xlsx"
-        )
+        if self._run_plan(args, plan, pbar_color="green"):
+            logger.info("Scan concluído. Relatório gerado.")
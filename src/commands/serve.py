@@ -0,0 +1,125 @@
+import argparse
+import io
+import logging
+import os
+from contextlib import redirect_stderr, redirect_stdout
+from typing import List, Tuple
+from core.daemon import DEFAULT_PORT, DaemonServer, find_daemon, stop_daemon
+from . import base_command
+from .base_command import Command, WarmPool
+
+logger = logging.getLogger(__name__)
+
+
+class ServeCommand(Command):
+
+    @staticmethod
+    def setup_args(parser: argparse.ArgumentParser):
+        parser.description = (
+            "Runs a local daemon that keeps sessions and workers warm between commands."
+        )
+
+        parser.add_argument(
+            "--port",
+            type=int,
+            default=DEFAULT_PORT,
+            help=f"Port to listen on, on 127.0.0.1 (default: {DEFAULT_PORT}).",
+        )
+        parser.add_argument(
+            "--socket",
+            metavar="PATH",
+            help="Listen on this Unix socket instead of a TCP port.",
+        )
+        parser.add_argument(
+            "--stop",
+            action="store_true",
+            help="Stop the running daemon.",
+        )
+
+    def _run_job(self, app, argv: List[str], cwd: str) -> Tuple[int, str]:
+        """
+        Runs one command line as the CLI would, in the client's directory.
+
+        Designed to be called by the DaemonServer, one job at a time: the
+        working directory and the standard streams are process-wide.
+
+        Args:
+            app (CliApp): The application that parses and runs the command.
+            argv (List[str]): The command line, without the program name.
+            cwd (str): The client's working directory.
+
+        Returns:
+            Tuple[int, str]: The exit code and the command's output.
+        """
+        command = app._requested_command(argv)
+        if command in ("serve", "worker"):
+            return 2, f"Error: the daemon can't run the {command} command.\n"
+        if "--progress" not in argv:
+            argv = [*argv, "--progress", "none"]
+
+        output = io.StringIO()
+        previous_cwd = os.getcwd()
+        exit_code = 0
+        try:
+            os.chdir(cwd)
+            with redirect_stdout(output), redirect_stderr(output):
+                app.run_direct_mode(argv)
+        except SystemExit as e:
+            exit_code = e.code if isinstance(e.code, int) else int(e.code is not None)
+        except OSError as e:
+            output.write(f"Error: could not run in '{cwd}': {e}\n")
+            exit_code = 1
+        finally:
+            os.chdir(previous_cwd)
+
+        logger.info("Daemon job %s finished with exit code %d", argv, exit_code)
+        return exit_code, output.getvalue()
+
+    def execute(self, args: argparse.Namespace):
+        """
+        Starts the daemon and serves jobs until Ctrl+C or `serve --stop`.
+
+        While it runs, the engine reuses one warm pool of sessions and
+        worker threads, and commands never prompt for corrections.
+
+        Args:
+            args (argparse.Namespace): The parsed command-line arguments.
+        """
+        if args.stop:
+            daemon = find_daemon()
+            if daemon is None:
+                print("No daemon is running.")
+                return
+            stop_daemon(daemon)
+            print(f"Stopped the daemon at {daemon['address']}.")
+            return
+
+        if find_daemon() is not None:
+            print("A daemon is already running. Stop it first with 'serve --stop'.")
+            return
+
+        # Jobs go through the regular CLI, so they parse and behave the same.
+        from cli import CliApp
+
+        app = CliApp()
+        server = DaemonServer(
+            lambda argv, cwd: self._run_job(app, argv, cwd),
+            port=args.port,
+            socket_path=args.socket,
+        )
+
+        base_command.warm_pool = WarmPool()
+        Command.interactive = False
+        try:
+            server.start()
+            print(f"SEO Helper daemon listening on {server.address}.")
+            print("Commands run from this machine are now forwarded to it.")
+            print("Press Ctrl+C (or run 'serve --stop') to stop it.")
+            server.wait()
+        except KeyboardInterrupt:
+            print("\nStopping the daemon...")
+        finally:
+            server.stop()
+            base_command.warm_pool.close()
+            base_command.warm_pool = None
+            Command.interactive = True
@@ -1,10 +1,10 @@
 from commands.base_command import Command
 import argparse
+import itertools
 import pandas as pd
 import logging
-import requests as rq
 from core.crawler import Crawler
-from reporting.excel_writer import ExcelWriter
+from core.session import CrawlSession
 from typing import Optional
 
 logger = logging.getLogger(__name__)
@@ -18,7 +18,7 @@ class SitemapCheckCommand(Command):
 
         parser.add_argument(
             "file_path",
-            help="Path to the .xlsx file with Sitemap URL and Expected URLS columns.",
+            help="Path to the file (.xlsx, .csv, .jsonl, .parquet) with Sitemap URL and Expected URLS columns.",
         )
 
         parser.add_argument(
@@ -33,32 +33,24 @@ class SitemapCheckCommand(Command):
             help="Name of the column with the expected URLS (default: 'Expected URLS').",
         )
 
-    def _process_row(
-        self, row: pd.Series, urls_col: str, sitemap_urls_set: set
-    ) -> dict:
+    def _process_row(self, url: str, sitemap_urls_set: set) -> tuple:
         """
-        Processes a single row from the DataFrame to check if its URL is
-        present in the set of URLs from the sitemap.
+        Checks if a single URL from the input is present in the set of URLs
+        from the sitemap.
 
         This function is designed to be run concurrently and performs no
         network operations.
 
         Args:
-            row (pd.Series): A single row from the input DataFrame.
-            urls_col (str): The name of the column containing the URL to check.
+            url (str): The expected URL to check.
             sitemap_urls_set (set): A set of all URLs found in the sitemap for
                                     fast, case-sensitive lookups.
 
         Returns:
-            dict: A dictionary containing the URL and the result of the check.
+            tuple: The report row: the stripped URL and whether it was found.
         """
-        url_to_check = str(row[urls_col]).strip()
-        is_in_sitemap = url_to_check in sitemap_urls_set
-
-        return {
-            urls_col: url_to_check,
-            "Found in Sitemap?": is_in_sitemap,
-        }
+        url_to_check = str(url).strip()
+        return (url_to_check, url_to_check in sitemap_urls_set)
 
     def _fetch_and_prepare_sitemap_set(
         self, sheet_data: pd.DataFrame, sitemap_col: str
@@ -85,10 +77,11 @@ class SitemapCheckCommand(Command):
         sitemap_url = str(sheet_data[sitemap_col].iloc[0])
         print(f"Sitemap URL to be analyzed: {sitemap_url}")
 
-        with rq.Session() as session:
+        with CrawlSession(self.session_options) as session:
             crawler = Crawler(sitemap_url, session, [])
             print("Fetching and parsing sitemap... This may take a moment.")
             sitemap_urls = crawler.fetch_sitemap_urls()
+            self._print_timing_summary(session)
 
         if sitemap_urls is None:
             print("Could not read the sitemap...")
@@ -105,50 +98,52 @@ class SitemapCheckCommand(Command):
 
         filepath = self._normalize_filepath(args.file_path)
 
-        sheet_data = self._get_valid_sheet_data(filepath)
-        if sheet_data is None:
-            return
-
         required_columns = [
             {"name": args.sitemap_col, "description": "Which contains the Sitemap URL"},
             {"name": args.urls_col, "description": "Which contains the expected URLs"},
         ]
 
-        validated_columns = self._ensure_multiple_columns_exist(
-            required_columns, sheet_data
-        )
-        if validated_columns is None:
+        chunks = self._get_input_chunks(filepath, required_columns)
+        if chunks is None:
             return
 
-        sitemap_col, urls_col = validated_columns
+        sitemap_col, urls_col = [col["name"] for col in required_columns]
 
-        sheet_data = self._clean_dataframe(sheet_data, urls_col)
+        cleaned_chunks = (self._clean_dataframe(chunk, urls_col) for chunk in chunks)
+        first_chunk = next(cleaned_chunks, None)
+        if first_chunk is None or first_chunk.empty:
+            print("No data was processed. No report will be generated.")
+            return
 
-        sitemap_urls_set = self._fetch_and_prepare_sitemap_set(sheet_data, sitemap_col)
+        sitemap_urls_set = self._fetch_and_prepare_sitemap_set(first_chunk, sitemap_col)
 
         if sitemap_urls_set is None:
             return
 
-        tasks_to_process = [row for _, row in sheet_data.iterrows()]
-
-        task_function = lambda task, session: self._process_row(
-            task, urls_col, sitemap_urls_set
+        tasks_to_process = (
+            url
+            for chunk in itertools.chain([first_chunk], cleaned_chunks)
+            for url in chunk[urls_col].tolist()
         )
 
-        desc_provider = lambda task: str(task[urls_col])
-
-        report_data = self._run_concurrent_tasks(
-            tasks=tasks_to_process,
-            task_function=task_function,
-            desc_provider=desc_provider,
-            pbar_color="blue",
+        task_function = lambda task, session: self._process_row(
+            task, sitemap_urls_set
         )
 
-        if not report_data:
+        desc_provider = lambda task: str(task)
+
+        with self._create_result_writer(
+            "sitemap_check_results",
+            [urls_col, "Found in Sitemap?"],
+            {"Found in Sitemap?": "boolean"},
+        ) as writer:
+            self._run_concurrent_tasks(
+                tasks=tasks_to_process,
+                task_function=task_function,
+                desc_provider=desc_provider,
+                pbar_color="blue",
+                on_result=writer.write,
+            )
+
+        if not writer.rows_written:
             print("No data was processed. No report will be generated.")
-            return
-
-        report_df = pd.DataFrame(report_data)
-        ExcelWriter.create_spreadsheet_with_results(
-            report_df, "results/sitemap_check_results.xlsx"
-        )
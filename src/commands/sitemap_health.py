@@ -0,0 +1,320 @@
+import argparse
+import logging
+import re
+from dataclasses import dataclass
+from typing import Dict, Mapping, Optional
+from urllib.parse import urljoin
+import requests as rq
+from requests.utils import parse_header_links
+from core.crawler import Crawler, SitemapEntry
+from core.results import STATUS_COLUMN_TYPES, STATUS_OK, error_status
+from core.selectors import VALUE, XPATH, SelectorCheck, SelectorSet, meta_selector
+from core.session import CrawlSession
+from core.urls import canonicalize_url
+from .base_command import Command
+
+logger = logging.getLogger(__name__)
+
+REPORT_COLUMN_TYPES = {
+    "Sitemap": "category",
+    "URL": "string",
+    "Status Code": "int",
+    "Final URL": "string",
+    "Canonical": "string",
+    "X-Robots-Tag": "string",
+    "Meta Robots": "string",
+    "Redirected?": "boolean",
+    "Canonical Elsewhere?": "boolean",
+    "Noindex?": "boolean",
+    "Healthy?": "boolean",
+    **STATUS_COLUMN_TYPES,
+}
+SUMMARY_COLUMN_TYPES = {
+    "Sitemap": "string",
+    "URLs": "int",
+    "Healthy": "int",
+    "Not 200": "int",
+    "Redirected": "int",
+    "Canonical Elsewhere": "int",
+    "Noindex": "int",
+    "Request Errors": "int",
+    "Sitemap Error": "string",
+}
+
+_ROBOTS_TOKENS = re.compile(r"[\s,:]+")
+
+# The checks run on each page's <head>, compiled once.
+HEAD_CHECKS = SelectorSet(
+    [
+        meta_selector("robots", VALUE).check,
+        SelectorCheck(
+            "canonical",
+            "//link[contains(concat(' ', normalize-space(translate(@rel, "
+            "'CANONICAL', 'canonical')), ' '), ' canonical ')]",
+            XPATH,
+            VALUE,
+            attribute="href",
+        ),
+    ]
+)
+
+
+def _is_noindex(x_robots_tag: Optional[str]) -> bool:
+    """Tells whether an X-Robots-Tag or robots meta tag value (for any user agent) forbids indexing."""
+    if not x_robots_tag:
+        return False
+    tokens = _ROBOTS_TOKENS.split(x_robots_tag.lower())
+    return "noindex" in tokens or "none" in tokens
+
+
+def _link_canonical(headers: Mapping[str, str], base_url: str) -> Optional[str]:
+    """Returns the absolute URL of the Link: <...>; rel="canonical" header, if any."""
+    links = headers.get("Link")
+    if not links:
+        return None
+    for link in parse_header_links(links):
+        if "canonical" in link.get("rel", "").lower().split():
+            return urljoin(base_url, link["url"])
+    return None
+
+
+@dataclass
+class SitemapSummary:
+    """The error counts of the URLs listed by one sitemap file."""
+
+    urls: int = 0
+    healthy: int = 0
+    not_200: int = 0
+    redirected: int = 0
+    canonical_elsewhere: int = 0
+    noindex: int = 0
+    request_errors: int = 0
+    sitemap_error: Optional[str] = None
+
+    def add(self, row: tuple):
+        """Counts one report row of the sitemap."""
+        values = dict(zip(REPORT_COLUMN_TYPES, row))
+        self.urls += 1
+        if values["Status"] != STATUS_OK:
+            self.request_errors += 1
+            return
+        self.healthy += bool(values["Healthy?"])
+        self.not_200 += values["Status Code"] != 200
+        self.redirected += bool(values["Redirected?"])
+        self.canonical_elsewhere += bool(values["Canonical Elsewhere?"])
+        self.noindex += bool(values["Noindex?"])
+
+
+class SitemapHealthCommand(Command):
+
+    @staticmethod
+    def setup_args(parser: argparse.ArgumentParser):
+        parser.description = (
+            "Checks that every URL of a sitemap answers 200, doesn't redirect, isn't "
+            "noindex and has no canonical pointing elsewhere, reading only the page's "
+            "<head> and response headers."
+        )
+
+        parser.add_argument(
+            "sitemap_url",
+            help="URL of the sitemap or sitemap index to check.",
+        )
+        parser.add_argument(
+            "--headers-only",
+            action="store_true",
+            help=(
+                "Send HEAD requests and check only the X-Robots-Tag and Link "
+                "response headers, not the robots meta tag or canonical link of "
+                "the HTML (faster, but misses most noindex and canonical tags)."
+            ),
+        )
+
+    def _check_entry(
+        self, entry: SitemapEntry, session: rq.Session, read_head: bool = True
+    ) -> tuple:
+        """Checks one sitemap URL's status, redirects, canonical and robots directives.
+
+        Designed to be run in a separate thread. The page is read only up to
+        the end of its <head>, where the robots meta tag and canonical link
+        are; with read_head False, a HEAD request is sent and only the
+        X-Robots-Tag and Link headers are checked.
+
+        Args:
+            entry (SitemapEntry): The URL and the sitemap file listing it.
+            session (rq.Session): The requests.Session object for making HTTP requests.
+            read_head (bool): Whether to read the HTML <head> too.
+
+        Returns:
+            tuple: The report row: the sitemap, the URL, the status code,
+                final URL, canonical (the HTML link, else the Link header),
+                X-Robots-Tag and robots meta tag, whether it redirected, has
+                a canonical pointing elsewhere or is noindex, whether it is
+                healthy (none of these and a 200), then the status and error
+                message.
+        """
+        url, sitemap = entry
+        crawler = Crawler(url, session, [], selectors=HEAD_CHECKS)
+        try:
+            result = crawler.check_status(read_head=read_head)
+            headers = crawler.response_headers
+            tags = (
+                crawler.execute_scan()
+                if read_head
+                else {"robots": None, "canonical": None}
+            )
+
+            html_canonical = (
+                urljoin(result.final_url, tags["canonical"])
+                if tags["canonical"]
+                else None
+            )
+            canonicals = [
+                c
+                for c in (html_canonical, _link_canonical(headers, result.final_url))
+                if c is not None
+            ]
+            x_robots_tag = headers.get("X-Robots-Tag")
+            meta_robots = tags["robots"]
+            redirected = bool(result.redirects)
+            elsewhere = any(
+                canonicalize_url(c) != canonicalize_url(url) for c in canonicals
+            )
+            noindex = _is_noindex(x_robots_tag) or _is_noindex(meta_robots)
+            healthy = (
+                result.status_code == 200
+                and not redirected
+                and not elsewhere
+                and not noindex
+            )
+            return (
+                sitemap,
+                url,
+                result.status_code,
+                result.final_url,
+                canonicals[0] if canonicals else None,
+                x_robots_tag,
+                meta_robots,
+                redirected,
+                elsewhere,
+                noindex,
+                healthy,
+                STATUS_OK,
+                None,
+            )
+
+        except Exception as e:
+            logger.error("'%s' generated an exception: %s", url, e)
+            missing = (None for _ in range(len(REPORT_COLUMN_TYPES) - 4))
+            return (sitemap, url, *missing, error_status(e), str(e))
+        finally:
+            crawler.record_timings()
+
+    def _print_summary(self, summaries: Dict[str, SitemapSummary]):
+        """Prints one line per sitemap file, the failing ones first."""
+        print("\nPer-sitemap summary:")
+        print(
+            f"{'URLs':>8} {'Healthy':>8} {'Not 200':>8} {'Redir.':>7} "
+            f"{'Canon.':>7} {'Noindex':>8} {'Errors':>7}  Sitemap"
+        )
+        ordered = sorted(
+            summaries.items(),
+            key=lambda item: (item[1].healthy - item[1].urls, item[0]),
+        )
+        for sitemap, s in ordered:
+            line = (
+                f"{s.urls:>8} {s.healthy:>8} {s.not_200:>8} {s.redirected:>7} "
+                f"{s.canonical_elsewhere:>7} {s.noindex:>8} {s.request_errors:>7}  {sitemap}"
+            )
+            if s.sitemap_error is not None:
+                line += f"  (could not be read: {s.sitemap_error})"
+            print(line)
+
+    def execute(self, args: argparse.Namespace):
+        """Checks every URL listed in a sitemap and its child sitemaps.
+
+        The sitemap is traversed while its URLs are being checked: each child
+        sitemap's URLs go into the engine's bounded task window as soon as
+        the child is parsed, so the full URL set is never held in memory.
+        Each URL is read up to the end of its <head> (or, with
+        --headers-only, gets a HEAD request as in status-check); its status
+        code, redirects, canonical link and robots directives are checked.
+        Besides the per-URL report, a per-sitemap summary of the failures is
+        printed and written to 'results/sitemap_health_summary'.
+
+        Args:
+            args (argparse.Namespace): The command-line arguments, with the sitemap URL.
+        """
+        print(">>> 'sitemap-health' command activated! <<<")
+
+        if self.run_options.shard is not None:
+            print("Error: sitemap-health doesn't take --shard.")
+            return
+
+        summaries: Dict[str, SitemapSummary] = {}
+
+        def sitemap_failed(sitemap: str, error: Exception):
+            summaries.setdefault(sitemap, SitemapSummary()).sitemap_error = str(error)
+
+        traversal = CrawlSession(self.session_options)
+        entries = Crawler(args.sitemap_url, traversal, []).iter_sitemap_urls(
+            on_error=sitemap_failed
+        )
+        print(f"Checking the URLs of {args.sitemap_url} as its sitemaps are read...")
+
+        try:
+            with self._create_result_writer(
+                "sitemap_health_results",
+                list(REPORT_COLUMN_TYPES),
+                REPORT_COLUMN_TYPES,
+            ) as writer:
+
+                def write_row(row: tuple):
+                    summaries.setdefault(row[0], SitemapSummary()).add(row)
+                    writer.write(row)
+
+                self._run_concurrent_tasks(
+                    tasks=entries,
+                    task_function=lambda entry, session: self._check_entry(
+                        entry, session, read_head=not args.headers_only
+                    ),
+                    desc_provider=lambda entry: entry.url,
+                    pbar_color="yellow",
+                    url_provider=lambda entry: entry.url,
+                    on_result=write_row,
+                )
+        except rq.RequestException as e:
+            print(f"Could not read the sitemap {args.sitemap_url}: {e}")
+            return
+        finally:
+            entries.close()
+            traversal.close()
+
+        if not summaries:
+            print("The sitemap lists no URLs. No report will be generated.")
+            return
+
+        self._print_summary(summaries)
+        with self._create_result_writer(
+            "sitemap_health_summary",
+            list(SUMMARY_COLUMN_TYPES),
+            SUMMARY_COLUMN_TYPES,
+        ) as summary_writer:
+            for sitemap, s in summaries.items():
+                summary_writer.write(
+                    (
+                        sitemap,
+                        s.urls,
+                        s.healthy,
+                        s.not_200,
+                        s.redirected,
+                        s.canonical_elsewhere,
+                        s.noindex,
+                        s.request_errors,
+                        s.sitemap_error,
+                    )
+                )
+
+        healthy = sum(s.healthy for s in summaries.values())
+        checked = sum(s.urls for s in summaries.values())
+        print(f"\n{healthy}/{checked} URLs are healthy.")
+        logger.info("Sitemap health: %d/%d URLs healthy", healthy, checked)
@@ -0,0 +1,52 @@
+import argparse
+import time
+from core.job_queue import JOB_DONE, JobQueue
+from .base_command import Command
+from .submit import add_queue_arg
+
+
+class StatusCommand(Command):
+
+    @staticmethod
+    def setup_args(parser: argparse.ArgumentParser):
+        parser.description = "Shows the queued jobs and their progress."
+
+        add_queue_arg(parser)
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Also list the jobs that are done.",
+        )
+
+    def execute(self, args: argparse.Namespace):
+        """
+        Prints one line per job: its state, finished and failed tasks, and report.
+
+        Args:
+            args (argparse.Namespace): The parsed command-line arguments.
+        """
+        with JobQueue(args.queue) as queue:
+            summaries = queue.summaries()
+
+        if not args.all:
+            summaries = [s for s in summaries if s.job.status != JOB_DONE]
+        if not summaries:
+            print("No jobs in the queue." if args.all else "No pending jobs.")
+            return
+
+        print(
+            f"{'Job':>5}  {'Command':<14} {'State':<8} {'Done':>15} "
+            f"{'Running':>8} {'Failed':>7}  Submitted"
+        )
+        for summary in summaries:
+            job = summary.job
+            submitted = time.strftime(
+                "%Y-%m-%d %H:%M:%S", time.localtime(job.submitted_at)
+            )
+            progress = f"{summary.done}/{summary.total}"
+            print(
+                f"{'#' + str(job.id):>5}  {job.command:<14} {job.status:<8} "
+                f"{progress:>15} {summary.leased:>8} {summary.failed:>7}  {submitted}"
+            )
+            if job.report_path:
+                print(f"       report: {job.report_path}")
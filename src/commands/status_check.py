@@ -0,0 +1,138 @@
+import argparse
+import logging
+from typing import Optional
+import requests as rq
+from core.crawler import Crawler
+from core.results import STATUS_COLUMN_TYPES, STATUS_OK, error_status
+from core.timing import TIMING_COLUMN_TYPES
+from .base_command import Command, TaskPlan
+
+logger = logging.getLogger(__name__)
+
+REPORT_COLUMN_TYPES = {
+    "Status Code": "int",
+    "Final URL": "string",
+    "Redirects": "int",
+    "Redirect Chain": "string",
+    "Method": "category",
+    "Latency (ms)": "float",
+}
+
+
+class StatusCheckCommand(Command):
+
+    queueable = True
+
+    @staticmethod
+    def setup_args(parser: argparse.ArgumentParser):
+        parser.description = (
+            "Reports the HTTP status and redirects of a list of URLs, without downloading them."
+        )
+
+        parser.add_argument(
+            "file_path",
+            help="Path to the file with URLs (.xlsx, .csv, .jsonl, .parquet, .txt) or - for stdin.",
+        )
+        parser.add_argument(
+            "column_name", help="Name of the column containing the URLs."
+        )
+
+    def _check_url(self, url: str, session: rq.Session) -> tuple:
+        """Probes a single URL for its status code and redirect chain.
+
+        Designed to be run in a separate thread.
+
+        Args:
+            url (str): The URL to be probed.
+            session (rq.Session): The requests.Session object for making HTTP requests.
+
+        Returns:
+            tuple: The report row: the URL, the final status code and URL,
+                the number of redirects and their chain, the method that
+                answered (HEAD or GET), the latency in milliseconds, the
+                status and error message, then the timings if enabled. A 404
+                or 500 is a result, not an error: the status is 'error' only
+                when no response was received ('short_circuited' when no
+                request was sent, the host being known to be unreachable).
+        """
+        crawler = Crawler(url, session, [])
+        timings: tuple = ()
+        try:
+            result = crawler.check_status()
+            if self.run_options.timings:
+                timings = crawler.timings.as_row()
+            return (
+                url,
+                result.status_code,
+                result.final_url,
+                len(result.redirects),
+                result.redirect_chain(),
+                result.method,
+                round(result.latency * 1000, 1),
+                STATUS_OK,
+                None,
+                *timings,
+            )
+
+        except Exception as e:
+            logger.error("'%s' generated an exception: %s", url, e)
+            if self.run_options.timings:
+                timings = crawler.timings.as_row()
+            missing = (None for _ in REPORT_COLUMN_TYPES)
+            return (url, *missing, error_status(e), str(e), *timings)
+        finally:
+            crawler.record_timings()
+
+    def plan(self, args: argparse.Namespace) -> Optional[TaskPlan]:
+        """Reads the URLs to probe and lays out the report.
+
+        Args:
+            args (argparse.Namespace): The command-line arguments, including
+                file_path and column_name.
+
+        Returns:
+            Optional[TaskPlan]: The URLs and report layout, or None if the
+                input could not be read.
+        """
+        filepath = self._normalize_filepath(args.file_path)
+        required_columns = [
+            {"name": args.column_name, "description": "which contains the URLs"}
+        ]
+        chunks = self._get_input_chunks(filepath, required_columns)
+        if chunks is None:
+            return None
+
+        column = required_columns[0]["name"]
+        urls_to_check = self._iter_validated_urls(column, chunks)
+
+        columns = ["URL", *REPORT_COLUMN_TYPES, *STATUS_COLUMN_TYPES]
+        column_types = {**REPORT_COLUMN_TYPES, **STATUS_COLUMN_TYPES}
+        if self.run_options.timings:
+            columns += list(TIMING_COLUMN_TYPES)
+            column_types.update(TIMING_COLUMN_TYPES)
+
+        return TaskPlan("status_check_results", columns, column_types, urls_to_check)
+
+    def task_function(self, args: argparse.Namespace):
+        return self._check_url
+
+    def execute(self, args: argparse.Namespace):
+        """Probes every URL of the input for its status code and redirects.
+
+        Each URL gets a HEAD request (or a one-byte ranged GET when the
+        server refuses HEAD) following redirects, through the engine's pooled
+        session, politeness delay and unreachable-host cache. No page body is
+        downloaded, so the run is bound by latency and --delay only.
+
+        Args:
+            args (argparse.Namespace): The command-line arguments, including
+                file_path and column_name.
+        """
+        print(">>> 'status-check' command activated! <<<")
+
+        plan = self.plan(args)
+        if plan is None:
+            return
+
+        if self._run_plan(args, plan, pbar_color="cyan"):
+            logger.info("Status check finished. Report generated.")
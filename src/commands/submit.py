@@ -0,0 +1,91 @@
+import argparse
+import logging
+import os
+from pathlib import Path
+from core.job_queue import JobQueue
+from .base_command import Command
+from .registry import default_commands
+
+logger = logging.getLogger(__name__)
+
+
+def add_queue_arg(parser: argparse.ArgumentParser):
+    """Adds the --queue option shared by the submit, worker and status commands."""
+    parser.add_argument(
+        "--queue",
+        type=Path,
+        metavar="PATH",
+        help="The job queue database (default: ~/.seo-helper/queue.db).",
+    )
+
+
+class SubmitCommand(Command):
+
+    @staticmethod
+    def setup_args(parser: argparse.ArgumentParser):
+        parser.description = (
+            "Queues a scan-metas, compare-metas or status-check run for the queue workers."
+        )
+
+        add_queue_arg(parser)
+        parser.add_argument(
+            "job_command",
+            metavar="command",
+            help="The command to queue (scan-metas, compare-metas or status-check).",
+        )
+        parser.add_argument(
+            "job_args",
+            nargs=argparse.REMAINDER,
+            help="The command's arguments and options, as you would run it.",
+        )
+
+    def execute(self, args: argparse.Namespace):
+        """
+        Reads the job's input now and queues one task per input row.
+
+        The input is validated (and can be corrected) here, so the workers
+        only fetch URLs. The report is written by a worker to the results/
+        directory of the current directory, once every task is done.
+
+        Args:
+            args (argparse.Namespace): The parsed command-line arguments.
+        """
+        spec = default_commands().get(args.job_command)
+        if spec is None or not spec.load().queueable:
+            print(
+                f"Error: '{args.job_command}' can't be queued; "
+                "only scan-metas, compare-metas and status-check can."
+            )
+            return
+
+        command, job_args = spec.prepare(args.job_args)
+        if command.run_options.shard is not None:
+            print("Error: queued jobs are spread over the workers and don't take --shard.")
+            return
+
+        plan = command.plan(job_args)
+        if plan is None:
+            print("Nothing was queued.")
+            return
+
+        options = command.run_options
+        report = {
+            "name": plan.name,
+            "columns": plan.columns,
+            "column_types": plan.column_types,
+            "output_format": options.output_format,
+            "output_compression": options.output_compression,
+        }
+        with JobQueue(args.queue) as queue:
+            job_id, task_count = queue.submit(
+                spec.name, args.job_args, os.getcwd(), report, plan.tasks
+            )
+
+        if not task_count:
+            print(f"Job #{job_id} has no URLs to check.")
+        else:
+            print(f"Queued job #{job_id}: {task_count} tasks in {queue.path}.")
+        print("Run 'worker' to process the queue and 'status' to follow it.")
+        logger.info(
+            "Queued job %d (%s) with %d tasks", job_id, spec.name, task_count
+        )
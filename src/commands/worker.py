@@ -0,0 +1,321 @@
+import argparse
+import logging
+import multiprocessing
+import os
+import secrets
+import socket
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional
+from core.job_queue import JOB_DONE, FinishedTask, Job, JobQueue, LeasedTask
+from core.logging_setup import configure_logging, shutdown_logging
+from core.results import STATUS_COLUMN_TYPES, STATUS_ERROR
+from core.session import CrawlSession, SessionOptions
+from core.urls import canonical_host
+from reporting.result_writers import create_result_writer
+from .base_command import MAX_WORKERS, Command
+from .registry import default_commands
+from .submit import add_queue_arg
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = 1.0
+
+
+class _QueuedJob(NamedTuple):
+    command: Command
+    task_function: Callable
+    session: CrawlSession
+
+
+class QueueWorker:
+    """
+    Runs queued tasks until stopped, MAX_WORKERS at a time.
+
+    Tasks are leased a few at a time and their leases renewed by a heartbeat
+    thread. Before each fetch, the worker books a slot in the host's shared
+    rate budget, so the politeness delay holds across every job and worker
+    process; the jobs' own --delay is not used. Their other session options
+    (--hedge, --hedge-budget) are: jobs with the same options share a
+    session. When a job's last task is done, the worker that
+    notices writes its report.
+
+    Args:
+        queue (JobQueue): The job queue.
+        host_interval (float): Seconds between two requests to the same host,
+            across every worker.
+        lease_seconds (float): How long a lease lasts without a heartbeat.
+    """
+
+    def __init__(self, queue: JobQueue, host_interval: float, lease_seconds: float):
+        self.queue = queue
+        self.host_interval = host_interval
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{secrets.token_hex(3)}"
+        self.tasks_run = 0
+        self._sessions: Dict[SessionOptions, CrawlSession] = {}
+        self._jobs: Dict[int, _QueuedJob] = {}
+        self._jobs_lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def _session(self, options: SessionOptions) -> CrawlSession:
+        """Returns the session for a job's options, without its --delay."""
+        key = SessionOptions(
+            hedge=options.hedge,
+            hedge_budget=options.hedge_budget,
+            delay=0.0,
+        )
+        session = self._sessions.get(key)
+        if session is None:
+            session = self._sessions[key] = CrawlSession(key)
+        return session
+
+    def _job(self, job_id: int) -> _QueuedJob:
+        """Returns the command configured for a job, parsing its arguments once."""
+        with self._jobs_lock:
+            queued_job = self._jobs.get(job_id)
+            if queued_job is None:
+                job = self.queue.job(job_id)
+                command, args = default_commands()[job.command].prepare(job.argv)
+                queued_job = _QueuedJob(
+                    command,
+                    command.task_function(args),
+                    self._session(command.session_options),
+                )
+                self._jobs[job_id] = queued_job
+            return queued_job
+
+    def _forget_finished_jobs(self):
+        """Drops the finished jobs' commands, and the sessions no job uses anymore."""
+        with self._jobs_lock:
+            for job_id in list(self._jobs):
+                job = self.queue.job(job_id)
+                if job is None or job.status == JOB_DONE:
+                    del self._jobs[job_id]
+
+            in_use = {queued_job.session for queued_job in self._jobs.values()}
+            for key, session in list(self._sessions.items()):
+                if session not in in_use:
+                    session.close()
+                    del self._sessions[key]
+
+    def _run_task(self, task: LeasedTask):
+        """Runs one leased task, after waiting for its host's next slot."""
+        try:
+            job = self._job(task.job_id)
+            payload = job.command.decode_task(task.payload)
+            host = canonical_host(str(job.command.task_url(payload)))
+            slot = self.queue.reserve_host(host, self.host_interval)
+            time.sleep(max(0.0, slot - self.queue.clock()))
+            row = job.task_function(payload, job.session)
+        except Exception as e:
+            logger.error(
+                "Task %d of job %d failed: %s", task.position, task.job_id, e
+            )
+            self.queue.fail(task.id, self.owner, str(e))
+            return
+
+        if not self.queue.complete(task.id, self.owner, row):
+            logger.warning(
+                "Lost the lease of task %d of job %d; its result was dropped",
+                task.position,
+                task.job_id,
+            )
+        self.tasks_run += 1
+
+    def _error_row(self, job: Job, task: FinishedTask) -> list:
+        """Builds the report row of a failed task: its input values and error."""
+        columns: List[str] = job.report["columns"]
+        command = self._job(job.id).command
+        try:
+            values = command.task_values(command.decode_task(task.payload))
+        except Exception:
+            values = (task.payload,)
+
+        row: list = [None] * len(columns)
+        row[: len(values)] = values
+        status_column, error_column = STATUS_COLUMN_TYPES
+        row[columns.index(status_column)] = STATUS_ERROR
+        row[columns.index(error_column)] = str(task.result)
+        return row
+
+    def _write_report(self, job: Job):
+        """Writes a finished job's report to results/ in its directory.
+
+        Failed tasks get a row too, with their input values and the reason
+        they were given up on.
+        """
+        report = job.report
+        path: Optional[str] = None
+        try:
+            with create_result_writer(
+                report["output_format"],
+                os.path.join(job.cwd, "results", f"{report['name']}.job-{job.id}"),
+                report["columns"],
+                report["column_types"],
+                report["output_compression"],
+            ) as writer:
+                for task in self.queue.results(job.id):
+                    writer.write(
+                        self._error_row(job, task) if task.failed else task.result
+                    )
+            if writer.rows_written:
+                path = writer.path
+        except OSError as e:
+            logger.error("Could not write the report of job %d: %s", job.id, e)
+            print(f"Error: could not write the report of job #{job.id}: {e}")
+
+        self.queue.finish_job(job.id, path)
+        logger.info("Job %d (%s) finished, report: %s", job.id, job.command, path)
+
+    def _write_finished_reports(self):
+        for job in self.queue.claim_finished_jobs(self.owner, self.lease_seconds):
+            self._write_report(job)
+        self._forget_finished_jobs()
+
+    def _heartbeat(self):
+        while not self._stopped.wait(self.lease_seconds / 3):
+            self.queue.heartbeat(self.owner, self.lease_seconds)
+
+    def run(self, exit_when_idle: bool = False):
+        """
+        Leases and runs tasks until stop() is called.
+
+        Args:
+            exit_when_idle (bool): Also return once the queue has no task
+                left to run and no report left to write.
+        """
+        heartbeat = threading.Thread(
+            target=self._heartbeat, name="queue-heartbeat", daemon=True
+        )
+        heartbeat.start()
+        try:
+            with ThreadPoolExecutor(
+                max_workers=MAX_WORKERS, thread_name_prefix="queue-worker"
+            ) as executor:
+                running: set = set()
+                while not self._stopped.is_set():
+                    free = MAX_WORKERS - len(running)
+                    if free:
+                        for task in self.queue.lease(
+                            self.owner, free, self.lease_seconds
+                        ):
+                            running.add(executor.submit(self._run_task, task))
+
+                    if running:
+                        done, running = wait(
+                            running, timeout=POLL_INTERVAL, return_when=FIRST_COMPLETED
+                        )
+                        if done:
+                            self._write_finished_reports()
+                        continue
+
+                    self._write_finished_reports()
+                    if exit_when_idle and self.queue.is_idle():
+                        break
+                    self._stopped.wait(POLL_INTERVAL)
+        finally:
+            self._stopped.set()
+            heartbeat.join()
+            for session in self._sessions.values():
+                session.close()
+
+    def stop(self):
+        self._stopped.set()
+
+
+def _worker_process(
+    queue_path: Optional[Path],
+    host_interval: float,
+    lease_seconds: float,
+    exit_when_idle: bool,
+    log_directory: Path,
+):
+    """Entry point of a worker process started by `worker --procs N`."""
+    configure_logging(log_directory)
+    try:
+        with JobQueue(queue_path) as queue:
+            worker = QueueWorker(queue, host_interval, lease_seconds)
+            try:
+                worker.run(exit_when_idle)
+            except KeyboardInterrupt:
+                pass
+            logger.info("Worker %s ran %d tasks", worker.owner, worker.tasks_run)
+    finally:
+        shutdown_logging()
+
+
+class WorkerCommand(Command):
+
+    @staticmethod
+    def setup_args(parser: argparse.ArgumentParser):
+        parser.description = (
+            "Runs queued jobs on worker processes, sharing a per-host rate budget."
+        )
+
+        add_queue_arg(parser)
+        parser.add_argument(
+            "--procs",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Number of worker processes (default: one per CPU).",
+        )
+        parser.add_argument(
+            "--host-interval",
+            type=float,
+            default=1.0,
+            help="Seconds between two requests to the same host, across all jobs and workers (default: 1.0).",
+        )
+        parser.add_argument(
+            "--lease",
+            type=float,
+            default=60.0,
+            help="Seconds before the tasks of an unresponsive worker are queued again (default: 60).",
+        )
+        parser.add_argument(
+            "--exit-when-idle",
+            action="store_true",
+            help="Stop once every queued job is done, instead of waiting for new ones.",
+        )
+
+    def execute(self, args: argparse.Namespace):
+        """
+        Starts the worker processes and waits for them (or for Ctrl+C).
+
+        Each process leases tasks from the queue on its own, so more workers
+        can be started at any time, on this or another command line. A
+        killed worker's tasks are run again by the others once its leases
+        expire.
+
+        Args:
+            args (argparse.Namespace): The parsed command-line arguments.
+        """
+        worker_args = (
+            args.queue,
+            args.host_interval,
+            args.lease,
+            args.exit_when_idle,
+            Path("./logs").resolve(),
+        )
+        print(f"Starting {args.procs} queue workers. Press Ctrl+C to stop them.")
+
+        # Spawned (not forked) processes don't inherit the logging thread.
+        context = multiprocessing.get_context("spawn")
+        processes = [
+            context.Process(
+                target=_worker_process, args=worker_args, name=f"queue-worker-{i}"
+            )
+            for i in range(max(args.procs, 1))
+        ]
+        for process in processes:
+            process.start()
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            print("\nStopping the workers...")
+            for process in processes:
+                process.join()
+        print("Queue workers stopped.")
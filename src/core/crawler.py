@@ -1,24 +1,114 @@
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import requests as rq
 from requests.exceptions import RequestException
 from bs4 import BeautifulSoup, Tag
+import gzip
 import logging
 import time
-from typing import List, Dict, Optional, Set
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
+from core import metrics
+from core.latency import DEFAULT_TIMEOUT
+from core.negative_cache import (
+    HostUnreachableError,
+    classify_host_failure,
+    unreachable_hosts,
+)
+from core.selectors import (
+    EXISTS,
+    VALUE,
+    CompiledSelector,
+    SelectorSet,
+    meta_checks,
+    meta_selector,
+    parse_html,
+)
+from core.session import CrawlSession, read_document_head
+from core.timing import FetchTimings, current_queue_wait
+from core.tracing import tracer
+from core.urls import canonical_host, canonicalize_url
 
 logger = logging.getLogger(__name__)
 
+POLITENESS_DELAY = 1.0
+GZIP_MAGIC = b"\x1f\x8b"
+# Child sitemaps fetched ahead of the one being read by iter_sitemap_urls.
+SITEMAP_PREFETCH = 4
+
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
 }
 
 
+class FetchedPage(NamedTuple):
+    """A parsed document with the response it came from, shared by single-flight."""
+
+    document: Any
+    status_code: Optional[int]
+    headers: Mapping[str, str]
+
+
+class SitemapEntry(NamedTuple):
+    """A page URL listed in a sitemap, with the sitemap file that lists it."""
+
+    url: str
+    sitemap: str
+
+
+class UrlStatus(NamedTuple):
+    """The answer to a status probe: where the URL ends up, and how."""
+
+    status_code: int
+    final_url: str
+    redirects: List[tuple]
+    method: str
+    latency: float
+
+    def redirect_chain(self) -> str:
+        """Returns the redirects as 'CODE URL -> ... -> FINAL_URL', or ''."""
+        if not self.redirects:
+            return ""
+        hops = [f"{code} {url}" for code, url in self.redirects]
+        return " -> ".join([*hops, self.final_url])
+
+
 class Crawler:
-    def __init__(self, url: str, session: rq.Session, tags_to_check: List[str]):
+    HTML_PARSER = "lxml.html"
+    XML_PARSER = "xml"
+
+    def __init__(
+        self,
+        url: str,
+        session: rq.Session,
+        tags_to_check: List[str],
+        selectors: Optional[SelectorSet] = None,
+    ):
         self.url = url
         self.session = session
         self.tags_to_check = tags_to_check
+        self.selectors = selectors
+        self.tree = None
         self.soup = None
+        self.fetch_error: RequestException | None = None
+        self.raw_content = b""
+        self.status_code: Optional[int] = None
+        self.response_headers: Mapping[str, str] = {}
+        self.timings = FetchTimings(
+            host=canonical_host(url), queue_wait=current_queue_wait()
+        )
+        self._requested = False
+        self._timings_recorded = False
 
     def html_search(self) -> str:
         """Fetches the HTML content of a given URL.
@@ -28,46 +118,271 @@ class Crawler:
 
         Returns:
             str: The HTML content of the URL.
+
+        Raises:
+            HostUnreachableError: If the URL's host recently failed with a
+                DNS, connection refused or TLS error (no request is made).
         """
+        host = self._reachable_host()
+        self._requested = True
+        try:
+            with tracer.span("fetch", url=self.url):
+                if isinstance(self.session, CrawlSession):
+                    res = self.session.fetch(
+                        self.url, timings=self.timings, headers=HEADERS
+                    )
+                else:
+                    res = self.session.get(
+                        self.url, timeout=DEFAULT_TIMEOUT, headers=HEADERS
+                    )
+                self.status_code = res.status_code
+                self.response_headers = res.headers
+                res.raise_for_status()
+                self.raw_content = res.content
+
+                decode_start = time.perf_counter()
+                text = res.text
+                self.timings.decode += time.perf_counter() - decode_start
+            return text
+        except RequestException as e:
+            self._record_failure(host, e)
+            raise e
+        finally:
+            with tracer.span("wait-for-rate-limit"):
+                time.sleep(self._politeness_delay())
+
+    def check_status(self, read_head: bool = False) -> UrlStatus:
+        """Requests the Crawler's URL status and redirects, without its body.
 
+        Goes through CrawlSession.probe (HEAD, or a one-byte GET when HEAD is
+        refused) with the same unreachable-host cache and politeness delay as
+        html_search. The response headers are kept in response_headers.
+
+        Args:
+            read_head (bool): Send a GET instead and read the page up to the
+                end of its <head> (see CrawlSession.fetch_head), which is
+                parsed so that meta tag checks and selectors can run on it.
+
+        Returns:
+            UrlStatus: The final status code and URL, the redirect chain, the
+                method that answered and the latency.
+
+        Raises:
+            RequestException: If the request failed (no status to report).
+            HostUnreachableError: If the URL's host recently failed with a
+                DNS, connection refused or TLS error (no request is made).
+        """
+        host = self._reachable_host()
+        self._requested = True
+        head = b""
         try:
-            res = self.session.get(self.url, timeout=10, headers=HEADERS)
-            res.raise_for_status()
-            return res.text
+            start = time.perf_counter()
+            with tracer.span("probe", url=self.url):
+                if isinstance(self.session, CrawlSession):
+                    if read_head:
+                        res, head = self.session.fetch_head(
+                            self.url, timings=self.timings, headers=HEADERS
+                        )
+                    else:
+                        res = self.session.probe(
+                            self.url, timings=self.timings, headers=HEADERS
+                        )
+                else:
+                    res = self.session.request(
+                        "GET" if read_head else "HEAD",
+                        self.url,
+                        timeout=DEFAULT_TIMEOUT,
+                        headers=HEADERS,
+                        allow_redirects=True,
+                        stream=read_head,
+                    )
+                    if read_head:
+                        head = read_document_head(res)
+            latency = time.perf_counter() - start
         except RequestException as e:
-            logger.error(f"Failed to access URL {self.url}: {e}")
+            self._record_failure(host, e)
             raise e
         finally:
-            time.sleep(1)
+            with tracer.span("wait-for-rate-limit"):
+                time.sleep(self._politeness_delay())
+
+        self.status_code = res.status_code
+        self.response_headers = res.headers
+        method = res.request.method if res.request is not None else "HEAD"
+        if method == "GET" and res.status_code == 206:
+            # The server honoured the one-byte range of the fallback GET.
+            self.status_code = 200
+        if read_head:
+            parse_start = time.perf_counter()
+            with tracer.span("parse", parser=self.HTML_PARSER):
+                self.tree = parse_html(head)
+            self.timings.parse += time.perf_counter() - parse_start
+        return UrlStatus(
+            self.status_code,
+            res.url,
+            [(hop.status_code, hop.url) for hop in res.history],
+            method,
+            latency,
+        )
+
+    def record_timings(self):
+        """Adds the Crawler's timings to its session's per-host summary, once.
+
+        To be called when the Crawler is done with its page, after
+        extraction, whether the fetch succeeded or not. Only a Crawler that
+        sent a request is counted: a page served by another Crawler's
+        single-flight fetch, or a host short-circuited as unreachable, isn't.
+        """
+        if (
+            self._requested
+            and not self._timings_recorded
+            and isinstance(self.session, CrawlSession)
+        ):
+            self._timings_recorded = True
+            self.session.timing_stats.add(self.timings)
+
+    def _reachable_host(self) -> str:
+        """Returns the URL's host, unless it is known to be unreachable.
+
+        Raises:
+            HostUnreachableError: If the host recently failed with a DNS,
+                connection refused or TLS error.
+        """
+        host = canonical_host(self.url)
+        cached_error = unreachable_hosts.check(host)
+        if cached_error is not None:
+            logger.debug(
+                "Skipping %s, host %s is unreachable",
+                self.url,
+                host,
+                extra={"host": host},
+            )
+            raise HostUnreachableError(
+                f"Host {host} is unreachable (cached {cached_error})"
+            )
+        return host
+
+    def _record_failure(self, host: str, error: RequestException):
+        """Logs a failed request, caching its host as unreachable if need be."""
+        logger.error(
+            "Failed to access URL %s: %s", self.url, error, extra={"host": host}
+        )
+        failure_class = classify_host_failure(error)
+        if failure_class is not None:
+            unreachable_hosts.record(host, failure_class, str(error))
+
+    def _politeness_delay(self) -> float:
+        """Returns how long to pause after each request to the Crawler's host."""
+        if isinstance(self.session, CrawlSession):
+            return self.session.options.delay
+        return POLITENESS_DELAY
+
+    def _load_document(self, features: str):
+        """Fetches and parses the Crawler's URL, sharing work with concurrent callers.
+
+        When the session is a CrawlSession, the fetch and parse go through its
+        single-flight layer keyed by the canonical URL and the parser, so
+        duplicate URLs being crawled at the same time cost a single request.
+        The response's status code and headers come along with the document,
+        so callers served by another Crawler's request still get them.
+
+        Args:
+            features (str): HTML_PARSER for the lxml tree the page checks run
+                on, or XML_PARSER for a BeautifulSoup XML document.
+
+        Returns:
+            The parsed document.
+        """
+        if isinstance(self.session, CrawlSession):
+            key = (canonicalize_url(self.url), features)
+            page = self.session.single_flight.do(
+                key, lambda: self._fetch_and_parse(features)
+            )
+        else:
+            page = self._fetch_and_parse(features)
+        self.status_code = page.status_code
+        self.response_headers = page.headers
+        return page.document
+
+    def fetch_page(self) -> bool:
+        """Fetches and parses the Crawler's URL as HTML, once.
+
+        Every later check on this Crawler (meta tags, selectors, response
+        headers) reads the same document.
+
+        Returns:
+            bool: True if the page was loaded, False if the fetch failed
+                (the error is kept in fetch_error).
+        """
+        if self.tree is None and self.fetch_error is None:
+            try:
+                self.tree = self._load_document(self.HTML_PARSER)
+            except RequestException as e:
+                self.fetch_error = e
+        return self.tree is not None
+
+    def _fetch_and_parse(self, features: str) -> FetchedPage:
+        """Fetches the Crawler's URL and parses it, timing the parse.
+
+        Sitemaps served as raw .xml.gz files are decompressed before parsing.
+        """
+        content = self.html_search()
+        if features == self.XML_PARSER and self.raw_content[:2] == GZIP_MAGIC:
+            content = gzip.decompress(self.raw_content)
+
+        parse_start = time.perf_counter()
+        with tracer.span("parse", parser=features):
+            if features == self.HTML_PARSER:
+                document = parse_html(content)
+            else:
+                document = BeautifulSoup(content, features)
+        parse_seconds = time.perf_counter() - parse_start
+        self.timings.parse += parse_seconds
+        metrics.parse_duration.observe(parse_seconds)
+        return FetchedPage(document, self.status_code, self.response_headers)
+
+    def _evaluate(self, selector: CompiledSelector) -> Any:
+        """Runs one compiled check on the page, timing it as extraction."""
+        extract_start = time.perf_counter()
+        with tracer.span("compare", check=selector.check.name):
+            result = selector.evaluate(self.tree)
+        self.timings.extract += time.perf_counter() - extract_start
+        return result
 
     def find_meta_by_name(self, meta_name: str) -> bool:
         """Finds the meta tag (defined in meta_name) in the HTML content.
 
         Args:
-            res (str): The HTML content to search.
+            meta_name (str): The name of the meta tag to find (e.g., 'robots').
 
         Returns:
             bool: True if the meta_name tag is found, False otherwise.
         """
-        if self.soup is None:
-            try:
-                res = self.html_search()
-                self.soup = BeautifulSoup(res, "html.parser")
-            except RequestException:
-                return False
-
-        meta_datas = self.soup.find_all("meta", {"name": meta_name})
-        return len(meta_datas) > 0
-
-    def execute_scan(self) -> Dict[str, bool]:
+        if not self.fetch_page():
+            return False
+        return self._evaluate(meta_selector(meta_name, EXISTS))
 
-        res = {}
+    def execute_scan(self) -> Dict[str, Any]:
+        """Runs the Crawler's checks on the page, in one pass over its tree.
 
-        for tag in self.tags_to_check:
-            is_found = self.find_meta_by_name(tag)
-            res[tag] = is_found
+        The checks are the compiled `selectors` given to the Crawler, or
+        else an 'exists' check per meta tag name in tags_to_check.
 
-        return res
+        Returns:
+            Dict[str, Any]: Each check's result, by name. Every result is
+                False when the page could not be fetched.
+        """
+        selectors = self.selectors
+        if selectors is None:
+            selectors = SelectorSet(meta_checks(self.tags_to_check))
+        if not self.fetch_page():
+            return {name: False for name in selectors.names}
+
+        extract_start = time.perf_counter()
+        with tracer.span("compare", checks=len(selectors.selectors)):
+            results = selectors.evaluate(self.tree)
+        self.timings.extract += time.perf_counter() - extract_start
+        return results
 
     def get_meta_content_by_name(self, meta_name: str) -> str | None:
         """Finds a meta tag by name and returns its content.
@@ -78,19 +393,9 @@ class Crawler:
         Returns:
             str | None: The content of the meta tag if found, otherwise None.
         """
-        if self.soup is None:
-            try:
-                res = self.html_search()
-                self.soup = BeautifulSoup(res, "html.parser")
-            except RequestException:
-                return None
-
-        meta_tag = self.soup.find("meta", {"name": meta_name})
-
-        if isinstance(meta_tag, Tag) and "content" in meta_tag.attrs:
-            return str(meta_tag["content"])
-        else:
+        if not self.fetch_page():
             return None
+        return self._evaluate(meta_selector(meta_name, VALUE))
 
     def _fetch_single_sitemap_urls(self, url: str) -> Optional[Set[str]]:
         """
@@ -113,12 +418,103 @@ class Crawler:
 
             child_crawler = Crawler(url, self.session, [])
 
-            return child_crawler.fetch_sitemap_urls()
+            with tracer.span("sitemap", url=url):
+                return child_crawler.fetch_sitemap_urls()
 
         except Exception as e:
-            logger.warning(f"Failed to process child sitemap {url}: {e}")
+            logger.warning("Failed to process child sitemap %s: %s", url, e)
             return None
 
+    def _read_sitemap(self) -> Tuple[List[str], List[str]]:
+        """Fetches and parses the Crawler's URL as one sitemap file.
+
+        Returns:
+            Tuple[List[str], List[str]]: The child sitemaps it lists (when it
+                is a sitemap index, each once) and its page URLs.
+        """
+        try:
+            self.soup = self._load_document(self.XML_PARSER)
+
+            extract_start = time.perf_counter()
+            children = []
+            for tag in self.soup.find_all("sitemap"):
+                if isinstance(tag, Tag):
+                    loc = tag.find("loc")
+                    if loc:
+                        children.append(loc.text.strip())
+
+            urls = []
+            for tag in self.soup.find_all("url"):
+                if isinstance(tag, Tag):
+                    loc = tag.find("loc")
+                    if loc:
+                        urls.append(loc.text.strip())
+            self.timings.extract += time.perf_counter() - extract_start
+        finally:
+            self.record_timings()
+
+        # Indexes sometimes list the same child twice; crawl it once.
+        return list(dict.fromkeys(children)), urls
+
+    def iter_sitemap_urls(
+        self, on_error: Optional[Callable[[str, Exception], None]] = None
+    ) -> Iterator[SitemapEntry]:
+        """
+        Yields the page URLs of the sitemap and its children as they are read.
+
+        The streaming counterpart of fetch_sitemap_urls: the child sitemaps
+        of an index (and of nested indexes) are fetched SITEMAP_PREFETCH at a
+        time, ahead of the one being read, and each child's URLs are yielded
+        as soon as it is parsed. Only the sitemap URLs and the children in
+        flight are held in memory, never the full URL set, so a URL listed
+        in two sitemaps is yielded twice.
+
+        Args:
+            on_error (Optional[Callable[[str, Exception], None]]): Called with
+                the URL of each child sitemap that can't be read, and the
+                error. Its URLs are skipped.
+
+        Yields:
+            SitemapEntry: Each page URL, with the sitemap file listing it.
+
+        Raises:
+            RequestException: If the sitemap itself can't be fetched.
+        """
+        children, urls = self._read_sitemap()
+        for url in urls:
+            yield SitemapEntry(url, self.url)
+
+        pending = deque(children)
+        seen = {self.url, *children}
+        with ThreadPoolExecutor(
+            max_workers=SITEMAP_PREFETCH, thread_name_prefix="sitemap"
+        ) as executor:
+            in_flight: deque = deque()
+            while pending or in_flight:
+                while pending and len(in_flight) < SITEMAP_PREFETCH:
+                    child = pending.popleft()
+                    child_crawler = Crawler(child, self.session, [])
+                    in_flight.append(
+                        (child, executor.submit(child_crawler._read_sitemap))
+                    )
+
+                child, future = in_flight.popleft()
+                try:
+                    with tracer.span("sitemap", url=child):
+                        grandchildren, urls = future.result()
+                except Exception as e:
+                    logger.warning("Failed to process child sitemap %s: %s", child, e)
+                    if on_error is not None:
+                        on_error(child, e)
+                    continue
+
+                for grandchild in grandchildren:
+                    if grandchild not in seen:
+                        seen.add(grandchild)
+                        pending.append(grandchild)
+                for url in urls:
+                    yield SitemapEntry(url, child)
+
     def fetch_sitemap_urls(self) -> Optional[Set[str]]:
         """
         Fetches and parses a sitemap file (or sitemap index file)
@@ -142,28 +538,20 @@ class Crawler:
         """
         try:
 
-            xml_content = self.html_search()
-            self.soup = BeautifulSoup(xml_content, "xml")
+            sitemap_urls_to_crawl, page_urls = self._read_sitemap()
 
             all_urls = set()
 
-            sitemap_index_tags = self.soup.find_all("sitemap")
-
-            if sitemap_index_tags:
+            if sitemap_urls_to_crawl:
                 print(
-                    f" -> Sitemap Index detected. Analyzing {len(sitemap_index_tags)} child sitemaps..."
+                    f" -> Sitemap Index detected. Analyzing {len(sitemap_urls_to_crawl)} child sitemaps..."
                 )
                 logger.info(
-                    f"Sitemap Index found at {self.url}. Processing {len(sitemap_index_tags)} child sitemaps."
+                    "Sitemap Index found at %s. Processing %d child sitemaps.",
+                    self.url,
+                    len(sitemap_urls_to_crawl),
                 )
 
-                sitemap_urls_to_crawl = []
-                for tag in sitemap_index_tags:
-                    if isinstance(tag, Tag):
-                        loc = tag.find("loc")
-                        if loc:
-                            sitemap_urls_to_crawl.append(loc.text.strip())
-
                 with ThreadPoolExecutor(max_workers=10) as executor:
                     futures = [
                         executor.submit(self._fetch_single_sitemap_urls, url)
@@ -175,24 +563,19 @@ class Crawler:
                         if result_set:
                             all_urls.update(result_set)
 
-            url_tags = self.soup.find_all("url")
-            if url_tags:
+            if page_urls:
                 print(
-                    f" -> Standard Sitemap detected. Analyzing {len(url_tags)} URLs..."
+                    f" -> Standard Sitemap detected. Analyzing {len(page_urls)} URLs..."
                 )
                 logger.info(
-                    f"Standard sitemap found at {self.url}. Processing {len(url_tags)} URLs."
+                    "Standard sitemap found at %s. Processing %d URLs.",
+                    self.url,
+                    len(page_urls),
                 )
-
-                for tag in url_tags:
-                    if isinstance(tag, Tag):
-                        loc = tag.find("loc")
-                        if loc:
-
-                            all_urls.add(loc.text.strip())
+                all_urls.update(page_urls)
 
             return all_urls
 
         except Exception as e:
-            logger.error(f"Error processing sitemap {self.url}: {e}")
+            logger.error("Error processing sitemap %s: %s", self.url, e)
             return None
@@ -0,0 +1,268 @@
+"""
+The serve daemon and the thin client that forwards commands to it.
+
+`seo-helper serve` keeps one process alive between jobs, so the interpreter
+and pandas are loaded once and the crawl sessions, connection pools, DNS and
+unreachable-host caches and worker threads stay warm. Jobs are the same
+command lines the CLI takes; they run one at a time, in the client's working
+directory, and their output is sent back to the client.
+
+The daemon listens on 127.0.0.1 or on a Unix socket and records its address,
+its pid and a random token in STATE_FILE (readable only by its owner). Every
+request must carry that token, so other local users can't submit jobs.
+
+This module only uses the standard library, so that the client side costs
+nothing to import.
+"""
+
+from http.server import BaseHTTPRequestHandler, HTTPServer, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+import http.client
+import json
+import logging
+import os
+import secrets
+import socket
+import socketserver
+import threading
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8787
+STATE_FILE = Path.home() / ".seo-helper" / "daemon.json"
+TOKEN_HEADER = "X-SEO-Helper-Token"
+HEALTH_TIMEOUT = 0.5
+
+JobRunner = Callable[[List[str], str], Tuple[int, str]]
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, HTTPServer):
+    address_family = socket.AF_UNIX
+    daemon_threads = True
+
+    def server_bind(self):
+        socketserver.TCPServer.server_bind(self)
+        self.server_name = "localhost"
+        self.server_port = 0
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path: str, timeout: Optional[float] = None):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class DaemonServer:
+    """
+    Serves jobs over HTTP on 127.0.0.1 or a Unix socket.
+
+    Endpoints: GET /health, POST /jobs ({"argv": [...], "cwd": "..."}, answered
+    with {"exit_code": ..., "output": "..."} once the job is done) and
+    POST /shutdown.
+
+    Args:
+        run_job (JobRunner): Runs one command line in a directory and returns
+            its exit code and output.
+        port (int): The TCP port, when socket_path is not given (0 picks one).
+        socket_path (Optional[str]): Listen on this Unix socket instead.
+        state_file (Optional[Path]): Where the address, pid and token are
+            recorded (STATE_FILE by default).
+    """
+
+    def __init__(
+        self,
+        run_job: JobRunner,
+        port: int = DEFAULT_PORT,
+        socket_path: Optional[str] = None,
+        state_file: Optional[Path] = None,
+    ):
+        self.run_job = run_job
+        self.port = port
+        self.socket_path = socket_path
+        self.state_file = state_file or STATE_FILE
+        self.token = secrets.token_hex(16)
+        self.jobs_run = 0
+        self._job_lock = threading.Lock()
+        self._server: Optional[HTTPServer] = None
+        self._stopped = threading.Event()
+
+    @property
+    def address(self) -> str:
+        if self.socket_path:
+            return f"unix:{self.socket_path}"
+        return f"http://127.0.0.1:{self.port}"
+
+    def _handler(self):
+        daemon = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _reply(self, status: int, body: dict):
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _authorized(self) -> bool:
+                if secrets.compare_digest(
+                    self.headers.get(TOKEN_HEADER, ""), daemon.token
+                ):
+                    return True
+                self._reply(403, {"error": "invalid token"})
+                return False
+
+            def do_GET(self):
+                if not self._authorized():
+                    return
+                if self.path != "/health":
+                    self._reply(404, {"error": "not found"})
+                    return
+                self._reply(
+                    200,
+                    {"status": "ok", "pid": os.getpid(), "jobs_run": daemon.jobs_run},
+                )
+
+            def do_POST(self):
+                if not self._authorized():
+                    return
+                if self.path == "/shutdown":
+                    self._reply(200, {"status": "stopping"})
+                    threading.Thread(target=daemon.stop, daemon=True).start()
+                    return
+                if self.path != "/jobs":
+                    self._reply(404, {"error": "not found"})
+                    return
+
+                length = int(self.headers.get("Content-Length", 0))
+                try:
+                    job = json.loads(self.rfile.read(length))
+                    argv, cwd = list(job["argv"]), str(job["cwd"])
+                except (ValueError, KeyError, TypeError):
+                    self._reply(400, {"error": "expected {'argv': [...], 'cwd': ...}"})
+                    return
+
+                with daemon._job_lock:
+                    exit_code, output = daemon.run_job(argv, cwd)
+                    daemon.jobs_run += 1
+                self._reply(200, {"exit_code": exit_code, "output": output})
+
+            def address_string(self) -> str:
+                return "local"
+
+            def log_message(self, format, *args):
+                logger.debug("daemon: " + format, *args)
+
+        return Handler
+
+    def start(self):
+        """Starts listening in a background thread and writes the state file."""
+        if self.socket_path:
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+            self._server = _UnixHTTPServer(self.socket_path, self._handler())
+            os.chmod(self.socket_path, 0o600)
+        else:
+            self._server = ThreadingHTTPServer(("127.0.0.1", self.port), self._handler())
+            self.port = self._server.server_address[1]
+
+        threading.Thread(
+            target=self._server.serve_forever,
+            kwargs={"poll_interval": 0.1},
+            name="daemon-server",
+            daemon=True,
+        ).start()
+        self._write_state()
+        logger.info("Daemon listening on %s", self.address)
+
+    def _write_state(self):
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        descriptor = os.open(
+            self.state_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600
+        )
+        with os.fdopen(descriptor, "w") as f:
+            json.dump(
+                {"address": self.address, "pid": os.getpid(), "token": self.token}, f
+            )
+
+    def wait(self):
+        """Blocks until the daemon is stopped (by /shutdown or stop())."""
+        self._stopped.wait()
+
+    def stop(self):
+        """Stops serving and removes the state file and socket."""
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        try:
+            state = json.loads(self.state_file.read_text())
+            if state.get("pid") == os.getpid():
+                self.state_file.unlink()
+        except (OSError, ValueError):
+            pass
+        if self.socket_path and os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        self._stopped.set()
+        logger.info("Daemon stopped after %d jobs", self.jobs_run)
+
+
+def _connect(address: str, timeout: Optional[float]) -> http.client.HTTPConnection:
+    if address.startswith("unix:"):
+        return _UnixHTTPConnection(address[len("unix:"):], timeout=timeout)
+    host_port = address.removeprefix("http://")
+    host, _, port = host_port.partition(":")
+    return http.client.HTTPConnection(host, int(port), timeout=timeout)
+
+
+def _request(
+    daemon: dict,
+    method: str,
+    path: str,
+    body: Optional[dict] = None,
+    timeout: Optional[float] = None,
+) -> dict:
+    connection = _connect(daemon["address"], timeout)
+    try:
+        payload = json.dumps(body).encode("utf-8") if body is not None else None
+        headers = {TOKEN_HEADER: daemon["token"], "Content-Type": "application/json"}
+        connection.request(method, path, body=payload, headers=headers)
+        response = connection.getresponse()
+        data = json.loads(response.read() or b"{}")
+        if response.status != 200:
+            raise ConnectionError(data.get("error", f"HTTP {response.status}"))
+        return data
+    finally:
+        connection.close()
+
+
+def find_daemon(state_file: Optional[Path] = None) -> Optional[dict]:
+    """Returns the running daemon's state (address, pid, token), or None.
+
+    The daemon is considered running when its state file exists and it
+    answers /health quickly.
+    """
+    try:
+        daemon = json.loads((state_file or STATE_FILE).read_text())
+        _request(daemon, "GET", "/health", timeout=HEALTH_TIMEOUT)
+        return daemon
+    except (OSError, ValueError, KeyError, TypeError, http.client.HTTPException):
+        return None
+
+
+def submit_job(daemon: dict, argv: List[str], cwd: str) -> Tuple[int, str]:
+    """Runs a command line on the daemon and returns its exit code and output."""
+    result = _request(daemon, "POST", "/jobs", {"argv": argv, "cwd": cwd})
+    return int(result["exit_code"]), str(result["output"])
+
+
+def stop_daemon(daemon: dict):
+    """Asks the daemon to shut down."""
+    _request(daemon, "POST", "/shutdown", timeout=HEALTH_TIMEOUT)
@@ -0,0 +1,74 @@
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+from core.timing import record_dns
+
+DEFAULT_TTL = 300.0
+
+_original_getaddrinfo = socket.getaddrinfo
+
+
+class DnsCache:
+    """
+    An in-process TTL cache in front of socket.getaddrinfo.
+
+    While installed, every lookup made by the process (including the ones
+    urllib3 makes when opening a connection) is answered from the cache if a
+    fresh entry exists. Failed lookups are never cached.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple, Tuple[float, List]] = {}
+        self._installs = 0
+        self.hits = 0
+        self.misses = 0
+
+    def getaddrinfo(self, host, port, family=0, type=0, proto=0, flags=0) -> List:
+        """A drop-in replacement for socket.getaddrinfo that uses the cache."""
+        key = (host, port, family, type, proto, flags)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        start = time.perf_counter()
+        addresses = _original_getaddrinfo(host, port, family, type, proto, flags)
+        record_dns(time.perf_counter() - start)
+
+        with self._lock:
+            self._entries[key] = (now + self.ttl, addresses)
+        return addresses
+
+    @contextmanager
+    def installed(self) -> Iterator["DnsCache"]:
+        """Routes socket.getaddrinfo through the cache for the duration of the block.
+
+        Installs are reference-counted, so nested or concurrent runs can
+        share the cache safely.
+        """
+        with self._lock:
+            if self._installs == 0:
+                socket.getaddrinfo = self.getaddrinfo
+            self._installs += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._installs -= 1
+                if self._installs == 0:
+                    socket.getaddrinfo = _original_getaddrinfo
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+dns_cache = DnsCache()
@@ -0,0 +1,87 @@
+import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+import requests as rq
+from core.latency import HostLatencyTracker
+from core import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def _close_response(future: Future):
+    """Releases the connection of a request whose response nobody will read."""
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+class Hedger:
+    """
+    Sends a duplicate ("hedged") request when a fetch runs past the host's p95.
+
+    Whichever response arrives first is returned and the other one is
+    discarded: if it hasn't started yet it is cancelled, otherwise its
+    connection is closed as soon as it completes. The number of duplicates
+    is capped at `budget` times the number of fetches seen so far.
+    """
+
+    def __init__(
+        self, latency: HostLatencyTracker, budget: float = 0.05, max_workers: int = 20
+    ):
+        self.latency = latency
+        self.budget = budget
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="hedge"
+        )
+        self._lock = threading.Lock()
+        self.requests_seen = 0
+        self.hedges_sent = 0
+
+    def _try_acquire_hedge(self) -> bool:
+        with self._lock:
+            if self.hedges_sent + 1 > self.budget * self.requests_seen:
+                return False
+            self.hedges_sent += 1
+            return True
+
+    def get(self, session: rq.Session, url: str, host: str, **kwargs) -> rq.Response:
+        """Performs a GET, hedging it if it is slower than the host's p95.
+
+        Args:
+            session (rq.Session): The session used for both requests.
+            url (str): The URL to fetch.
+            host (str): The canonical host of the URL.
+            **kwargs: Extra arguments forwarded to session.get.
+
+        Returns:
+            rq.Response: The first response to arrive.
+        """
+        with self._lock:
+            self.requests_seen += 1
+
+        hedge_after = self.latency.percentile(host, 0.95)
+        if hedge_after is None:
+            return session.get(url, **kwargs)
+
+        primary = self._executor.submit(session.get, url, **kwargs)
+        done, _ = wait([primary], timeout=hedge_after)
+        if done or not self._try_acquire_hedge():
+            return primary.result()
+
+        logger.info("Hedging request to %s after %.2fs", url, hedge_after)
+        metrics.retries_total.inc(kind="hedge")
+        backup = self._executor.submit(session.get, url, **kwargs)
+        pending = {primary, backup}
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            winner = next((f for f in done if f.exception() is None), None)
+            if winner is not None:
+                for loser in (primary, backup):
+                    if loser is not winner and not loser.cancel():
+                        loser.add_done_callback(_close_response)
+                return winner.result()
+
+        return primary.result()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
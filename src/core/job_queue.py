@@ -0,0 +1,432 @@
+"""
+A durable job queue shared by the submit, worker and status commands.
+
+A job is a command line (e.g. a scan-metas run) whose input has been read
+at submit time and split into one task per input row. Tasks are stored in
+a SQLite database with the report layout, so any number of worker
+processes, started at any time, can lease them a few at a time:
+
+- A lease expires unless its worker renews it with heartbeat(); the tasks
+  of a worker that crashed or was killed go back to the queue, and are
+  given up on after MAX_ATTEMPTS leases.
+- Each finished task stores its report row. When the last task of a job is
+  done, one worker claims the job and writes its report, in input order.
+- Requests to a host are spaced by a budget shared through the database, so
+  concurrent jobs (and workers) never hit the same site together.
+
+Every change happens in a short `BEGIN IMMEDIATE` transaction, which SQLite
+serializes across processes.
+"""
+
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+import json
+import sqlite3
+import threading
+import time
+
+DEFAULT_QUEUE = Path.home() / ".seo-helper" / "queue.db"
+MAX_ATTEMPTS = 3
+INSERT_BATCH = 10_000
+
+TASK_QUEUED = "queued"
+TASK_LEASED = "leased"
+TASK_DONE = "done"
+TASK_FAILED = "failed"
+
+JOB_QUEUED = "queued"
+JOB_WRITING = "writing"
+JOB_DONE = "done"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    command TEXT NOT NULL,
+    argv TEXT NOT NULL,
+    cwd TEXT NOT NULL,
+    report TEXT NOT NULL,
+    status TEXT NOT NULL,
+    submitted_at REAL NOT NULL,
+    finished_at REAL,
+    report_path TEXT,
+    lease_owner TEXT,
+    lease_expires REAL
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    job_id INTEGER NOT NULL REFERENCES jobs(id),
+    position INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    result TEXT
+);
+CREATE INDEX IF NOT EXISTS tasks_by_status ON tasks (status, position, job_id);
+CREATE INDEX IF NOT EXISTS tasks_by_job ON tasks (job_id, status);
+CREATE TABLE IF NOT EXISTS host_budget (
+    host TEXT PRIMARY KEY,
+    next_at REAL NOT NULL
+);
+"""
+
+
+class LeasedTask(NamedTuple):
+    """A task handed to a worker: its job, input position and JSON payload."""
+
+    id: int
+    job_id: int
+    position: int
+    payload: Any
+
+
+class FinishedTask(NamedTuple):
+    """A task that won't run again: its payload, and its report row or error."""
+
+    payload: Any
+    failed: bool
+    result: Any
+
+
+class Job(NamedTuple):
+    """A submitted job, as stored in the queue."""
+
+    id: int
+    command: str
+    argv: List[str]
+    cwd: str
+    report: dict
+    status: str
+    submitted_at: float
+    finished_at: Optional[float]
+    report_path: Optional[str]
+
+
+class JobSummary(NamedTuple):
+    """A job and how many of its tasks are in each state."""
+
+    job: Job
+    total: int
+    done: int
+    failed: int
+    leased: int
+
+
+def _json_default(value: Any) -> Any:
+    # numpy scalars (from the pandas input) know how to become Python values.
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, default=_json_default, ensure_ascii=False)
+
+
+class JobQueue:
+    """
+    The queue database. One instance may be shared by the threads of a process.
+
+    Args:
+        path (Optional[Path]): The database file (DEFAULT_QUEUE by default),
+            created with its parent directory if needed.
+        clock (Callable[[], float]): Wall-clock time, shared by every process.
+    """
+
+    def __init__(self, path: Optional[Path] = None, clock=time.time):
+        self.path = Path(path or DEFAULT_QUEUE)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            self.path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._db
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+
+    def submit(
+        self,
+        command: str,
+        argv: List[str],
+        cwd: str,
+        report: dict,
+        payloads: Iterable[Any],
+    ) -> Tuple[int, int]:
+        """Adds a job and its tasks, one per payload, in input order.
+
+        Args:
+            command (str): The command name, e.g. 'scan-metas'.
+            argv (List[str]): The command's arguments, without its name.
+            cwd (str): Where the report is written (under results/).
+            report (dict): The report layout: name, columns, column_types,
+                output_format and output_compression.
+            payloads (Iterable[Any]): The JSON-serializable tasks.
+
+        Returns:
+            Tuple[int, int]: The job id and its number of tasks.
+        """
+        with self._transaction() as db:
+            job_id = db.execute(
+                "INSERT INTO jobs (command, argv, cwd, report, status, submitted_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (command, _dumps(argv), cwd, _dumps(report), JOB_QUEUED, self.clock()),
+            ).lastrowid
+
+            rows = (
+                (job_id, position, _dumps(payload), TASK_QUEUED)
+                for position, payload in enumerate(payloads)
+            )
+            count = 0
+            while True:
+                batch = [row for _, row in zip(range(INSERT_BATCH), rows)]
+                if not batch:
+                    break
+                db.executemany(
+                    "INSERT INTO tasks (job_id, position, payload, status)"
+                    " VALUES (?, ?, ?, ?)",
+                    batch,
+                )
+                count += len(batch)
+        return job_id, count
+
+    def _requeue_expired(self, db: sqlite3.Connection, now: float) -> int:
+        db.execute(
+            "UPDATE tasks SET status = ?, lease_owner = NULL, result = ?"
+            " WHERE status = ? AND lease_expires < ? AND attempts >= ?",
+            (
+                TASK_FAILED,
+                _dumps("lease expired too many times"),
+                TASK_LEASED,
+                now,
+                MAX_ATTEMPTS,
+            ),
+        )
+        return db.execute(
+            "UPDATE tasks SET status = ?, lease_owner = NULL"
+            " WHERE status = ? AND lease_expires < ?",
+            (TASK_QUEUED, TASK_LEASED, now),
+        ).rowcount
+
+    def lease(self, owner: str, limit: int, lease_seconds: float) -> List[LeasedTask]:
+        """Leases up to `limit` queued tasks to a worker.
+
+        Expired leases are returned to the queue first. Tasks are handed out
+        by input position across jobs, so concurrent jobs progress together.
+
+        Args:
+            owner (str): The worker's unique name.
+            limit (int): The maximum number of tasks to lease.
+            lease_seconds (float): How long the lease lasts without a heartbeat.
+
+        Returns:
+            List[LeasedTask]: The leased tasks (empty when the queue is idle).
+        """
+        with self._transaction() as db:
+            now = self.clock()
+            self._requeue_expired(db, now)
+            rows = db.execute(
+                "SELECT id, job_id, position, payload FROM tasks WHERE status = ?"
+                " ORDER BY position, job_id LIMIT ?",
+                (TASK_QUEUED, limit),
+            ).fetchall()
+            db.executemany(
+                "UPDATE tasks SET status = ?, lease_owner = ?, lease_expires = ?,"
+                " attempts = attempts + 1 WHERE id = ?",
+                [(TASK_LEASED, owner, now + lease_seconds, row[0]) for row in rows],
+            )
+        return [
+            LeasedTask(task_id, job_id, position, json.loads(payload))
+            for task_id, job_id, position, payload in rows
+        ]
+
+    def heartbeat(self, owner: str, lease_seconds: float) -> int:
+        """Extends every lease (tasks and report writing) held by a worker.
+
+        Returns:
+            int: The number of leases extended.
+        """
+        with self._transaction() as db:
+            expires = self.clock() + lease_seconds
+            tasks = db.execute(
+                "UPDATE tasks SET lease_expires = ? WHERE lease_owner = ? AND status = ?",
+                (expires, owner, TASK_LEASED),
+            ).rowcount
+            jobs = db.execute(
+                "UPDATE jobs SET lease_expires = ? WHERE lease_owner = ? AND status = ?",
+                (expires, owner, JOB_WRITING),
+            ).rowcount
+        return tasks + jobs
+
+    def _settle(self, task_id: int, owner: str, status: str, result: Any) -> bool:
+        with self._transaction() as db:
+            return bool(
+                db.execute(
+                    "UPDATE tasks SET status = ?, result = ?, lease_owner = NULL"
+                    " WHERE id = ? AND lease_owner = ? AND status = ?",
+                    (status, _dumps(result), task_id, owner, TASK_LEASED),
+                ).rowcount
+            )
+
+    def complete(self, task_id: int, owner: str, row: Any) -> bool:
+        """Stores a task's report row.
+
+        Returns:
+            bool: False if the worker had lost the lease (the row is dropped).
+        """
+        return self._settle(task_id, owner, TASK_DONE, row)
+
+    def fail(self, task_id: int, owner: str, error: str) -> bool:
+        """Gives up on a task that can't be run.
+
+        Returns:
+            bool: False if the worker had lost the lease.
+        """
+        return self._settle(task_id, owner, TASK_FAILED, error)
+
+    def reserve_host(self, host: str, interval: float) -> float:
+        """Books the next request slot for a host in the shared rate budget.
+
+        Slots are `interval` seconds apart, whichever job or worker asks.
+
+        Returns:
+            float: The clock time at which the request may be sent.
+        """
+        with self._transaction() as db:
+            now = self.clock()
+            row = db.execute(
+                "SELECT next_at FROM host_budget WHERE host = ?", (host,)
+            ).fetchone()
+            slot = max(now, row[0]) if row else now
+            db.execute(
+                "INSERT INTO host_budget (host, next_at) VALUES (?, ?)"
+                " ON CONFLICT (host) DO UPDATE SET next_at = excluded.next_at",
+                (host, slot + interval),
+            )
+        return slot
+
+    def claim_finished_jobs(self, owner: str, lease_seconds: float) -> List[Job]:
+        """Claims the jobs with no task left to run, to write their report.
+
+        A claim is a lease too: if its worker dies while writing, another
+        worker claims the job again once the lease expires.
+        """
+        with self._transaction() as db:
+            now = self.clock()
+            ids = [
+                row[0]
+                for row in db.execute(
+                    "SELECT id FROM jobs WHERE (status = ? OR (status = ? AND"
+                    " lease_expires < ?)) AND NOT EXISTS (SELECT 1 FROM tasks"
+                    " WHERE tasks.job_id = jobs.id AND tasks.status IN (?, ?))",
+                    (JOB_QUEUED, JOB_WRITING, now, TASK_QUEUED, TASK_LEASED),
+                )
+            ]
+            db.executemany(
+                "UPDATE jobs SET status = ?, lease_owner = ?, lease_expires = ?"
+                " WHERE id = ?",
+                [(JOB_WRITING, owner, now + lease_seconds, job_id) for job_id in ids],
+            )
+        return [self.job(job_id) for job_id in ids]
+
+    def results(self, job_id: int) -> Iterator[FinishedTask]:
+        """Yields a job's done and failed tasks, in input order.
+
+        A done task comes with its report row, a failed one with its error.
+        The tasks are streamed from a separate connection, so a large report
+        doesn't hold up the other threads of the worker.
+        """
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            for payload, status, result in db.execute(
+                "SELECT payload, status, result FROM tasks WHERE job_id = ?"
+                " AND status IN (?, ?) ORDER BY position",
+                (job_id, TASK_DONE, TASK_FAILED),
+            ):
+                yield FinishedTask(
+                    json.loads(payload), status == TASK_FAILED, json.loads(result)
+                )
+        finally:
+            db.close()
+
+    def finish_job(self, job_id: int, report_path: Optional[str]):
+        """Marks a job as done once its report is written."""
+        with self._transaction() as db:
+            db.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, report_path = ?,"
+                " lease_owner = NULL WHERE id = ?",
+                (JOB_DONE, self.clock(), report_path, job_id),
+            )
+
+    def job(self, job_id: int) -> Optional[Job]:
+        """Returns a job by id, or None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, command, argv, cwd, report, status, submitted_at,"
+                " finished_at, report_path FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return Job(
+            row[0], row[1], json.loads(row[2]), row[3], json.loads(row[4]), *row[5:]
+        )
+
+    def summaries(self) -> List[JobSummary]:
+        """Returns every job with its task counts, oldest first."""
+        with self._lock:
+            counts = self._db.execute(
+                "SELECT job_id, status, COUNT(*) FROM tasks GROUP BY job_id, status"
+            ).fetchall()
+            job_ids = [
+                row[0] for row in self._db.execute("SELECT id FROM jobs ORDER BY id")
+            ]
+
+        by_job: dict = {}
+        for job_id, status, count in counts:
+            by_job.setdefault(job_id, {})[status] = count
+
+        summaries = []
+        for job_id in job_ids:
+            states = by_job.get(job_id, {})
+            summaries.append(
+                JobSummary(
+                    self.job(job_id),
+                    sum(states.values()),
+                    states.get(TASK_DONE, 0),
+                    states.get(TASK_FAILED, 0),
+                    states.get(TASK_LEASED, 0),
+                )
+            )
+        return summaries
+
+    def is_idle(self) -> bool:
+        """Returns True when no task is left to run and no report to write."""
+        with self._lock:
+            busy = self._db.execute(
+                "SELECT EXISTS (SELECT 1 FROM tasks WHERE status IN (?, ?))"
+                " OR EXISTS (SELECT 1 FROM jobs WHERE status != ?)",
+                (TASK_QUEUED, TASK_LEASED, JOB_DONE),
+            ).fetchone()[0]
+        return not busy
@@ -0,0 +1,98 @@
+import bisect
+import threading
+from typing import Dict, List, Optional, Tuple
+
+# Log-spaced bucket upper bounds (in seconds), from 0.1ms up to ~50s.
+BUCKET_BOUNDS = [0.0001 * 1.25**i for i in range(60)]
+
+DEFAULT_TIMEOUT = 10.0
+MIN_CONNECT_TIMEOUT = 3.05
+MIN_READ_TIMEOUT = 2.0
+MIN_SAMPLES = 20
+
+
+class LatencyHistogram:
+    """A fixed-bucket latency histogram that answers approximate percentiles."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.total = 0
+
+    def record(self, seconds: float):
+        self.counts[bisect.bisect_left(BUCKET_BOUNDS, seconds)] += 1
+        self.total += 1
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Returns the upper bound of the bucket holding the q-th quantile.
+
+        Args:
+            q (float): The quantile to look up, between 0 and 1.
+
+        Returns:
+            Optional[float]: The latency in seconds, or None if there are no samples.
+        """
+        if self.total == 0:
+            return None
+
+        rank = q * self.total
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                if index < len(BUCKET_BOUNDS):
+                    return BUCKET_BOUNDS[index]
+                return BUCKET_BOUNDS[-1]
+        return BUCKET_BOUNDS[-1]
+
+
+class HostLatencyTracker:
+    """
+    Keeps one latency histogram per host and derives adaptive timeouts from it.
+
+    Until a host has MIN_SAMPLES recorded fetches, the fixed DEFAULT_TIMEOUT is
+    used. After that, the connect and read timeouts follow the host's observed
+    p95/p99, clamped so they never exceed the default.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, LatencyHistogram] = {}
+
+    def record(self, host: str, seconds: float):
+        with self._lock:
+            histogram = self._histograms.get(host)
+            if histogram is None:
+                histogram = self._histograms[host] = LatencyHistogram()
+            histogram.record(seconds)
+
+    def percentile(
+        self, host: str, q: float, min_samples: int = MIN_SAMPLES
+    ) -> Optional[float]:
+        """Returns the host's q-th latency quantile once enough samples exist."""
+        with self._lock:
+            histogram = self._histograms.get(host)
+            if histogram is None or histogram.total < min_samples:
+                return None
+            return histogram.percentile(q)
+
+    def timeout_for(self, host: str) -> Tuple[float, float]:
+        """Computes the (connect, read) timeout to use for the next fetch to host.
+
+        Args:
+            host (str): The canonical host of the URL about to be fetched.
+
+        Returns:
+            Tuple[float, float]: The connect and read timeouts, in seconds.
+        """
+        p95 = self.percentile(host, 0.95)
+        p99 = self.percentile(host, 0.99)
+        if p95 is None or p99 is None:
+            return (DEFAULT_TIMEOUT, DEFAULT_TIMEOUT)
+
+        connect = min(max(2 * p95, MIN_CONNECT_TIMEOUT), DEFAULT_TIMEOUT)
+        read = min(max(4 * p99, MIN_READ_TIMEOUT), DEFAULT_TIMEOUT)
+        return (connect, read)
+
+    def hosts(self) -> List[str]:
+        with self._lock:
+            return list(self._histograms)
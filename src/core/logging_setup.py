@@ -0,0 +1,232 @@
+"""
+Non-blocking logging for the worker threads.
+
+Records are put on an in-memory queue by a QueueHandler and written to disk
+by a QueueListener thread, so a worker thread logging a failure never waits
+on a file lock or a disk write. A DuplicateFilter in front of the queue
+drops repeats of the same message (same template, same host) beyond a small
+burst per interval, and logs how many were dropped, so a broken host
+produces "example.com: 3,412 similar messages suppressed" instead of
+thousands of lines.
+
+Messages should be logged lazily (logger.error("... %s", value)): the
+string is only built when the listener thread formats the record.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+import time
+
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+DUPLICATE_BURST = 5
+DUPLICATE_INTERVAL = 60.0
+
+
+@dataclass
+class _Window:
+    start: float
+    count: int = 0
+    suppressed: int = 0
+
+
+class DuplicateFilter(logging.Filter):
+    """
+    Lets through at most `burst` records with the same template and host per
+    `interval` seconds.
+
+    The key is the unformatted message (record.msg), the level, the logger
+    and the record's `host` attribute when it was passed in `extra`. When a
+    window with dropped records ends, or on flush(), a summary record is
+    logged to the same logger.
+    """
+
+    SUMMARY = "%s: %s similar messages suppressed in %.0fs (%s)"
+
+    def __init__(
+        self,
+        burst: int = DUPLICATE_BURST,
+        interval: float = DUPLICATE_INTERVAL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self._clock = clock
+        self._windows: Dict[Hashable, _Window] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(record: logging.LogRecord) -> Tuple:
+        return (
+            record.name,
+            record.levelno,
+            str(record.msg),
+            getattr(record, "host", None),
+        )
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "suppression_summary", False):
+            return True
+
+        key = self._key(record)
+        now = self._clock()
+        expired: Optional[Tuple[Tuple, _Window]] = None
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window.start >= self.interval:
+                if window is not None and window.suppressed:
+                    expired = (key, window)
+                window = self._windows[key] = _Window(now)
+            window.count += 1
+            allowed = window.count <= self.burst
+            if not allowed:
+                window.suppressed += 1
+
+        if expired is not None:
+            self._log_summary(*expired, now)
+        return allowed
+
+    def flush(self):
+        """Logs a summary for every window that dropped records."""
+        now = self._clock()
+        with self._lock:
+            pending = [
+                (key, window)
+                for key, window in self._windows.items()
+                if window.suppressed
+            ]
+            self._windows.clear()
+        for key, window in pending:
+            self._log_summary(key, window, now)
+
+    def _log_summary(self, key: Tuple, window: _Window, now: float):
+        name, levelno, template, host = key
+        logging.getLogger(name).log(
+            levelno,
+            self.SUMMARY,
+            host or name,
+            f"{window.suppressed:,}",
+            min(now - window.start, self.interval),
+            template,
+            extra={"suppression_summary": True},
+        )
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        host = getattr(record, "host", None)
+        if host is not None:
+            entry["host"] = host
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    A QueueHandler that enqueues the record untouched.
+
+    The stock prepare() formats the message in the calling thread; here the
+    listener's handlers format it, so the worker thread only pays for the
+    put(). Exception info is turned into text first, since tracebacks hold
+    references to the worker's frames.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.handlers.QueueHandler] = None
+_duplicate_filter: Optional[DuplicateFilter] = None
+
+
+def configure_logging(
+    log_directory: Path = Path("./logs"),
+    json_path: Optional[str] = None,
+    level: int = logging.INFO,
+) -> logging.handlers.QueueListener:
+    """Routes the root logger through a queue to <log_directory>/app.log.
+
+    Args:
+        log_directory (Path): Where app.log is written.
+        json_path (Optional[str]): Also write a JSON-lines log to this path.
+        level (int): The root logger's level.
+
+    Returns:
+        logging.handlers.QueueListener: The running listener.
+    """
+    global _listener, _queue_handler, _duplicate_filter
+
+    shutdown_logging()
+
+    log_directory.mkdir(exist_ok=True)
+    file_handler = logging.FileHandler(log_directory / "app.log")
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    handlers: List[logging.Handler] = [file_handler]
+    if json_path:
+        handlers.append(_json_handler(json_path))
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _duplicate_filter = DuplicateFilter()
+    _queue_handler = _QueueHandler(log_queue)
+    _queue_handler.addFilter(_duplicate_filter)
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(_queue_handler)
+
+    _listener = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+    _listener.start()
+    return _listener
+
+
+def _json_handler(path: str) -> logging.Handler:
+    handler = logging.FileHandler(path, encoding="utf-8")
+    handler.setFormatter(JsonFormatter())
+    return handler
+
+
+def add_json_log(path: str):
+    """Adds a JSON-lines log to the running listener."""
+    if _listener is None:
+        return
+    _listener.stop()
+    _listener.handlers = (*_listener.handlers, _json_handler(path))
+    _listener.start()
+
+
+def shutdown_logging():
+    """Logs pending suppression summaries, drains the queue and closes the files."""
+    global _listener, _queue_handler, _duplicate_filter
+
+    if _listener is None:
+        return
+    _duplicate_filter.flush()
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    logging.getLogger().removeHandler(_queue_handler)
+    _listener = _queue_handler = _duplicate_filter = None
@@ -0,0 +1,103 @@
+import socket
+import ssl
+import threading
+import time
+from typing import Dict, Iterator, Optional, Set, Tuple
+from requests.exceptions import ConnectionError, SSLError
+from urllib3.exceptions import NameResolutionError
+from urllib3.exceptions import SSLError as Urllib3SSLError
+from core import metrics
+
+DEFAULT_TTL = 60.0
+
+
+class HostUnreachableError(ConnectionError):
+    """Raised instead of fetching a URL whose host recently failed at host level."""
+
+
+def _iter_causes(error: BaseException) -> Iterator[BaseException]:
+    """Walks an exception and the errors it wraps (requests and urllib3 nest them)."""
+    seen: Set[int] = set()
+    pending = [error]
+    while pending:
+        current = pending.pop()
+        if current is None or id(current) in seen:
+            continue
+        seen.add(id(current))
+        yield current
+        pending.extend([current.__cause__, current.__context__])
+        pending.append(getattr(current, "reason", None))
+        pending.extend(arg for arg in current.args if isinstance(arg, BaseException))
+
+
+def classify_host_failure(error: BaseException) -> Optional[str]:
+    """Tells whether a request error means the whole host is unreachable.
+
+    Args:
+        error (BaseException): The exception raised by requests (or by
+            urllib3/socket when connecting directly).
+
+    Returns:
+        Optional[str]: "dns", "connection refused" or "tls" for host-level
+                       failures, or None for errors that only concern one URL.
+    """
+    for cause in _iter_causes(error):
+        if isinstance(cause, (SSLError, Urllib3SSLError, ssl.SSLError)):
+            return "tls"
+        if isinstance(cause, (NameResolutionError, socket.gaierror)):
+            return "dns"
+        if isinstance(cause, ConnectionRefusedError):
+            return "connection refused"
+    return None
+
+
+class HostNegativeCache:
+    """
+    Remembers hosts that failed with a host-level error for a short TTL.
+
+    While a host is cached, the rest of its URLs are failed immediately with
+    the cached error instead of going through a full request attempt.
+    """
+
+    def __init__(self, ttl: float = DEFAULT_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[float, str]] = {}
+        self.short_circuited = 0
+
+    def record(self, host: str, failure_class: str, message: str):
+        with self._lock:
+            self._entries[host] = (
+                time.monotonic() + self.ttl,
+                f"{failure_class} failure: {message}",
+            )
+
+    def check(self, host: str) -> Optional[str]:
+        """Returns the cached error for host, counting it as short-circuited.
+
+        Args:
+            host (str): The canonical host about to be fetched.
+
+        Returns:
+            Optional[str]: The cached error message, or None if the host is
+                           not (or no longer) known to be unreachable.
+        """
+        with self._lock:
+            entry = self._entries.get(host)
+            if entry is None:
+                return None
+            expires_at, message = entry
+            if expires_at <= time.monotonic():
+                del self._entries[host]
+                return None
+            self.short_circuited += 1
+        metrics.fetches_short_circuited.inc()
+        return message
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.short_circuited = 0
+
+
+unreachable_hosts = HostNegativeCache()
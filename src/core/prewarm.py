@@ -0,0 +1,134 @@
+import logging
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, Tuple
+from urllib.parse import urlsplit
+import requests as rq
+from urllib3.util.connection import allowed_gai_family
+from core.crawler import HEADERS
+from core.dns_cache import DnsCache
+from core.latency import DEFAULT_TIMEOUT
+from core.negative_cache import classify_host_failure, unreachable_hosts
+from core.urls import DEFAULT_PORTS, canonical_host
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PrewarmReport:
+    """What the pre-flight stage did, and how long it took."""
+
+    hosts: int = 0
+    resolved: int = 0
+    connected: int = 0
+    seconds: float = 0.0
+
+
+def _distinct_origins(urls: Iterable[str]) -> Dict[str, Tuple[str, str, int]]:
+    """Maps each canonical host to the (scheme, hostname, port) used to reach it."""
+    origins = {}
+    for url in urls:
+        parts = urlsplit(str(url).strip())
+        scheme = parts.scheme.lower()
+        if scheme not in DEFAULT_PORTS or not parts.hostname:
+            continue
+        host = canonical_host(url)
+        if host not in origins:
+            try:
+                port = parts.port or DEFAULT_PORTS[scheme]
+            except ValueError:
+                continue
+            origins[host] = (scheme, parts.hostname.lower(), port)
+    return origins
+
+
+def _warm_origin(
+    session: rq.Session, dns_cache: DnsCache, host: str, origin: Tuple[str, str, int]
+) -> Tuple[bool, bool]:
+    """Resolves one origin and parks an open connection in the session's pool.
+
+    The connection is opened by a HEAD request to the origin's root, with
+    the session's connect timeout, so a blackholed host can't hold up the
+    pre-flight stage for the OS's TCP timeout.
+
+    Returns:
+        Tuple[bool, bool]: Whether the host was resolved and whether a
+                           connection was opened.
+    """
+    scheme, hostname, port = origin
+    try:
+        dns_cache.getaddrinfo(hostname, port, allowed_gai_family(), socket.SOCK_STREAM)
+    except OSError as e:
+        logger.warning(
+            "Pre-warm could not resolve %s: %s", host, e, extra={"host": host}
+        )
+        unreachable_hosts.record(host, "dns", str(e))
+        return False, False
+
+    url = f"{scheme}://{host}/"
+    latency = getattr(session, "latency", None)
+    timeout = (
+        latency.timeout_for(host)
+        if latency is not None
+        else (DEFAULT_TIMEOUT, DEFAULT_TIMEOUT)
+    )
+    try:
+        # A HEAD has no body, so its connection (TLS handshake included) goes
+        # straight back to the session's pool for the crawl to reuse.
+        session.head(url, timeout=timeout, allow_redirects=False, headers=HEADERS)
+        return True, True
+    except Exception as e:
+        logger.warning(
+            "Pre-warm could not connect to %s: %s", host, e, extra={"host": host}
+        )
+        failure_class = classify_host_failure(e)
+        if failure_class is not None:
+            unreachable_hosts.record(host, failure_class, str(e))
+        return True, False
+
+
+def prewarm(
+    session: rq.Session,
+    urls: Iterable[str],
+    dns_cache: DnsCache,
+    max_workers: int = 10,
+) -> PrewarmReport:
+    """Resolves the distinct hosts of urls and opens one keep-alive connection to each.
+
+    The connections are opened through the same pools the session will use
+    for the real requests (TLS handshake included), so the first request to
+    each host reuses an already established connection. Hosts that fail to
+    resolve or refuse the connection are recorded in the negative cache.
+
+    Args:
+        session (rq.Session): The session whose connection pools are warmed.
+        urls (Iterable[str]): The URLs about to be crawled.
+        dns_cache (DnsCache): The cache that receives the resolved addresses.
+        max_workers (int): How many hosts to warm concurrently.
+
+    Returns:
+        PrewarmReport: Counts of hosts seen, resolved and connected, and the time spent.
+    """
+    start = time.perf_counter()
+    origins = _distinct_origins(urls)
+    report = PrewarmReport(hosts=len(origins))
+
+    if origins:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            outcomes = executor.map(
+                lambda item: _warm_origin(session, dns_cache, *item), origins.items()
+            )
+            for resolved, connected in outcomes:
+                report.resolved += resolved
+                report.connected += connected
+
+    report.seconds = time.perf_counter() - start
+    logger.info(
+        "Pre-warmed %d/%d hosts in %.2fs",
+        report.connected,
+        report.hosts,
+        report.seconds,
+    )
+    return report
@@ -0,0 +1,223 @@
+import cProfile
+import io
+import linecache
+import pstats
+import sys
+import threading
+from collections import Counter
+from typing import List, Optional
+
+# Ordered rules mapping a frame's file path to a pipeline stage. The first
+# rule whose marker appears in the (normalized) path wins.
+STAGE_RULES = [
+    ("write excel", ("xlsxwriter/", "reporting/excel_writer.py", "openpyxl/writer")),
+    ("read input", ("reporting/excel_reader.py", "pandas/io/", "openpyxl/")),
+    ("parse", ("bs4/", "lxml/", "html/parser.py", "_markupbase.py", "soupsieve/")),
+    (
+        "fetch",
+        (
+            "requests/",
+            "urllib3/",
+            "socket.py",
+            "ssl.py",
+            "http/client.py",
+            "core/crawler.py",
+            "core/session.py",
+            "core/hedging.py",
+        ),
+    ),
+    ("compare", ("commands/",)),
+]
+IDLE_MARKERS = ("threading.py", "queue.py", "concurrent/futures/", "selectors.py")
+
+# From Python 3.12 cProfile runs on sys.monitoring: a profiler sees every
+# thread of the process, and only one profiler can be active at a time.
+PROCESS_WIDE_CPROFILE = sys.version_info >= (3, 12)
+
+
+def classify_path(filename: str) -> Optional[str]:
+    """Returns the pipeline stage a source file belongs to, if any."""
+    path = filename.replace("\\", "/")
+    for stage, markers in STAGE_RULES:
+        if any(marker in path for marker in markers):
+            return stage
+    return None
+
+
+def classify_builtin(name: str) -> str:
+    """Maps a C function as reported by cProfile (file '~') to a stage."""
+    if "sleep" in name:
+        return "sleep"
+    if "acquire" in name or "wait" in name:
+        return "idle"
+    if "_socket" in name or "_ssl" in name or "select" in name:
+        return "fetch"
+    return "other"
+
+
+def _stage_percentages(counts: Counter, total: float) -> List[str]:
+    return [
+        f"  {stage:<14} {value / total:>6.1%}"
+        for stage, value in counts.most_common()
+        if total
+    ]
+
+
+class SamplingProfiler:
+    """
+    Periodically samples the stacks of every thread in the process.
+
+    Sampling covers the engine's worker threads (and any nested pools)
+    without instrumenting them. Each sample is attributed to the innermost
+    frame that belongs to a known stage; threads sitting in the politeness
+    sleep or waiting on a queue/lock are counted separately.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.stages: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._run, name="sampling-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own_id:
+                    self._sample(frame)
+
+    def _sample(self, frame):
+        stack = []
+        stage = None
+        innermost = True
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({code.co_filename}:{frame.f_lineno})")
+            if innermost:
+                line = linecache.getline(code.co_filename, frame.f_lineno)
+                path = code.co_filename.replace("\\", "/")
+                if "sleep(" in line:
+                    stage = "sleep"
+                elif any(marker in path for marker in IDLE_MARKERS):
+                    stage = "idle"
+                innermost = False
+            if stage is None:
+                stage = classify_path(code.co_filename)
+            frame = frame.f_back
+
+        self.stacks[";".join(reversed(stack))] += 1
+        self.stages[stage or "other"] += 1
+        self.samples += 1
+
+    def dump(self, path: str):
+        """Writes the samples in collapsed-stack format (for flamegraph tools)."""
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def summary(self, top_n: int = 15) -> List[str]:
+        busy = Counter(
+            {stage: n for stage, n in self.stages.items() if stage != "idle"}
+        )
+        lines = [f"Samples: {self.samples} (every {self.interval * 1000:.0f}ms)"]
+        lines.append("Time by stage (excluding idle threads):")
+        lines.extend(_stage_percentages(busy, sum(busy.values())))
+
+        leaves = Counter()
+        for stack, count in self.stacks.items():
+            leaf = stack.rsplit(";", 1)[-1]
+            if not any(marker in leaf for marker in IDLE_MARKERS):
+                leaves[leaf] += count
+        lines.append(f"Top {top_n} sampled functions:")
+        lines.extend(f"  {count:>7}  {leaf}" for leaf, count in leaves.most_common(top_n))
+        return lines
+
+
+class CProfileProfiler:
+    """
+    Runs cProfile on the main thread and on every thread started while active.
+
+    Before Python 3.12, worker threads are hooked through
+    threading.setprofile: the first event in each new thread installs a
+    dedicated cProfile.Profile for it, and all profiles are merged into one
+    pstats file when the run stops. From 3.12, a single process-wide profile
+    already covers every thread (see PROCESS_WIDE_CPROFILE).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._profiles: List[cProfile.Profile] = []
+        self._main = cProfile.Profile()
+        self.stats: Optional[pstats.Stats] = None
+
+    def _install_in_thread(self, frame, event, arg):
+        profile = cProfile.Profile()
+        with self._lock:
+            self._profiles.append(profile)
+        profile.enable()
+
+    def start(self):
+        if not PROCESS_WIDE_CPROFILE:
+            threading.setprofile(self._install_in_thread)
+        self._main.enable()
+
+    def stop(self):
+        self._main.disable()
+        if not PROCESS_WIDE_CPROFILE:
+            threading.setprofile(None)
+
+        self.stats = pstats.Stats(self._main)
+        with self._lock:
+            for profile in self._profiles:
+                profile.disable()
+                self.stats.add(profile)
+
+    def dump(self, path: str):
+        """Writes the merged profile as a pstats file."""
+        if self.stats is not None:
+            self.stats.dump_stats(path)
+
+    def summary(self, top_n: int = 15) -> List[str]:
+        if self.stats is None:
+            return []
+
+        stages = Counter()
+        for (filename, _, name), (_, _, tottime, _, _) in self.stats.stats.items():
+            if filename == "~":
+                stage = classify_builtin(name)
+            else:
+                stage = classify_path(filename) or "other"
+            stages[stage] += tottime
+
+        busy = Counter({stage: t for stage, t in stages.items() if stage != "idle"})
+        lines = ["Self time by stage (all threads, excluding idle waits):"]
+        lines.extend(_stage_percentages(busy, sum(busy.values())))
+
+        output = io.StringIO()
+        self.stats.stream = output
+        self.stats.sort_stats("cumulative").print_stats(top_n)
+        lines.append(f"Top {top_n} functions by cumulative time:")
+        lines.extend(
+            line for line in output.getvalue().splitlines() if line.strip()
+        )
+        return lines
+
+
+def create_profiler(mode: str):
+    """Builds the profiler for --profile-mode ('sample' or 'cprofile')."""
+    if mode == "cprofile":
+        return CProfileProfiler()
+    return SamplingProfiler()
@@ -0,0 +1,162 @@
+import json
+import sys
+import time
+from collections import Counter, deque
+from typing import Callable, Optional, TextIO
+from tqdm import tqdm
+
+PROGRESS_MODES = ("bar", "jsonl", "none")
+REFRESH_INTERVAL = 0.5
+RATE_WINDOW = 30.0
+BAR_HOSTS = 3
+
+
+class ProgressReporter:
+    """
+    Reports the progress of a crawl without slowing down its collection loop.
+
+    Every completion is only counted; the description, throughput, ETA and
+    per-host counts are computed at most once per refresh interval. The
+    collection loop also calls tick() while it waits, so the output keeps
+    coming every interval when no task completes. The throughput and the
+    per-host counts come from the completions seen in the last `window`
+    seconds, so the ETA follows the current speed rather than the average
+    of the run, and the hosts shown are the ones being crawled now.
+
+    Modes:
+        bar: a tqdm progress bar on the terminal.
+        jsonl: one JSON object per refresh on stderr (for orchestrators).
+        none: no output.
+    """
+
+    def __init__(
+        self,
+        total: Optional[int],
+        mode: str = "bar",
+        desc_provider: Optional[Callable] = None,
+        colour: str = "green",
+        interval: float = REFRESH_INTERVAL,
+        window: float = RATE_WINDOW,
+        stream: Optional[TextIO] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if mode not in PROGRESS_MODES:
+            raise ValueError(f"Unknown progress mode: {mode}")
+        self.total = total
+        self.mode = mode
+        self.desc_provider = desc_provider
+        self.interval = interval
+        self.window = window
+        self.stream = stream or sys.stderr
+        self.clock = clock
+        self.done = 0
+        self.hosts: Counter = Counter()
+        self._completions: deque = deque()
+        self._started_at = clock()
+        self._next_refresh = self._started_at + interval
+        self._last_task = None
+        self._rendered = 0
+        self._pbar = None
+        if mode == "bar":
+            self._pbar = tqdm(
+                total=total,
+                bar_format="{l_bar}{bar:40}| {n_fmt}/{total_fmt} [{elapsed}{postfix}]",
+                colour=colour,
+                mininterval=interval,
+            )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def advance(self, task=None, host: Optional[str] = None):
+        """Counts one completed task and refreshes the output if it is due.
+
+        Args:
+            task: The completed task, used for the description on refresh.
+            host (Optional[str]): The task's host, for the per-host counts.
+        """
+        self.done += 1
+        now = self.clock()
+        self._completions.append((now, host))
+        if host is not None:
+            self.hosts[host] += 1
+        self._last_task = task
+        self.tick(now)
+
+    def tick(self, now: Optional[float] = None):
+        """Refreshes the output if the refresh interval has passed."""
+        now = self.clock() if now is None else now
+        if now >= self._next_refresh:
+            self._next_refresh = now + self.interval
+            self.refresh(now)
+
+    def rate(self, now: Optional[float] = None) -> float:
+        """Returns the completions per second over the rolling window."""
+        now = self.clock() if now is None else now
+        cutoff = now - self.window
+        while self._completions and self._completions[0][0] < cutoff:
+            _, host = self._completions.popleft()
+            if host is not None:
+                self.hosts[host] -= 1
+                if not self.hosts[host]:
+                    del self.hosts[host]
+        span = min(self.window, now - self._started_at)
+        return len(self._completions) / span if span > 0 else 0.0
+
+    def eta(self, now: Optional[float] = None) -> Optional[float]:
+        """Returns the estimated seconds left at the current rate, if known."""
+        rate = self.rate(now)
+        if rate <= 0 or self.total is None:
+            return None
+        return (self.total - self.done) / rate
+
+    def snapshot(self, now: Optional[float] = None, top_hosts: int = 10) -> dict:
+        """Returns the current progress as a JSON-serializable dict."""
+        now = self.clock() if now is None else now
+        eta = self.eta(now)
+        return {
+            "done": self.done,
+            "total": self.total,
+            "elapsed_s": round(now - self._started_at, 3),
+            "rate_per_s": round(self.rate(now), 3),
+            "eta_s": round(eta, 1) if eta is not None else None,
+            "hosts": dict(self.hosts.most_common(top_hosts)),
+        }
+
+    def refresh(self, now: Optional[float] = None):
+        """Renders the current progress in the reporter's mode."""
+        now = self.clock() if now is None else now
+        if self.mode == "jsonl":
+            self._emit("progress", now)
+        elif self._pbar is not None:
+            if self.desc_provider is not None and self._last_task is not None:
+                description = str(self.desc_provider(self._last_task))
+                self._pbar.set_description(
+                    f"Processing {description[:50]}", refresh=False
+                )
+            postfix = f"{self.rate(now):.1f} URLs/s"
+            if self.hosts:
+                top = self.hosts.most_common(BAR_HOSTS)
+                postfix += " | " + ", ".join(f"{host} {n}" for host, n in top)
+            self._pbar.set_postfix_str(postfix, refresh=False)
+            self._pbar.update(self.done - self._rendered)
+        self._rendered = self.done
+
+    def close(self):
+        """Renders the final state and releases the terminal."""
+        now = self.clock()
+        if self.mode == "jsonl":
+            self._emit("done", now)
+        elif self._pbar is not None:
+            self._pbar.update(self.done - self._rendered)
+            self._pbar.close()
+        self._rendered = self.done
+
+    def _emit(self, event: str, now: float):
+        line = {"event": event, **self.snapshot(now)}
+        self.stream.write(json.dumps(line) + "\n")
+        self.stream.flush()
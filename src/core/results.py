@@ -0,0 +1,25 @@
+from typing import Dict
+from core.negative_cache import HostUnreachableError
+
+STATUS_OK = "ok"
+STATUS_ERROR = "error"
+# No request was sent: the URL's host had just failed at host level.
+STATUS_SHORT_CIRCUITED = "short_circuited"
+
+# The columns that tell whether a URL could be checked, and why not.
+STATUS_COLUMN_TYPES: Dict[str, str] = {"Status": "category", "Error": "string"}
+
+
+def error_status(error: BaseException) -> str:
+    """Returns the Status of a URL that failed with error.
+
+    Args:
+        error (BaseException): Why the URL could not be checked.
+
+    Returns:
+        str: STATUS_SHORT_CIRCUITED if the unreachable-host cache skipped the
+            request, else STATUS_ERROR.
+    """
+    if isinstance(error, HostUnreachableError):
+        return STATUS_SHORT_CIRCUITED
+    return STATUS_ERROR
@@ -0,0 +1,37 @@
+import argparse
+from dataclasses import dataclass, fields
+
+
+@dataclass(frozen=True)
+class RunOptions:
+    """How a command runs a crawl and writes its report, as set by the engine options.
+
+    The options of the CrawlSession itself (hedging, politeness delay) are
+    in SessionOptions.
+    """
+
+    prewarm: bool = True
+    timings: bool = False
+    progress: str = "bar"
+    cache_input: bool = False
+    output_format: str = "xlsx"
+    output_compression: str | None = None
+    shard: tuple[int, int] | None = None
+
+    @classmethod
+    def from_args(cls, args: argparse.Namespace) -> "RunOptions":
+        """Builds the options from the parsed command-line arguments.
+
+        Args:
+            args (argparse.Namespace): The parsed arguments. Options that are
+                missing from it keep their default value.
+
+        Returns:
+            RunOptions: The options for the run.
+        """
+        values = {
+            field.name: getattr(args, field.name)
+            for field in fields(cls)
+            if hasattr(args, field.name)
+        }
+        return cls(**values)
@@ -0,0 +1,230 @@
+"""
+User-defined checks given as CSS selectors or XPath expressions.
+
+Each check is compiled once per run into an lxml XPath object (CSS
+selectors are translated to XPath by lxml's `cssselect` support) and
+evaluated on the lxml tree of a page, which is parsed once and shared by
+every check. A check returns whether it matched ('exists'), the first
+match's value ('value') or the number of matches ('count').
+
+The meta tag checks of scan-metas and compare-metas are such checks too
+(see meta_selector), so every lookup on a page goes through this module.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional
+import argparse
+import re
+from lxml import etree
+from lxml.cssselect import CSSSelector
+import lxml.html
+
+EXISTS = "exists"
+VALUE = "value"
+COUNT = "count"
+RESULTS = (EXISTS, VALUE, COUNT)
+RESULT_COLUMN_TYPES = {EXISTS: "boolean", VALUE: "string", COUNT: "int"}
+
+CSS = "css"
+XPATH = "xpath"
+
+_ATTRIBUTE = re.compile(r"::attr\(\s*([^)\s]+)\s*\)\s*$")
+_SPEC = re.compile(r"^(?P<name>[^:=]+?)(?::(?P<result>\w+))?=(?P<expression>.+)$")
+
+
+@dataclass(frozen=True)
+class SelectorCheck:
+    """A check on a page, before compilation.
+
+    Attributes:
+        name (str): The check's name (its report column).
+        expression (str): The CSS selector or XPath expression.
+        language (str): CSS or XPATH.
+        result (str): EXISTS, VALUE or COUNT.
+        attribute (Optional[str]): For VALUE, the attribute to read from the
+            first matched element (its text when None).
+    """
+
+    name: str
+    expression: str
+    language: str = CSS
+    result: str = EXISTS
+    attribute: Optional[str] = None
+
+
+def parse_selector_check(spec: str) -> SelectorCheck:
+    """Parses a 'NAME[:RESULT]=EXPRESSION' check for argparse.
+
+    Expressions starting with '/' or '(' are XPath, the others CSS (a 'css:'
+    or 'xpath:' prefix forces the language). A CSS selector may end with
+    '::attr(NAME)' to read an attribute of the first match.
+
+    Examples:
+        canonical:value=link[rel=canonical]::attr(href)
+        hreflang:count=link[rel=alternate][hreflang]
+        json_ld=//script[@type="application/ld+json"]
+
+    Raises:
+        argparse.ArgumentTypeError: If the spec is malformed.
+    """
+    match = _SPEC.match(spec.strip())
+    if match is None:
+        raise argparse.ArgumentTypeError(
+            f"invalid check '{spec}', expected NAME[:RESULT]=EXPRESSION"
+        )
+    result = match["result"] or EXISTS
+    if result not in RESULTS:
+        raise argparse.ArgumentTypeError(
+            f"invalid result '{result}' in '{spec}', expected one of {', '.join(RESULTS)}"
+        )
+
+    expression = match["expression"].strip()
+    if expression.startswith(("css:", "xpath:")):
+        language, expression = expression.split(":", 1)
+    else:
+        language = XPATH if expression.startswith(("/", "(")) else CSS
+
+    attribute = None
+    attribute_match = _ATTRIBUTE.search(expression)
+    if language == CSS and attribute_match:
+        attribute = attribute_match[1]
+        expression = expression[: attribute_match.start()]
+
+    return SelectorCheck(match["name"].strip(), expression, language, result, attribute)
+
+
+def _xpath_literal(value: str) -> str:
+    """Quotes a string for use in an XPath expression."""
+    if '"' not in value:
+        return f'"{value}"'
+    if "'" not in value:
+        return f"'{value}'"
+    parts = value.split('"')
+    return "concat(" + ', \'"\', '.join(f'"{part}"' for part in parts) + ")"
+
+
+class CompiledSelector:
+    """
+    A SelectorCheck compiled to an lxml XPath object.
+
+    Raises:
+        ValueError: If the expression is invalid.
+    """
+
+    def __init__(self, check: SelectorCheck):
+        self.check = check
+        if check.language == CSS:
+            try:
+                self._xpath = CSSSelector(check.expression, translator="html")
+            except Exception as e:
+                raise ValueError(f"Check '{check.name}': invalid CSS selector: {e}")
+        else:
+            try:
+                self._xpath = etree.XPath(check.expression)
+            except etree.XPathSyntaxError as e:
+                raise ValueError(f"Check '{check.name}': invalid XPath: {e}")
+
+    def _value(self, match: Any) -> Optional[str]:
+        if isinstance(match, etree._Element):
+            if self.check.attribute is not None:
+                return match.get(self.check.attribute)
+            return match.text_content().strip()
+        return str(match)
+
+    def evaluate(self, tree: etree._Element) -> Any:
+        """Runs the check on a parsed page and returns its result."""
+        matches = self._xpath(tree)
+        if not isinstance(matches, list):
+            # XPath functions (count(), boolean(), string()...) return a scalar.
+            if self.check.result == EXISTS:
+                return bool(matches)
+            if self.check.result == COUNT:
+                return int(matches) if isinstance(matches, float) else int(bool(matches))
+            return str(matches)
+
+        if self.check.result == EXISTS:
+            return len(matches) > 0
+        if self.check.result == COUNT:
+            return len(matches)
+        return self._value(matches[0]) if matches else None
+
+
+class SelectorSet:
+    """
+    The checks of a run, compiled once and evaluated together on each page.
+
+    Args:
+        checks (Iterable[SelectorCheck]): The checks, in report order.
+
+    Raises:
+        ValueError: If a check can't be compiled or two checks share a name.
+    """
+
+    def __init__(self, checks: Iterable[SelectorCheck]):
+        self.selectors: List[CompiledSelector] = []
+        names = set()
+        for check in checks:
+            if check.name in names:
+                raise ValueError(f"Two checks are named '{check.name}'")
+            names.add(check.name)
+            self.selectors.append(CompiledSelector(check))
+
+    @property
+    def names(self) -> List[str]:
+        return [selector.check.name for selector in self.selectors]
+
+    def column_types(self) -> Dict[str, str]:
+        """Returns the report column type of each check's result."""
+        return {
+            selector.check.name: RESULT_COLUMN_TYPES[selector.check.result]
+            for selector in self.selectors
+        }
+
+    def evaluate(self, tree: etree._Element) -> Dict[str, Any]:
+        """Runs every check on one parsed page.
+
+        Returns:
+            Dict[str, Any]: The result of each check, by name.
+        """
+        return {
+            selector.check.name: selector.evaluate(tree) for selector in self.selectors
+        }
+
+
+@lru_cache(maxsize=1024)
+def meta_selector(name: str, result: str = EXISTS) -> CompiledSelector:
+    """Returns the compiled check for a <meta name=...> tag.
+
+    For VALUE, the check reads the first tag's content attribute.
+    """
+    return CompiledSelector(
+        SelectorCheck(
+            name,
+            f"//meta[@name={_xpath_literal(name)}]",
+            XPATH,
+            result,
+            attribute="content" if result == VALUE else None,
+        )
+    )
+
+
+def meta_checks(names: Iterable[str]) -> List[SelectorCheck]:
+    """Returns the 'exists' checks for the given meta tag names."""
+    return [meta_selector(name).check for name in names]
+
+
+def parse_html(content: str | bytes) -> etree._Element:
+    """Parses an HTML page into the lxml tree the checks run on.
+
+    Empty or unparsable pages give an empty document rather than an error.
+    """
+    try:
+        return lxml.html.document_fromstring(content)
+    except ValueError:
+        # lxml refuses str input that declares its own encoding.
+        if isinstance(content, str):
+            return parse_html(content.encode("utf-8"))
+        return lxml.html.document_fromstring("<html></html>")
+    except etree.ParserError:
+        return lxml.html.document_fromstring("<html></html>")
@@ -0,0 +1,256 @@
+import argparse
+import re
+import time
+from dataclasses import dataclass, fields
+from typing import Callable, Tuple
+import requests as rq
+from core.hedging import Hedger
+from core.latency import HostLatencyTracker
+from core import metrics
+from core.single_flight import SingleFlight
+from core.timing import FetchTimings, TimingAdapter, TimingCollector, recording
+from core.urls import canonical_host
+
+# Status codes meaning the server doesn't accept HEAD requests.
+HEAD_REFUSED = (405, 501)
+# The first byte only, asked by the GET sent when HEAD is refused.
+FIRST_BYTE_RANGE = "bytes=0-0"
+# Where fetch_head stops reading a page: the end of its head, or this many bytes.
+HEAD_END = re.compile(rb"</head\s*>|<body[\s>]", re.IGNORECASE)
+MAX_HEAD_BYTES = 256 * 1024
+HEAD_CHUNK_SIZE = 16 * 1024
+
+
+def read_document_head(res: rq.Response, limit: int = MAX_HEAD_BYTES) -> bytes:
+    """Reads a streamed response's body up to the end of its HTML <head>.
+
+    The rest of the body is not downloaded: the response is closed, which
+    drops its connection unless the whole body had already been read.
+
+    Args:
+        res (rq.Response): A response requested with stream=True.
+        limit (int): The most bytes to read when no end of head is found.
+
+    Returns:
+        bytes: The start of the body, including the end of the head.
+    """
+    data = bytearray()
+    for chunk in res.iter_content(HEAD_CHUNK_SIZE):
+        # Also look at the end of the previous chunk, where the tag may start.
+        search_from = max(len(data) - 16, 0)
+        data += chunk
+        if HEAD_END.search(data, search_from) or len(data) >= limit:
+            break
+    res.close()
+    return bytes(data)
+
+
+@dataclass(frozen=True)
+class SessionOptions:
+    """The tunable behaviour of a CrawlSession, as set by the engine options."""
+
+    hedge: bool = False
+    hedge_budget: float = 0.05
+    delay: float = 1.0
+
+    @classmethod
+    def from_args(cls, args: argparse.Namespace) -> "SessionOptions":
+        """Builds the options from the parsed command-line arguments.
+
+        Args:
+            args (argparse.Namespace): The parsed arguments. Options that are
+                missing from it keep their default value.
+
+        Returns:
+            SessionOptions: The options for the session.
+        """
+        values = {
+            field.name: getattr(args, field.name)
+            for field in fields(cls)
+            if hasattr(args, field.name)
+        }
+        return cls(**values)
+
+
+class CrawlSession(rq.Session):
+    """
+    A requests.Session that also carries the state shared by one crawl run.
+
+    Besides pooling connections like a regular session, it owns the
+    single-flight layer used by the Crawler, so that concurrent tasks asking
+    for the same URL share one request and its parsed document, and the
+    per-host latency histograms that drive adaptive timeouts and hedging.
+    Its adapters time connection setup, so each fetch can be broken down
+    into DNS, connect, TLS, TTFB and download time.
+    """
+
+    def __init__(self, options: SessionOptions | None = None):
+        super().__init__()
+        self.mount("http://", TimingAdapter())
+        self.mount("https://", TimingAdapter())
+        self.options = options or SessionOptions()
+        self.single_flight = SingleFlight()
+        self.latency = HostLatencyTracker()
+        self.timing_stats = TimingCollector()
+        self.hedger = (
+            Hedger(self.latency, budget=self.options.hedge_budget)
+            if self.options.hedge
+            else None
+        )
+
+    def fetch(
+        self, url: str, timings: FetchTimings | None = None, **kwargs
+    ) -> rq.Response:
+        """Performs a GET using the host's adaptive timeout and optional hedging.
+
+        The body is downloaded before returning, and the time spent setting
+        up the connection, waiting for the first byte and downloading is
+        added to timings.
+
+        Args:
+            url (str): The URL to fetch.
+            timings (FetchTimings | None): The record that receives the timings.
+            **kwargs: Extra arguments forwarded to requests (e.g., headers).
+
+        Returns:
+            rq.Response: The response received, with its content loaded.
+        """
+        host = canonical_host(url)
+        kwargs.setdefault("timeout", self.latency.timeout_for(host))
+        kwargs["stream"] = True
+        if timings is None:
+            timings = FetchTimings(host=host)
+
+        with recording(timings):
+            start = time.perf_counter()
+            setup_before = timings.dns + timings.connect + timings.tls
+            try:
+                if self.hedger is not None:
+                    res = self.hedger.get(self, url, host, **kwargs)
+                else:
+                    res = self.get(url, **kwargs)
+            except rq.RequestException:
+                metrics.requests_total.inc(status_class="error")
+                raise
+            headers_at = time.perf_counter()
+            setup = timings.dns + timings.connect + timings.tls - setup_before
+            timings.ttfb += max(headers_at - start - setup, 0.0)
+
+            content = res.content
+            timings.download += time.perf_counter() - headers_at
+
+        if timings.reused is None:
+            timings.reused = True
+        raw_tell = getattr(res.raw, "tell", None)
+        body_bytes = raw_tell() if callable(raw_tell) else len(content)
+        timings.bytes += body_bytes
+        elapsed = time.perf_counter() - start
+        self.latency.record(host, elapsed)
+        metrics.requests_total.inc(status_class=f"{res.status_code // 100}xx")
+        metrics.response_bytes.inc(body_bytes)
+        metrics.request_duration.observe(elapsed, host=host)
+
+        return res
+
+    def probe(
+        self, url: str, timings: FetchTimings | None = None, **kwargs
+    ) -> rq.Response:
+        """Requests a URL's status and headers without downloading its body.
+
+        Sends a HEAD request, following redirects, with the host's adaptive
+        timeout. When the server refuses HEAD (405 or 501), the URL is asked
+        again with a GET for its first byte only (Range: bytes=0-0), whose
+        body is discarded unread unless the range was honoured. Probes are
+        never hedged.
+
+        Args:
+            url (str): The URL to probe.
+            timings (FetchTimings | None): The record that receives the timings.
+            **kwargs: Extra arguments forwarded to requests (e.g., headers).
+
+        Returns:
+            rq.Response: The last response, with the redirects it went
+                through in `history`. Its `request.method` tells which
+                request answered.
+        """
+
+        def send() -> Tuple[rq.Response, bytes]:
+            res = self.request("HEAD", url, **kwargs)
+            if res.status_code in HEAD_REFUSED:
+                headers = {**kwargs.pop("headers", {}), "Range": FIRST_BYTE_RANGE}
+                res = self.get(url, headers=headers, stream=True, **kwargs)
+                if res.status_code == 206:
+                    # One byte: reading it keeps the connection reusable.
+                    res.content
+                else:
+                    res.close()
+            return res, b""
+
+        res, _ = self._timed_probe(url, timings, kwargs, send)
+        return res
+
+    def fetch_head(
+        self, url: str, timings: FetchTimings | None = None, **kwargs
+    ) -> Tuple[rq.Response, bytes]:
+        """Requests a URL and reads its body only up to the end of the HTML <head>.
+
+        Like probe, but with a streamed GET whose body is read until
+        `</head>` (or `<body>`) or MAX_HEAD_BYTES, so the page's meta tags
+        and links can be checked without downloading the rest of it.
+
+        Args:
+            url (str): The URL to fetch.
+            timings (FetchTimings | None): The record that receives the timings.
+            **kwargs: Extra arguments forwarded to requests (e.g., headers).
+
+        Returns:
+            Tuple[rq.Response, bytes]: The last response, with the redirects
+                it went through in `history`, and the start of its body.
+        """
+
+        def send() -> Tuple[rq.Response, bytes]:
+            res = self.get(url, stream=True, **kwargs)
+            return res, read_document_head(res)
+
+        return self._timed_probe(url, timings, kwargs, send)
+
+    def _timed_probe(
+        self,
+        url: str,
+        timings: FetchTimings | None,
+        kwargs: dict,
+        send: Callable[[], Tuple[rq.Response, bytes]],
+    ) -> Tuple[rq.Response, bytes]:
+        """Runs a probe's requests with the host's timeout, recording its timings and metrics."""
+        host = canonical_host(url)
+        kwargs.setdefault("timeout", self.latency.timeout_for(host))
+        kwargs["allow_redirects"] = True
+        if timings is None:
+            timings = FetchTimings(host=host)
+
+        with recording(timings):
+            start = time.perf_counter()
+            setup_before = timings.dns + timings.connect + timings.tls
+            try:
+                res, body = send()
+            except rq.RequestException:
+                metrics.requests_total.inc(status_class="error")
+                raise
+            elapsed = time.perf_counter() - start
+            setup = timings.dns + timings.connect + timings.tls - setup_before
+            timings.ttfb += max(elapsed - setup, 0.0)
+
+        if timings.reused is None:
+            timings.reused = True
+        timings.bytes += len(body)
+        self.latency.record(host, elapsed)
+        metrics.requests_total.inc(status_class=f"{res.status_code // 100}xx")
+        metrics.response_bytes.inc(len(body))
+        metrics.request_duration.observe(elapsed, host=host)
+
+        return res, body
+
+    def close(self):
+        if self.hedger is not None:
+            self.hedger.shutdown()
+        super().close()
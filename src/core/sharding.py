@@ -0,0 +1,81 @@
+"""
+Deterministic splitting of a run's tasks across machines.
+
+With `--shard K/N`, each machine reads the same input and keeps only the
+tasks whose host hashes to shard K, so every host is crawled by exactly one
+node and per-host politeness limits still hold. Each kept result is tagged
+with its position in the input (the SHARD_COLUMN column), which the merge
+command uses to rebuild the report in input order.
+"""
+
+from collections.abc import Mapping
+from typing import Any, Callable, Iterable, Iterator, Tuple
+import argparse
+import hashlib
+from core.urls import canonical_host
+
+SHARD_COLUMN = "Input Row"
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """Parses a 'K/N' shard spec (1 <= K <= N) for argparse.
+
+    Args:
+        value (str): The spec, e.g. '2/8'.
+
+    Returns:
+        Tuple[int, int]: The 1-based shard number and the shard count.
+
+    Raises:
+        argparse.ArgumentTypeError: If the spec is malformed or out of range.
+    """
+    try:
+        shard, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"invalid shard '{value}', expected K/N (e.g. 1/4)"
+        )
+    if count < 1 or not 1 <= shard <= count:
+        raise argparse.ArgumentTypeError(
+            f"invalid shard '{value}', K must be between 1 and N"
+        )
+    return shard, count
+
+
+def shard_of(url: str, count: int) -> int:
+    """Returns the 1-based shard that the URL's host belongs to.
+
+    The host is hashed with BLAKE2b rather than hash(), which is salted per
+    process, so every machine assigns a host to the same shard.
+    """
+    host = canonical_host(url).encode("utf-8")
+    digest = hashlib.blake2b(host, digest_size=8).digest()
+    return int.from_bytes(digest, "big") % count + 1
+
+
+def select_shard(
+    tasks: Iterable, shard: Tuple[int, int], url_of: Callable[[Any], str]
+) -> Iterator[Tuple[int, Any]]:
+    """Yields (input position, task) for the tasks that belong to the shard.
+
+    Args:
+        tasks (Iterable): All the tasks of the run, in input order.
+        shard (Tuple[int, int]): The shard to keep, as returned by parse_shard.
+        url_of (Callable[[Any], str]): Returns the URL a task is about.
+    """
+    number, count = shard
+    for index, task in enumerate(tasks):
+        if shard_of(str(url_of(task)), count) == number:
+            yield index, task
+
+
+def with_input_row(index: int, result):
+    """Prepends the input position to a tuple result (or adds it to a dict)."""
+    if isinstance(result, Mapping):
+        return {SHARD_COLUMN: index, **result}
+    return (index, *result)
+
+
+def shard_suffix(shard: Tuple[int, int]) -> str:
+    """Returns the report name suffix of a shard, e.g. '.shard-2-of-8'."""
+    return f".shard-{shard[0]}-of-{shard[1]}"
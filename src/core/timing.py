@@ -0,0 +1,216 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from core.latency import LatencyHistogram
+
+PHASES = (
+    "queue_wait",
+    "dns",
+    "connect",
+    "tls",
+    "ttfb",
+    "download",
+    "decode",
+    "parse",
+    "extract",
+)
+
+PHASE_COLUMNS = {
+    "queue_wait": "Queue Wait (ms)",
+    "dns": "DNS (ms)",
+    "connect": "Connect (ms)",
+    "tls": "TLS (ms)",
+    "ttfb": "TTFB (ms)",
+    "download": "Download (ms)",
+    "decode": "Decode (ms)",
+    "parse": "Parse (ms)",
+    "extract": "Extract (ms)",
+}
+
+# The report columns added by FetchTimings.as_columns(), with their types.
+TIMING_COLUMN_TYPES = {
+    **{column: "float" for column in PHASE_COLUMNS.values()},
+    "Bytes": "int",
+    "Connection Reused?": "boolean",
+}
+
+_local = threading.local()
+
+
+@dataclass
+class FetchTimings:
+    """The time (in seconds) one fetch spent in each stage, plus transfer details."""
+
+    host: str = ""
+    queue_wait: float = 0.0
+    dns: float = 0.0
+    connect: float = 0.0
+    tls: float = 0.0
+    ttfb: float = 0.0
+    download: float = 0.0
+    decode: float = 0.0
+    parse: float = 0.0
+    extract: float = 0.0
+    bytes: int = 0
+    reused: Optional[bool] = None
+
+    @property
+    def total(self) -> float:
+        return sum(getattr(self, phase) for phase in PHASES)
+
+    def as_columns(self) -> Dict[str, object]:
+        """Returns the timings as report columns, in milliseconds."""
+        columns: Dict[str, object] = {
+            PHASE_COLUMNS[phase]: round(getattr(self, phase) * 1000, 1)
+            for phase in PHASES
+        }
+        columns["Bytes"] = self.bytes
+        columns["Connection Reused?"] = self.reused
+        return columns
+
+    def as_row(self) -> tuple:
+        """Returns the timings as a tuple in the order of TIMING_COLUMN_TYPES."""
+        return tuple(self.as_columns().values())
+
+
+def set_queue_wait(seconds: float):
+    """Stores how long the task now running on this thread waited in the queue."""
+    _local.queue_wait = seconds
+
+
+def current_queue_wait() -> float:
+    return getattr(_local, "queue_wait", 0.0)
+
+
+def current_timings() -> Optional[FetchTimings]:
+    """Returns the FetchTimings being recorded on this thread, if any."""
+    return getattr(_local, "timings", None)
+
+
+class recording:
+    """Makes timings the record that connection hooks on this thread write into."""
+
+    def __init__(self, timings: FetchTimings):
+        self.timings = timings
+
+    def __enter__(self) -> FetchTimings:
+        self._previous = current_timings()
+        _local.timings = self.timings
+        return self.timings
+
+    def __exit__(self, *exc_info):
+        _local.timings = self._previous
+
+
+def record_dns(seconds: float):
+    timings = current_timings()
+    if timings is not None:
+        timings.dns += seconds
+
+
+class _TimedConnectionMixin:
+    """Splits connection setup into TCP connect and TLS handshake time."""
+
+    _socket_seconds = 0.0
+
+    def _new_conn(self):
+        timings = current_timings()
+        dns_before = timings.dns if timings is not None else 0.0
+        start = time.perf_counter()
+        sock = super()._new_conn()
+        self._socket_seconds = time.perf_counter() - start
+        if timings is not None:
+            timings.connect += self._socket_seconds - (timings.dns - dns_before)
+        return sock
+
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        timings = current_timings()
+        if timings is not None:
+            timings.tls += max(time.perf_counter() - start - self._socket_seconds, 0.0)
+            timings.reused = False
+
+
+class TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimingAdapter(HTTPAdapter):
+    """An HTTPAdapter whose connections report their setup time to the current fetch."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": TimedHTTPConnectionPool,
+            "https": TimedHTTPSConnectionPool,
+        }
+
+
+class TimingCollector:
+    """Aggregates fetch timings per host into latency histograms."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Dict[str, LatencyHistogram]] = {}
+
+    def add(self, timings: FetchTimings):
+        with self._lock:
+            per_phase = self._histograms.get(timings.host)
+            if per_phase is None:
+                per_phase = self._histograms[timings.host] = {
+                    phase: LatencyHistogram() for phase in PHASES + ("total",)
+                }
+            for phase in PHASES:
+                per_phase[phase].record(getattr(timings, phase))
+            per_phase["total"].record(timings.total)
+
+    def summary_lines(self, max_hosts: int = 10) -> List[str]:
+        """Formats a per-host p50/p95 table of the busiest hosts.
+
+        Args:
+            max_hosts (int): How many hosts (by number of fetches) to include.
+
+        Returns:
+            List[str]: The lines of the table, or an empty list if nothing was recorded.
+        """
+        with self._lock:
+            hosts = sorted(
+                self._histograms.items(),
+                key=lambda item: item[1]["total"].total,
+                reverse=True,
+            )[:max_hosts]
+            if not hosts:
+                return []
+
+            phases = ("total",) + PHASES[1:]
+            header = f"{'host':<32} {'n':>6}  " + "  ".join(
+                f"{phase:>15}" for phase in phases
+            )
+            lines = [header + "   (p50/p95 ms)"]
+            for host, per_phase in hosts:
+                cells = []
+                for phase in phases:
+                    p50 = per_phase[phase].percentile(0.5) or 0.0
+                    p95 = per_phase[phase].percentile(0.95) or 0.0
+                    cells.append(f"{p50 * 1000:>7.0f}/{p95 * 1000:<7.0f}")
+                lines.append(
+                    f"{host[:32]:<32} {per_phase['total'].total:>6}  " + "  ".join(cells)
+                )
+            return lines
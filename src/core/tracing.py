@@ -0,0 +1,117 @@
+import contextlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List
+
+_NULL_SPAN = contextlib.nullcontext()
+
+
+class _Span:
+    """Times one block of work and records it as a complete ("X") event."""
+
+    __slots__ = ("tracer", "name", "cat", "args", "start")
+
+    def __init__(self, tracer: "Tracer", name: str, cat: str, args: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.tracer._record(self.name, self.cat, self.start, end, self.args)
+        return False
+
+
+class Tracer:
+    """
+    Records spans from every thread in Chrome/Perfetto trace-event format.
+
+    While disabled, span() returns a shared no-op context manager, so the
+    instrumented code pays a single attribute check. When enabled, each span
+    becomes a complete event tagged with the native thread ID, and the first
+    span of each thread also records the thread's name, so the trace shows
+    how the workers overlap, sleep and wait on each other.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._events: List[dict] = []
+        self._named_threads: set[int] = set()
+        self._origin_ns = 0
+        self._pid = os.getpid()
+
+    def start(self):
+        """Clears previous events and starts recording."""
+        self._events = []
+        self._named_threads = set()
+        self._origin_ns = time.perf_counter_ns()
+        self._pid = os.getpid()
+        self.enabled = True
+
+    def stop(self):
+        self.enabled = False
+
+    def span(self, name: str, cat: str = "engine", **args: Any):
+        """Returns a context manager that records the enclosed block as a span.
+
+        Args:
+            name (str): The stage name (e.g., 'fetch', 'parse').
+            cat (str): The category shown by the trace viewer.
+            **args: Extra values attached to the event (e.g., the URL).
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, cat, args)
+
+    def _record(
+        self, name: str, cat: str, start_ns: int, end_ns: int, args: Dict[str, Any]
+    ):
+        tid = threading.get_native_id()
+        if tid not in self._named_threads:
+            self._named_threads.add(tid)
+            self._events.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": self._pid,
+                    "tid": tid,
+                    "args": {"name": threading.current_thread().name},
+                }
+            )
+        self._events.append(
+            {
+                "name": name,
+                "cat": cat,
+                "ph": "X",
+                "ts": (start_ns - self._origin_ns) / 1000,
+                "dur": (end_ns - start_ns) / 1000,
+                "pid": self._pid,
+                "tid": tid,
+                "args": args,
+            }
+        )
+
+    @property
+    def events(self) -> List[dict]:
+        return list(self._events)
+
+    def dump(self, path: str):
+        """Writes the recorded events as a JSON trace file.
+
+        Args:
+            path (str): The destination, loadable in chrome://tracing or Perfetto.
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+
+
+tracer = Tracer()
@@ -0,0 +1,52 @@
+from urllib.parse import SplitResult, urlsplit, urlunsplit
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def _host_port(parts: SplitResult) -> str:
+    """Returns the lowercased host, bracketed if IPv6, and its non-default port."""
+    host = (parts.hostname or "").lower()
+    if ":" in host:
+        host = f"[{host}]"
+
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+
+    if port is not None and port != DEFAULT_PORTS.get(parts.scheme.lower()):
+        return f"{host}:{port}"
+    return host
+
+
+def canonicalize_url(url: str) -> str:
+    """Normalizes a URL so that equivalent spellings map to the same key.
+
+    The scheme and host are lowercased, default ports and fragments are
+    dropped and an empty path becomes "/". The userinfo and the query string
+    are kept as is, since they can change the page that is served.
+
+    Args:
+        url (str): The URL to normalize.
+
+    Returns:
+        str: The canonical form of the URL.
+    """
+    parts = urlsplit(url.strip())
+    userinfo, at, _ = parts.netloc.rpartition("@")
+    netloc = f"{userinfo}{at}{_host_port(parts)}"
+    path = parts.path or "/"
+    return urlunsplit((parts.scheme.lower(), netloc, path, parts.query, ""))
+
+
+def canonical_host(url: str) -> str:
+    """Returns the lowercased host (and non-default port) of a URL.
+
+    Args:
+        url (str): The URL to inspect.
+
+    Returns:
+        str: The canonical host, without any userinfo, or an empty string if
+            the URL has none.
+    """
+    return _host_port(urlsplit(url.strip()))
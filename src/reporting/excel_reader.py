@@ -1,31 +1,136 @@
+import hashlib
+import os
+from pathlib import Path
 import pandas as pd
 import logging
+from openpyxl import load_workbook
 
 logger = logging.getLogger(__name__)
 
+CACHE_DIR_NAME = ".seo-helper-cache"
+
 
 class ExcelReader:
     def __init__(self, file_path: str):
 
         self.file_path = file_path
 
-    def read_spreadsheet(self) -> pd.DataFrame:
-        """Reads all the content from an Excel sheet.
+    def read_header(self) -> list[str]:
+        """Reads only the header row of the first sheet.
+
+        Returns:
+            list[str]: The column names, in sheet order.
+        """
+        try:
+            workbook = load_workbook(self.file_path, read_only=True, data_only=True)
+        except FileNotFoundError:
+            logger.error("The file %s was not found", self.file_path)
+            raise
+
+        try:
+            first_row = next(workbook.worksheets[0].iter_rows(values_only=True), ())
+            return [str(value) for value in first_row if value is not None]
+        finally:
+            workbook.close()
+
+    def read_spreadsheet(
+        self, columns: list[str] | None = None, use_cache: bool = False
+    ) -> pd.DataFrame:
+        """Reads the content of the first sheet of an Excel file.
+
+        When columns are given, the workbook is streamed in read-only mode and
+        only those columns are kept, so large workbooks are never fully loaded.
+        With use_cache, the result is also stored as a Parquet file next to
+        the workbook (keyed by its path, size and modification time), and
+        later reads of the unchanged workbook load that copy instead.
 
         Args:
-            file_path (str): The path to the Excel file.
+            columns (list[str] | None): The columns to read (case-insensitive).
+                Reads every column when None.
+            use_cache (bool): Whether to use the Parquet sidecar cache.
 
         Returns:
             pd.DataFrame: A DataFrame containing the data from the Excel file.
         """
 
         try:
-            df = pd.read_excel(self.file_path)
-            return df
+            cache_path = self._cache_path(columns) if use_cache else None
+        except FileNotFoundError:
+            logger.error("The file %s was not found", self.file_path)
+            raise
+
+        if cache_path is not None and os.path.exists(cache_path):
+            logger.info("Loading %s from cache %s", self.file_path, cache_path)
+            return pd.read_parquet(cache_path)
+
+        try:
+            if columns is None:
+                df = pd.read_excel(self.file_path)
+            else:
+                df = self._read_columns(columns)
         except FileNotFoundError:
-            logger.error(f"The file {self.file_path} was not found")
+            logger.error("The file %s was not found", self.file_path)
             raise
 
+        if cache_path is not None:
+            self._write_cache(df, cache_path)
+        return df
+
+    def _read_columns(self, columns: list[str]) -> pd.DataFrame:
+        """Streams the first sheet row by row, keeping only the given columns."""
+        workbook = load_workbook(self.file_path, read_only=True, data_only=True)
+        try:
+            rows = workbook.worksheets[0].iter_rows(values_only=True)
+            header = [str(value) for value in next(rows, ())]
+            lowered = [name.lower() for name in header]
+
+            indices = []
+            for column in columns:
+                if column.lower() not in lowered:
+                    raise KeyError(f"Column '{column}' not found.")
+                indices.append(lowered.index(column.lower()))
+
+            names = [header[i] for i in indices]
+            data: dict[str, list] = {name: [] for name in names}
+            for row in rows:
+                values = [row[i] if i < len(row) else None for i in indices]
+                if all(value is None for value in values):
+                    continue
+                for name, value in zip(names, values):
+                    data[name].append(value)
+        finally:
+            workbook.close()
+
+        return pd.DataFrame(data)
+
+    def _cache_path(self, columns: list[str] | None) -> str:
+        """Returns the sidecar cache file for this workbook and column set."""
+        stat = os.stat(self.file_path)
+        key_source = "|".join(
+            [
+                os.path.abspath(self.file_path),
+                str(stat.st_size),
+                str(stat.st_mtime_ns),
+                *[column.lower() for column in columns or []],
+            ]
+        )
+        key = hashlib.sha1(key_source.encode()).hexdigest()[:16]
+        path = Path(self.file_path)
+        return str(path.parent / CACHE_DIR_NAME / f"{path.stem}-{key}.parquet")
+
+    @staticmethod
+    def _write_cache(df: pd.DataFrame, cache_path: str):
+        """Writes df to the cache, leaving no partial file behind on failure."""
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            df.to_parquet(temp_path, index=False)
+            os.replace(temp_path, cache_path)
+        except (OSError, ValueError, TypeError, ImportError) as e:
+            logger.warning("Could not write input cache %s: %s", cache_path, e)
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
     @staticmethod
     def read_column(df: pd.DataFrame, column: str) -> list[str]:
         """Reads a specific column from a DataFrame and returns it as a list,
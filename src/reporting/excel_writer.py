@@ -1,133 +1,193 @@
 import pandas as pd
 import logging
-from typing import List, Union, cast
+from typing import Any, Iterable, List, Sequence
 from xlsxwriter.workbook import Workbook
 from xlsxwriter.worksheet import Worksheet
 import os
+from core import metrics
 
 logger = logging.getLogger(__name__)
 
 
-class ExcelWriter:
-    @staticmethod
-    def create_spreadsheet_with_results(
-        df: pd.DataFrame, filename: str = "results/results.xlsx"
-    ):
-        """Creates a spreadsheet with the results of the meta tag search.
-
-        Args:
-            urls (List[str]): A list of URLs that were searched.
-            results (List[Union[bool, str]]): A list of results for each URL.
-        """
-
-        output_dir = os.path.dirname(filename)
-        if output_dir:
-            os.makedirs(output_dir, exist_ok=True)
+EXCEL_MAX_ROWS = 1_048_576
+SIGNATURE = "Generated by SEOHelper - by Armando Monteiro"
 
-        with pd.ExcelWriter(filename, engine="xlsxwriter") as writer:
-            df.to_excel(writer, sheet_name="Results", index=False)
-
-            workbook = cast(Workbook, writer.book)
-            worksheet: Worksheet = writer.sheets["Results"]
-
-            header_format = workbook.add_format(
-                {
-                    "bold": True,
-                    "text_wrap": True,
-                    "valign": "top",
-                    "fg_color": "#111BA5",
-                    "font_color": "white",
-                    "border": 1,
-                    "align": "center",
-                }
-            )
 
-            cell_format = workbook.add_format({"align": "center", "valign": "vcenter"})
+def _cell_value(value: Any) -> Any:
+    """Converts a result value into something xlsxwriter can write (blank for NA)."""
+    if value is None or (not isinstance(value, (str, bool)) and pd.isna(value)):
+        return None
+    if hasattr(value, "item"):
+        return value.item()
+    return value
 
-            green_format = workbook.add_format(
-                {
-                    "bg_color": "#C6EFCE",
-                    "font_color": "#006100",
-                }
-            )
-            red_format = workbook.add_format(
-                {
-                    "bg_color": "#FFC7CE",
-                    "font_color": "#9C0006",
-                }
-            )
-            yellow_format = workbook.add_format(
-                {
-                    "bg_color": "#FFEB9C",
-                    "font_color": "#9C6500",
-                }
-            )
 
-            for col_num, value in enumerate(df.columns.values):
-                worksheet.write(0, col_num, value, header_format)
+class StreamingExcelWriter:
+    """
+    Writes a styled results workbook row by row with constant memory.
 
-            worksheet.set_column("A:A", 70, cell_format)
+    Rows are flushed to disk as they are written (xlsxwriter's
+    constant_memory mode), so memory stays flat however many results there
+    are. When a sheet reaches Excel's row limit the results continue on a
+    new sheet: a single sheet is named 'Results', split results are named
+    'Results_1' to 'Results_N'. Each sheet gets the header, conditional
+    formats over its own data range, an autofilter and the signature.
+    """
 
-            first_row = 1
-            last_row = len(df)
-
-            for col_num, _ in enumerate(df.columns[1:], start=1):
-
-                worksheet.set_column(col_num, col_num, 35, cell_format)
+    def __init__(
+        self, filename: str, columns: Sequence[str], max_rows: int = EXCEL_MAX_ROWS
+    ):
+        output_dir = os.path.dirname(filename)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
 
-                worksheet.conditional_format(
-                    first_row,
-                    col_num,
-                    last_row,
-                    col_num,
+        self.filename = filename
+        self.columns = list(columns)
+        # Each sheet also holds the header, a blank row and the signature.
+        self.rows_per_sheet = max_rows - 3
+        self.rows_written = 0
+        self.sheets: List[Worksheet] = []
+        self._rows_in_sheet = 0
+
+        self.workbook = Workbook(filename, {"constant_memory": True})
+        self._add_formats()
+        self._worksheet = self._start_sheet("Results")
+
+    def _add_formats(self):
+        self.header_format = self.workbook.add_format(
+            {
+                "bold": True,
+                "text_wrap": True,
+                "valign": "top",
+                "fg_color": "#111BA5",
+                "font_color": "white",
+                "border": 1,
+                "align": "center",
+            }
+        )
+        self.cell_format = self.workbook.add_format(
+            {"align": "center", "valign": "vcenter"}
+        )
+        self.green_format = self.workbook.add_format(
+            {
+                "bg_color": "#C6EFCE",
+                "font_color": "#006100",
+            }
+        )
+        self.red_format = self.workbook.add_format(
+            {
+                "bg_color": "#FFC7CE",
+                "font_color": "#9C0006",
+            }
+        )
+        self.yellow_format = self.workbook.add_format(
+            {
+                "bg_color": "#FFEB9C",
+                "font_color": "#9C6500",
+            }
+        )
+        self.signature_format = self.workbook.add_format(
+            {"italic": True, "font_color": "#757575"}
+        )
+
+    def _start_sheet(self, name: str) -> Worksheet:
+        worksheet = self.workbook.add_worksheet(name)
+        worksheet.set_column("A:A", 70, self.cell_format)
+        if len(self.columns) > 1:
+            worksheet.set_column(1, len(self.columns) - 1, 35, self.cell_format)
+        worksheet.write_row(0, 0, self.columns, self.header_format)
+        self.sheets.append(worksheet)
+        self._rows_in_sheet = 0
+        return worksheet
+
+    def _finish_sheet(self, worksheet: Worksheet, row_count: int):
+        """Adds the formats, autofilter and signature that depend on the row count."""
+        last_col = len(self.columns) - 1
+
+        if row_count:
+            for col_num in range(1, len(self.columns)):
+                for criteria in (
                     {
                         "type": "cell",
                         "criteria": "==",
                         "value": True,
-                        "format": green_format,
+                        "format": self.green_format,
                     },
-                )
-                worksheet.conditional_format(
-                    first_row,
-                    col_num,
-                    last_row,
-                    col_num,
                     {
                         "type": "cell",
                         "criteria": "==",
                         "value": False,
-                        "format": red_format,
+                        "format": self.red_format,
                     },
-                )
-                worksheet.conditional_format(
-                    first_row,
-                    col_num,
-                    last_row,
-                    col_num,
                     {
                         "type": "text",
                         "criteria": "containing",
                         "value": "Error",
-                        "format": yellow_format,
+                        "format": self.yellow_format,
                     },
-                )
+                ):
+                    worksheet.conditional_format(
+                        1, col_num, row_count, col_num, criteria
+                    )
 
-            worksheet.autofilter(0, 0, len(df), len(df.columns) - 1)
+        worksheet.autofilter(0, 0, row_count, last_col)
 
-            signature_format = workbook.add_format(
-                {"italic": True, "font_color": "#757575"}
+        signature_row = row_count + 2
+        if last_col > 0:
+            worksheet.merge_range(
+                signature_row, 0, signature_row, last_col, SIGNATURE, self.signature_format
             )
+        else:
+            worksheet.write(signature_row, 0, SIGNATURE, self.signature_format)
 
-            signature_row = len(df) + 2
+    def write_row(self, values: Sequence[Any]):
+        """Appends one result row, moving to a new sheet at the row limit.
 
-            worksheet.merge_range(
-                signature_row,
-                0,
-                signature_row,
-                len(df.columns) - 1,
-                "Generated by SEOHelper - by Armando Monteiro",
-                signature_format,
-            )
+        Args:
+            values (Sequence[Any]): The row's values, in column order.
+        """
+        if self._rows_in_sheet == self.rows_per_sheet:
+            if len(self.sheets) == 1:
+                self._worksheet.name = "Results_1"
+            self._finish_sheet(self._worksheet, self._rows_in_sheet)
+            self._worksheet = self._start_sheet(f"Results_{len(self.sheets) + 1}")
+
+        self._rows_in_sheet += 1
+        self._worksheet.write_row(
+            self._rows_in_sheet, 0, [_cell_value(value) for value in values]
+        )
+        self.rows_written += 1
+
+    def write_rows(self, rows: Iterable[Sequence[Any]]):
+        for values in rows:
+            self.write_row(values)
+
+    def close(self):
+        """Finishes the last sheet and saves the workbook."""
+        self._finish_sheet(self._worksheet, self._rows_in_sheet)
+        self.workbook.close()
+
+
+class ExcelWriter:
+    @staticmethod
+    def create_spreadsheet_with_results(
+        df: pd.DataFrame, filename: str = "results/results.xlsx"
+    ):
+        """Creates a spreadsheet with the results of the meta tag search.
+
+        The rows are streamed into the workbook by StreamingExcelWriter, so
+        results beyond Excel's row limit are split across several sheets.
+
+        Args:
+            df (pd.DataFrame): The results to write, one row per URL.
+            filename (str): The path of the .xlsx file to create.
+        """
+
+        writer = StreamingExcelWriter(filename, [str(col) for col in df.columns])
+        for values in df.itertuples(index=False, name=None):
+            writer.write_row(values)
+            metrics.results_written.inc()
+        writer.close()
 
         logger.info("Spreadsheet created successfully")
         print(f"Spreadsheet '{filename}' created successfully")
@@ -0,0 +1,174 @@
+import bz2
+import csv
+import gzip
+import itertools
+import json
+import logging
+import lzma
+import sys
+from pathlib import Path
+from typing import IO, Iterator, List, Optional
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+STDIN_PATH = "-"
+CHUNK_SIZE = 10_000
+
+FORMATS_BY_SUFFIX = {
+    ".xlsx": "xlsx",
+    ".csv": "csv",
+    ".tsv": "tsv",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    ".parquet": "parquet",
+    ".txt": "lines",
+}
+COMPRESSED_OPENERS = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}
+
+
+def detect_format(path: str) -> Optional[str]:
+    """Detects the input format from a file name.
+
+    Compressed text files (e.g., 'urls.csv.gz') are detected by their inner
+    suffix. Standard input ('-') is reported as 'stdin'; its actual format is
+    sniffed from the first line when it is read.
+
+    Args:
+        path (str): The input path.
+
+    Returns:
+        Optional[str]: One of 'stdin', 'xlsx', 'csv', 'tsv', 'jsonl',
+            'parquet' or 'lines', or None if the suffix is not recognized.
+    """
+    if path == STDIN_PATH:
+        return "stdin"
+
+    suffixes = [suffix.lower() for suffix in Path(path).suffixes]
+    if suffixes and suffixes[-1] in COMPRESSED_OPENERS:
+        suffixes = suffixes[:-1]
+    if not suffixes:
+        return None
+    return FORMATS_BY_SUFFIX.get(suffixes[-1])
+
+
+def _sniff_format(first_line: str) -> str:
+    """Guesses the format of piped input from its first line."""
+    stripped = first_line.strip()
+    if stripped.startswith("{"):
+        return "jsonl"
+    if "://" in stripped and "," not in stripped and "\t" not in stripped:
+        return "lines"
+    return "tsv" if "\t" in stripped else "csv"
+
+
+class InputSource:
+    """
+    Streams the rows of a CSV, TSV, JSONL, Parquet or plain-text URL list.
+
+    The input is read in chunks of `chunk_size` rows, each returned as a
+    small DataFrame holding only the requested columns, so arbitrarily large
+    inputs (or standard input, with '-') never have to be loaded at once.
+    Plain-text inputs have no header: each non-empty line is one URL.
+    """
+
+    def __init__(self, path: str, chunk_size: int = CHUNK_SIZE):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.format = detect_format(path)
+        self._stdin_head: List[str] = []
+
+        if self.format is None or self.format == "xlsx":
+            raise ValueError(f"Unsupported input format for '{path}'")
+
+        if self.format == "stdin":
+            first_line = sys.stdin.readline().lstrip("\ufeff")
+            self._stdin_head = [first_line] if first_line else []
+            self.format = _sniff_format(first_line)
+        elif not Path(path).exists():
+            raise FileNotFoundError(f"The file {path} was not found")
+
+    def _open_text(self) -> IO[str]:
+        # utf-8-sig drops the byte-order mark Excel puts at the start of CSVs.
+        suffix = Path(self.path).suffix.lower()
+        opener = COMPRESSED_OPENERS.get(suffix)
+        if opener is not None:
+            return opener(self.path, "rt", encoding="utf-8-sig", newline="")
+        return open(self.path, "r", encoding="utf-8-sig", newline="")
+
+    def _iter_lines(self) -> Iterator[str]:
+        """Yields the raw lines of the input (standard input is read only once)."""
+        if self.path == STDIN_PATH:
+            head, self._stdin_head = self._stdin_head, []
+            yield from itertools.chain(head, sys.stdin)
+            return
+        with self._open_text() as f:
+            yield from f
+
+    def read_header(self) -> Optional[List[str]]:
+        """Returns the column names of the input, or None for headerless URL lists."""
+        if self.format == "lines":
+            return None
+
+        if self.format == "parquet":
+            import pyarrow.parquet as pq
+
+            return list(pq.ParquetFile(self.path).schema_arrow.names)
+
+        if self.path == STDIN_PATH:
+            first_line = self._stdin_head[0] if self._stdin_head else ""
+        else:
+            with self._open_text() as f:
+                first_line = f.readline()
+
+        if self.format == "jsonl":
+            return list(json.loads(first_line).keys()) if first_line.strip() else []
+        delimiter = "\t" if self.format == "tsv" else ","
+        return next(csv.reader([first_line], delimiter=delimiter), [])
+
+    def iter_chunks(self, columns: List[str]) -> Iterator[pd.DataFrame]:
+        """Yields the requested columns in DataFrames of at most chunk_size rows.
+
+        Args:
+            columns (List[str]): The column names to keep, as found in the header.
+                For plain-text inputs, a single name under which the URLs are returned.
+
+        Yields:
+            pd.DataFrame: The next chunk of rows. Empty values are None.
+        """
+        if self.format == "parquet":
+            import pyarrow.parquet as pq
+
+            parquet_file = pq.ParquetFile(self.path)
+            for batch in parquet_file.iter_batches(
+                batch_size=self.chunk_size, columns=columns
+            ):
+                yield batch.to_pandas()
+            return
+
+        if self.format == "lines":
+            if len(columns) != 1:
+                raise ValueError(
+                    f"'{self.path}' is a plain URL list and only provides one column"
+                )
+            rows = ((line.strip(),) for line in self._iter_lines() if line.strip())
+        elif self.format == "jsonl":
+            rows = (
+                tuple(record.get(column) for column in columns)
+                for record in (
+                    json.loads(line) for line in self._iter_lines() if line.strip()
+                )
+            )
+        else:
+            delimiter = "\t" if self.format == "tsv" else ","
+            reader = csv.DictReader(self._iter_lines(), delimiter=delimiter)
+            rows = (
+                tuple(record.get(column) or None for column in columns)
+                for record in reader
+            )
+
+        while True:
+            chunk = list(itertools.islice(rows, self.chunk_size))
+            if not chunk:
+                return
+            yield pd.DataFrame.from_records(chunk, columns=columns)
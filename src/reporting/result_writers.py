@@ -0,0 +1,358 @@
+import bz2
+import csv
+import gzip
+import json
+import logging
+import lzma
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from typing import IO, Any, Dict, List, Mapping, Optional, Sequence, Union
+import numpy as np
+import pandas as pd
+from core import metrics
+from reporting.excel_writer import StreamingExcelWriter
+
+logger = logging.getLogger(__name__)
+
+OUTPUT_FORMATS = ("xlsx", "csv", "jsonl", "parquet")
+TEXT_COMPRESSIONS = {
+    "gzip": (".gz", gzip.open),
+    "bz2": (".bz2", bz2.open),
+    "xz": (".xz", lzma.open),
+}
+PARQUET_COMPRESSIONS = ("snappy", "gzip", "zstd")
+PARQUET_BATCH_ROWS = 10_000
+
+Row = Union[Sequence[Any], Mapping[str, Any]]
+
+
+def _coerce(value: Any, column_type: str) -> Any:
+    """Converts a result value to the column's type (None when it doesn't fit)."""
+    if value is None or (not isinstance(value, (str, bool)) and pd.isna(value)):
+        return None
+    if column_type == "boolean":
+        return bool(value) if isinstance(value, (bool, np.bool_)) else None
+    if column_type in ("string", "category"):
+        return str(value)
+    if column_type == "float":
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+    if column_type == "int":
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return None
+    return value
+
+
+def _json_value(value: Any) -> Any:
+    """Turns numpy scalars into plain values for JSON."""
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+class ResultWriter(ABC):
+    """
+    Writes result rows to a report file as they arrive.
+
+    The file is only created when the first row is written, so a run that
+    produces no results leaves nothing behind. A result is either a tuple of
+    values in column order or a dict keyed by column name. Columns missing
+    from a result (trailing values of a short tuple, absent keys) are written
+    as empty values; keys that are not report columns are ignored.
+
+    Column types ('boolean', 'category', 'string', 'float', 'int') are
+    applied by the columnar formats; untyped columns are written as strings.
+    """
+
+    extension = ""
+
+    def __init__(
+        self,
+        path: str,
+        columns: Sequence[str],
+        column_types: Optional[Dict[str, str]] = None,
+        compression: Optional[str] = None,
+    ):
+        self.path = path
+        self.columns = list(columns)
+        self.column_types = {
+            column: (column_types or {}).get(column, "string") for column in self.columns
+        }
+        self.compression = compression
+        self.rows_written = 0
+        self._opened = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def _row_values(self, result: Row) -> List[Any]:
+        if isinstance(result, Mapping):
+            return [result.get(column) for column in self.columns]
+        values = list(result[: len(self.columns)])
+        values.extend([None] * (len(self.columns) - len(values)))
+        return values
+
+    def _typed_row(self, result: Row) -> List[Any]:
+        return [
+            _coerce(value, self.column_types[column])
+            for column, value in zip(self.columns, self._row_values(result))
+        ]
+
+    def write(self, result: Row):
+        """Appends one result to the report.
+
+        Args:
+            result (Row): The result, as values in column order or keyed by
+                column name.
+        """
+        if not self._opened:
+            output_dir = os.path.dirname(self.path)
+            if output_dir:
+                os.makedirs(output_dir, exist_ok=True)
+            self._open()
+            self._opened = True
+        self._write(result)
+        self.rows_written += 1
+        metrics.results_written.inc()
+
+    def close(self):
+        """Flushes and closes the report, if any row was written."""
+        if not self._opened:
+            return
+        self._close()
+        self._opened = False
+        logger.info("Report %s written with %d rows", self.path, self.rows_written)
+        print(f"Report '{self.path}' created successfully")
+
+    @abstractmethod
+    def _open(self):
+        pass
+
+    @abstractmethod
+    def _write(self, result: Row):
+        pass
+
+    @abstractmethod
+    def _close(self):
+        pass
+
+
+class _TextResultWriter(ResultWriter):
+    def _open_text(self) -> IO[str]:
+        if self.compression is None:
+            return open(self.path, "w", encoding="utf-8", newline="")
+        _, opener = TEXT_COMPRESSIONS[self.compression]
+        return opener(self.path, "wt", encoding="utf-8", newline="")
+
+
+class CsvResultWriter(_TextResultWriter):
+    """Writes results as CSV with a header row; booleans as True/False, nulls as empty."""
+
+    extension = ".csv"
+
+    def _open(self):
+        self._file = self._open_text()
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(self.columns)
+
+    def _write(self, result: Row):
+        self._writer.writerow(self._typed_row(result))
+
+    def _close(self):
+        self._file.close()
+
+
+class JsonlResultWriter(_TextResultWriter):
+    """Writes one JSON object per result, with true/false/null for booleans."""
+
+    extension = ".jsonl"
+
+    def _open(self):
+        self._file = self._open_text()
+
+    def _write(self, result: Row):
+        record = dict(zip(self.columns, self._typed_row(result)))
+        self._file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+    def _close(self):
+        self._file.close()
+
+
+class ParquetResultWriter(ResultWriter):
+    """
+    Writes results to Parquet in row groups of PARQUET_BATCH_ROWS rows.
+
+    Booleans are nullable booleans and 'category' columns are
+    dictionary-encoded, so they load back as pandas categoricals.
+    """
+
+    extension = ".parquet"
+
+    def _schema(self):
+        import pyarrow as pa
+
+        arrow_types = {
+            "boolean": pa.bool_(),
+            "category": pa.dictionary(pa.int32(), pa.string()),
+            "string": pa.string(),
+            "float": pa.float64(),
+            "int": pa.int64(),
+        }
+        return pa.schema(
+            [(column, arrow_types[self.column_types[column]]) for column in self.columns]
+        )
+
+    def _open(self):
+        import pyarrow.parquet as pq
+
+        self._arrow_schema = self._schema()
+        self._writer = pq.ParquetWriter(
+            self.path, self._arrow_schema, compression=self.compression or "snappy"
+        )
+        self._buffer: List[List[Any]] = [[] for _ in self.columns]
+
+    def _write(self, result: Row):
+        for column_values, value in zip(self._buffer, self._typed_row(result)):
+            column_values.append(value)
+        if len(self._buffer[0]) >= PARQUET_BATCH_ROWS:
+            self._flush()
+
+    def _flush(self):
+        import pyarrow as pa
+
+        if not self._buffer[0]:
+            return
+        table = pa.Table.from_arrays(
+            [
+                pa.array(values, type=field.type)
+                for values, field in zip(self._buffer, self._arrow_schema)
+            ],
+            schema=self._arrow_schema,
+        )
+        self._writer.write_table(table)
+        self._buffer = [[] for _ in self.columns]
+
+    def _close(self):
+        self._flush()
+        self._writer.close()
+
+
+class ExcelResultWriter(ResultWriter):
+    """Writes the styled .xlsx report through StreamingExcelWriter, keeping raw values."""
+
+    extension = ".xlsx"
+
+    def _open(self):
+        self._writer = StreamingExcelWriter(self.path, self.columns)
+
+    def _write(self, result: Row):
+        self._writer.write_row(self._row_values(result))
+
+    def _close(self):
+        self._writer.close()
+
+
+WRITERS = {
+    "xlsx": ExcelResultWriter,
+    "csv": CsvResultWriter,
+    "jsonl": JsonlResultWriter,
+    "parquet": ParquetResultWriter,
+}
+
+
+def create_result_writer(
+    output_format: str,
+    base_path: str,
+    columns: Sequence[str],
+    column_types: Optional[Dict[str, str]] = None,
+    compression: Optional[str] = None,
+) -> ResultWriter:
+    """Creates the streaming writer for an output format.
+
+    Args:
+        output_format (str): One of 'xlsx', 'csv', 'jsonl' or 'parquet'.
+        base_path (str): The report path without extension (e.g., 'results/scan_metas_results').
+        columns (Sequence[str]): The report columns, in order.
+        column_types (Optional[Dict[str, str]]): The type of each typed column.
+        compression (Optional[str]): 'gzip', 'bz2' or 'xz' for CSV/JSONL (added to the
+            file name), 'snappy', 'gzip' or 'zstd' for Parquet. Not supported for xlsx.
+
+    Returns:
+        ResultWriter: The writer, which creates its file on the first result.
+
+    Raises:
+        ValueError: If the format or the compression is not supported.
+    """
+    if output_format not in WRITERS:
+        raise ValueError(f"Unknown output format: {output_format}")
+
+    writer_class = WRITERS[output_format]
+    path = f"{base_path}{writer_class.extension}"
+    if compression is not None:
+        if output_format in ("csv", "jsonl") and compression in TEXT_COMPRESSIONS:
+            path += TEXT_COMPRESSIONS[compression][0]
+        elif not (output_format == "parquet" and compression in PARQUET_COMPRESSIONS):
+            raise ValueError(
+                f"Compression '{compression}' is not supported for {output_format} output"
+            )
+
+    return writer_class(path, columns, column_types, compression)
+
+
+class SectionedResultWriter:
+    """
+    Writes a report made of sections (e.g. one per check type), one after the other.
+
+    Rows arrive in any order; each is spooled to a temporary file of its
+    section, so memory stays bounded, and the sections are copied to the
+    underlying writer in order when the writer is closed.
+
+    Args:
+        writer (ResultWriter): The writer of the final report.
+        sections (Sequence[str]): The section names, in report order.
+    """
+
+    def __init__(self, writer: ResultWriter, sections: Sequence[str]):
+        self.writer = writer
+        self._spools: Dict[str, IO[str]] = {
+            section: tempfile.TemporaryFile("w+", encoding="utf-8")
+            for section in sections
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    @property
+    def rows_written(self) -> int:
+        return self.writer.rows_written
+
+    def write(self, section: str, result: Sequence[Any]):
+        """Adds one row (values in column order) to a section."""
+        json.dump(list(result), self._spools[section], default=_json_value)
+        self._spools[section].write("\n")
+
+    def close(self):
+        """Writes the sections to the report, in order, and closes it."""
+        spools, self._spools = self._spools, {}
+        try:
+            for spool in spools.values():
+                spool.seek(0)
+                for line in spool:
+                    self.writer.write(json.loads(line))
+        finally:
+            for spool in spools.values():
+                spool.close()
+            self.writer.close()
@@ -0,0 +1,108 @@
+import argparse
+import json
+import pytest
+from commands.audit import COMPARE, EXISTS, HEADER, SITEMAP, AuditCommand, Check
+from core.crawler import Crawler
+from core.run_options import RunOptions
+from core.session import SessionOptions
+
+
+@pytest.fixture
+def audit_command():
+    command = AuditCommand()
+    command.session_options = SessionOptions(delay=0.0)
+    command.run_options = RunOptions(progress="none", output_format="jsonl")
+    return command
+
+
+def test_build_tasks_groups_every_check_by_url():
+    """
+    Verifies that the checks of every plan entry are grouped on one task per canonical URL.
+    """
+    plan = {
+        "exists": ["robots"],
+        "headers": {"X-Robots-Tag": None},
+        "sitemap": "http://a.com/sitemap.xml",
+    }
+    urls = ["http://a.com/", "http://b.com/", "HTTP://A.COM/#top"]
+    comparisons = [("http://a.com", "robots", "index"), ("http://c.com/", "title", "C")]
+
+    tasks = AuditCommand._build_tasks(plan, urls, comparisons)
+
+    assert [task.url for task in tasks] == [
+        "http://a.com/",
+        "http://b.com/",
+        "http://c.com/",
+    ]
+    assert tasks[0].checks == [
+        Check(EXISTS, "robots"),
+        Check(HEADER, "X-Robots-Tag"),
+        Check(SITEMAP, "http://a.com/sitemap.xml"),
+        Check(COMPARE, "robots", "index"),
+    ]
+    assert tasks[2].checks == [Check(COMPARE, "title", "C")]
+
+
+def test_audit_fetches_each_url_once_and_writes_a_section_per_check(
+    audit_command, local_server, tmp_path, monkeypatch
+):
+    """
+    Verifies that all the checks on a URL share one fetch, and the report is grouped by check type.
+    """
+    (tmp_path / "urls.csv").write_text(f"URL\n{local_server}/a\n{local_server}/b\n")
+    (tmp_path / "metas.csv").write_text(
+        f"URL,Meta Name,Expected Content\n{local_server}/a,robots,\"index, follow\"\n"
+    )
+    (tmp_path / "plan.json").write_text(
+        json.dumps(
+            {
+                "urls": {"file": "urls.csv", "column": "URL"},
+                "exists": ["robots", "description"],
+                "headers": {"Content-Type": "text/html", "X-Robots-Tag": None},
+                "sitemap": f"{local_server}/sitemap.xml",
+                "compare": {"file": "metas.csv"},
+            }
+        )
+    )
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(
+        AuditCommand, "_fetch_sitemap", lambda self, url: {f"{local_server}/a"}
+    )
+    fetched = []
+    html_search = Crawler.html_search
+    monkeypatch.setattr(
+        Crawler,
+        "html_search",
+        lambda self: fetched.append(self.url) or html_search(self),
+    )
+
+    audit_command.execute(argparse.Namespace(plan="plan.json"))
+
+    assert sorted(fetched) == [f"{local_server}/a", f"{local_server}/b"]
+    with open(tmp_path / "results" / "audit_results.jsonl") as f:
+        rows = [json.loads(line) for line in f]
+    sections = [EXISTS] * 4 + [COMPARE] + [SITEMAP] * 2 + [HEADER] * 4
+    assert [row["Check"] for row in rows] == sections
+    passed = {
+        (row["Check"], row["URL"][-1], row["Target"]): row["Passed?"] for row in rows
+    }
+    assert passed[(EXISTS, "a", "robots")] is True
+    assert passed[(EXISTS, "a", "description")] is False
+    assert passed[(COMPARE, "a", "robots")] is True
+    assert passed[(SITEMAP, "a", f"{local_server}/sitemap.xml")] is True
+    assert passed[(SITEMAP, "b", f"{local_server}/sitemap.xml")] is False
+    assert passed[(HEADER, "b", "Content-Type")] is True
+    assert passed[(HEADER, "b", "X-Robots-Tag")] is False
+
+
+def test_audit_rejects_plans_without_checks(audit_command, tmp_path, capsys):
+    """
+    Verifies that an invalid plan is reported instead of running an empty audit.
+    """
+    plan = tmp_path / "plan.json"
+    plan.write_text(json.dumps({"urls": {"file": "urls.csv"}}))
+
+    audit_command.execute(argparse.Namespace(plan=str(plan)))
+
+    assert "the plan has no checks" in capsys.readouterr().out
+    assert not (tmp_path / "results").exists()
@@ -1,8 +1,12 @@
+import json
+import time
 import pytest
 import pandas as pd
 from pandas.testing import assert_frame_equal
 from unittest.mock import MagicMock, patch
-from commands.base_command import Command
+from commands.base_command import Command, WarmPool
+from core.run_options import RunOptions
+from core.sharding import shard_of
 from reporting.excel_reader import ExcelReader
 
 
@@ -29,6 +33,14 @@ def test_normalize_filepath(command):
     assert command._normalize_filepath("archive.xls") == "archive.xls.xlsx"
 
 
+def test_normalize_filepath_keeps_streamable_inputs(command):
+    """Tests that CSV, JSONL, Parquet and stdin inputs are not suffixed with .xlsx."""
+    assert command._normalize_filepath("-") == "-"
+    assert command._normalize_filepath("urls.csv.gz") == "urls.csv.gz"
+    assert command._normalize_filepath("urls.jsonl") == "urls.jsonl"
+    assert command._normalize_filepath("urls.parquet") == "urls.parquet"
+
+
 def test_clean_dataframe(command):
     """Tests that rows with empty or None values in the URL column are dropped."""
     data = {
@@ -85,6 +97,27 @@ def test_get_valid_sheet_data_retry_and_success(command, monkeypatch):
         assert mock_excel_reader.return_value.read_spreadsheet.call_count == 2
 
 
+def test_get_valid_sheet_data_reads_only_required_columns(command, monkeypatch):
+    """Tests that required columns are resolved from the header before the data is read."""
+    fake_df = pd.DataFrame({"Page URL": ["http://a.com"]})
+    required_columns = [{"name": "URL", "description": "which contains the URLs"}]
+
+    monkeypatch.setattr("questionary.text", lambda _: MagicMock(ask=lambda: "page url"))
+
+    with patch("commands.base_command.ExcelReader") as mock_excel_reader:
+
+        mock_excel_reader.return_value.read_header.return_value = ["Page URL", "Notes"]
+        mock_excel_reader.return_value.read_spreadsheet.return_value = fake_df
+
+        result_df = command._get_valid_sheet_data("dummy_path.xlsx", required_columns)
+
+        assert_frame_equal(result_df, fake_df)
+        mock_excel_reader.return_value.read_spreadsheet.assert_called_once_with(
+            columns=["Page URL"], use_cache=False
+        )
+        assert required_columns[0]["name"] == "Page URL"
+
+
 def test_get_valid_sheet_data_cancel(command, monkeypatch):
     """Tests the _get_valid_sheet_data logic when the user cancels the prompt."""
 
@@ -146,6 +179,20 @@ def test_get_validated_urls_from_column_cancel(command, monkeypatch):
         mock_read.assert_called_once_with(df, "WrongColumn")
 
 
+def test_iter_validated_urls_ends_the_input_when_cancelled(command, monkeypatch):
+    """Tests that cancelling the column prompt mid-input ends the URLs instead of failing."""
+    chunks = [pd.DataFrame({"URL": ["http://a.com"]}), pd.DataFrame({"Other": ["x"]})]
+
+    monkeypatch.setattr("questionary.text", lambda _: MagicMock(ask=lambda: None))
+
+    with patch.object(ExcelReader, "read_column") as mock_read:
+        mock_read.side_effect = [["http://a.com"], KeyError]
+
+        urls = list(command._iter_validated_urls("URL", chunks))
+
+    assert urls == ["http://a.com"]
+
+
 def test_ensure_multiple_columns_exist_success(command):
     """Tests _ensure_multiple_columns_exist happy path and case-insensitivity."""
     df = pd.DataFrame({"URL": [1], "meta name": [2], "Expected Content": [3]})
@@ -206,7 +253,7 @@ def test_run_concurrent_tasks_success(command):
 
     desc_provider = lambda task: task
 
-    with patch("commands.base_command.tqdm", MagicMock()):
+    with patch("core.progress.tqdm", MagicMock()):
         results = command._run_concurrent_tasks(
             tasks=tasks, task_function=simple_task_function, desc_provider=desc_provider
         )
@@ -230,3 +277,99 @@ def test_run_concurrent_tasks_empty(command):
     )
 
     assert results == []
+
+
+def test_run_concurrent_tasks_bounds_submitted_tasks(command, monkeypatch):
+    """Tests that tasks are pulled lazily, never more than the task window ahead."""
+    monkeypatch.setattr("commands.base_command.TASK_WINDOW", 5)
+    pulled = []
+    completed = []
+
+    def tasks():
+        for i in range(50):
+            assert len(pulled) - len(completed) <= 5
+            pulled.append(i)
+            yield i
+
+    def task_function(task_item, session):
+        completed.append(task_item)
+        return {"result": task_item}
+
+    with patch("core.progress.tqdm", MagicMock()):
+        results = command._run_concurrent_tasks(
+            tasks=tasks(), task_function=task_function, desc_provider=str
+        )
+
+    assert sorted(r["result"] for r in results) == list(range(50))
+
+
+def test_run_concurrent_tasks_reports_progress_during_a_slow_task(command, capsys):
+    """Tests that jsonl progress is emitted every interval while no task completes."""
+    command.run_options = RunOptions(progress="jsonl", prewarm=False)
+
+    def slow_task(task_item, session):
+        time.sleep(1.3)
+        return task_item
+
+    command._run_concurrent_tasks(
+        tasks=["a"], task_function=slow_task, desc_provider=str
+    )
+
+    events = [json.loads(line)["event"] for line in capsys.readouterr().err.splitlines()]
+    assert events.count("progress") >= 2
+    assert events[-1] == "done"
+
+
+def test_run_concurrent_tasks_runs_only_the_shard(command):
+    """Tests that --shard keeps the shard's hosts and prefixes results with the input row."""
+    urls = [f"http://host{i % 6}.example/page{i}" for i in range(30)]
+    command.run_options = RunOptions(shard=(2, 3), prewarm=False)
+
+    with patch("core.progress.tqdm", MagicMock()):
+        results = command._run_concurrent_tasks(
+            tasks=urls,
+            task_function=lambda url, session: (url, True),
+            desc_provider=str,
+            url_provider=str,
+        )
+
+    expected = [
+        (index, url, True)
+        for index, url in enumerate(urls)
+        if shard_of(url, 3) == 2
+    ]
+    assert sorted(results) == expected
+
+
+def test_create_result_writer_names_and_tags_shard_reports(command):
+    """Tests that a shard's report gets the shard suffix and the input row column."""
+    command.run_options = RunOptions(shard=(1, 4), output_format="csv")
+
+    writer = command._create_result_writer("scan", ["URL"], {"URL": "string"})
+
+    assert writer.path == "results/scan.shard-1-of-4.csv"
+    assert writer.columns == ["Input Row", "URL"]
+    assert writer.column_types["Input Row"] == "int"
+
+
+def test_warm_pool_reuses_sessions_between_runs(command, monkeypatch):
+    """Tests that with a warm pool installed, runs share the session and worker threads."""
+    warm_pool = WarmPool(max_workers=2)
+    monkeypatch.setattr("commands.base_command.warm_pool", warm_pool)
+    sessions = []
+
+    def task_function(task_item, session):
+        sessions.append(session)
+        return {"result": task_item}
+
+    try:
+        with patch("core.progress.tqdm", MagicMock()):
+            for _ in range(2):
+                command._run_concurrent_tasks(
+                    tasks=["a"], task_function=task_function, desc_provider=str
+                )
+    finally:
+        warm_pool.close()
+
+    assert sessions[0] is sessions[1]
+    assert not sessions[0].timing_stats.summary_lines()
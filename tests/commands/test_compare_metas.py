@@ -1,7 +1,7 @@
 from unittest.mock import patch, MagicMock
 import pandas as pd
 from pandas.testing import assert_frame_equal
-from commands.compare_metas import CompareMetasCommand
+from commands.compare_metas import CompareMetasCommand, MetaCheckTask
 import pytest
 import requests as rq
 from requests.exceptions import RequestException
@@ -14,7 +14,7 @@ def compare_command():
     return CompareMetasCommand()
 
 
-def test_compare_metas_execute_flow():
+def test_compare_metas_execute_flow(tmp_path, monkeypatch):
     """
     Integration test for the CompareMetasCommand execute method.
     """
@@ -32,87 +32,131 @@ def test_compare_metas_execute_flow():
         }
     )
 
+    report_columns = [
+        "URL",
+        "Meta Name",
+        "Expected Content",
+        "Found Content",
+        "Match?",
+        "Status",
+        "Error",
+    ]
     fake_report_data = [
-        {
-            "URL": "http://site1.com",
-            "Meta Name": "title",
-            "Expected Content": "Título Correto",
-            "Found Content": "Título Correto",
-            "Match?": True,
-        },
-        {
-            "URL": "http://site2.com",
-            "Meta Name": "description",
-            "Expected Content": "Descrição Esperada",
-            "Found Content": "Descrição Diferente",
-        },
+        (
+            "http://site1.com",
+            "title",
+            "Título Correto",
+            "Título Correto",
+            True,
+            "ok",
+            None,
+        ),
+        (
+            "http://site2.com",
+            "description",
+            "Descrição Esperada",
+            None,
+            None,
+            "error",
+            "Timeout",
+        ),
     ]
 
+    def fake_run_tasks(*args, on_result=None, **kwargs):
+        for result in fake_report_data:
+            on_result(result)
+        return []
+
+    monkeypatch.chdir(tmp_path)
+
     with patch(
         "commands.compare_metas.CompareMetasCommand._get_valid_sheet_data"
     ) as mock_get_sheet, patch(
         "commands.compare_metas.CompareMetasCommand._run_concurrent_tasks"
-    ) as mock_run_tasks, patch(
-        "commands.compare_metas.ExcelWriter.create_spreadsheet_with_results"
-    ) as mock_excel_writer:
+    ) as mock_run_tasks:
 
         mock_get_sheet.return_value = fake_sheet_data
-        mock_run_tasks.return_value = fake_report_data
+        mock_run_tasks.side_effect = fake_run_tasks
 
         command = CompareMetasCommand()
         command.execute(fake_args)
 
         mock_get_sheet.assert_called_once()
         mock_run_tasks.assert_called_once()
-        mock_excel_writer.assert_called_once()
+        assert list(mock_run_tasks.call_args.kwargs["tasks"]) == [
+            MetaCheckTask("http://site1.com", "title", "Título Correto"),
+            MetaCheckTask("http://site2.com", "description", "Descrição Esperada"),
+        ]
+
+    called_df = pd.read_excel(
+        tmp_path / "results" / "compare_metas_results.xlsx",
+        nrows=len(fake_report_data),
+        dtype={"Found Content": object, "Match?": object, "Error": object},
+    )
+    expected_df = pd.DataFrame(fake_report_data, columns=report_columns)
 
-        called_df = mock_excel_writer.call_args[0][0]
-        expected_df = pd.DataFrame(fake_report_data)
+    called_df = called_df.sort_values(by="URL").reset_index(drop=True)
+    expected_df = expected_df.sort_values(by="URL").reset_index(drop=True)
+
+    called_df = called_df.astype(object).where(called_df.notna(), None)
+    expected_df = expected_df.astype(object)
+    assert_frame_equal(called_df, expected_df)
+
+
+def test_compare_metas_returns_quietly_when_a_column_prompt_is_cancelled(
+    compare_command, tmp_path, monkeypatch
+):
+    """
+    Verifies that cancelling the column prompt ends the command without an error or a report.
+    """
+    (tmp_path / "metas.csv").write_text("Address,Meta Name,Expected Content\n")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("questionary.text", lambda _: MagicMock(ask=lambda: None))
+    fake_args = MagicMock(
+        file_path="metas.csv",
+        url_col="URL",
+        name_col="Meta Name",
+        content_col="Expected Content",
+    )
 
-        called_df = called_df.sort_values(by="URL").reset_index(drop=True)
-        expected_df = expected_df.sort_values(by="URL").reset_index(drop=True)
+    with patch.object(compare_command, "_run_plan") as mock_run_plan:
+        assert compare_command.execute(fake_args) is None
 
-        assert_frame_equal(called_df, expected_df)
+    mock_run_plan.assert_not_called()
 
 
 def test_process_row_match(compare_command):
     """
     Tests the _process_row method when the found content matches the expected content.
     """
-    row_data = {
-        "URL": "http://example.com",
-        "Meta Name": "description",
-        "Expected Content": "This is the correct description.",
-    }
-    row = pd.Series(row_data)
+    task = MetaCheckTask(
+        "http://example.com", "description", "This is the correct description."
+    )
 
     mock_crawler_instance = MagicMock(spec=Crawler)
     mock_crawler_instance.get_meta_content_by_name.return_value = (
         " This is the correct description.  "
     )
+    mock_crawler_instance.fetch_error = None
 
     with patch(
         "commands.compare_metas.Crawler", return_value=mock_crawler_instance
     ) as mock_crawler_class:
         mock_session = MagicMock(spec=rq.Session)
-        result = compare_command._process_row(
-            row,
-            url_col="URL",
-            name_col="Meta Name",
-            content_col="Expected Content",
-            session=mock_session,
-        )
+        result = compare_command._process_row(task, session=mock_session)
 
     mock_crawler_class.assert_called_once_with("http://example.com", mock_session, [])
     mock_crawler_instance.get_meta_content_by_name.assert_called_with("description")
 
-    expected_result = {
-        "URL": "http://example.com",
-        "Meta Name": "description",
-        "Expected Content": "This is the correct description.",
-        "Found Content": " This is the correct description.  ",
-        "Match?": True,
-    }
+    expected_result = (
+        "http://example.com",
+        "description",
+        "This is the correct description.",
+        " This is the correct description.  ",
+        True,
+        "ok",
+        None,
+    )
     assert result == expected_result
 
 
@@ -120,58 +164,55 @@ def test_process_row_no_match(compare_command):
     """
     Tests the _process_row method when the found content does not match.
     """
-    row_data = {
-        "URL": "http://example.com",
-        "Meta Name": "description",
-        "Expected Content": "Content A",
-    }
-    row = pd.Series(row_data)
+    task = MetaCheckTask("http://example.com", "description", "Content A")
 
     mock_crawler_instance = MagicMock(spec=Crawler)
     mock_crawler_instance.get_meta_content_by_name.return_value = "Content B"
+    mock_crawler_instance.fetch_error = None
 
     with patch("commands.compare_metas.Crawler", return_value=mock_crawler_instance):
-        result = compare_command._process_row(
-            row, "URL", "Meta Name", "Expected Content", MagicMock(spec=rq.Session)
-        )
+        result = compare_command._process_row(task, MagicMock(spec=rq.Session))
 
-    assert result["Match?"] is False
-    assert result["Found Content"] == "Content B"
+    assert result[3:6] == ("Content B", False, "ok")
 
 
 def test_process_row_not_found(compare_command):
     """
     Tests the _process_row method when the meta tag is not found (Crawler returns None).
     """
-    row_data = {
-        "URL": "http://example.com",
-        "Meta Name": "description",
-        "Expected Content": "Anything",
-    }
-    row = pd.Series(row_data)
+    task = MetaCheckTask("http://example.com", "description", "Anything")
 
     mock_crawler_instance = MagicMock(spec=Crawler)
     mock_crawler_instance.get_meta_content_by_name.return_value = None  # Tag not found
+    mock_crawler_instance.fetch_error = None
+
+    with patch("commands.compare_metas.Crawler", return_value=mock_crawler_instance):
+        result = compare_command._process_row(task, MagicMock(spec=rq.Session))
+
+    assert result[3:6] == ("Not Found", False, "ok")
+
+
+def test_process_row_fetch_error(compare_command):
+    """
+    Tests that a failed fetch is reported as an error instead of 'Not Found'.
+    """
+    task = MetaCheckTask("http://example.com", "description", "Anything")
+
+    mock_crawler_instance = MagicMock(spec=Crawler)
+    mock_crawler_instance.get_meta_content_by_name.return_value = None
+    mock_crawler_instance.fetch_error = RequestException("Timed out")
 
     with patch("commands.compare_metas.Crawler", return_value=mock_crawler_instance):
-        result = compare_command._process_row(
-            row, "URL", "Meta Name", "Expected Content", MagicMock(spec=rq.Session)
-        )
+        result = compare_command._process_row(task, MagicMock(spec=rq.Session))
 
-    assert result["Match?"] is False
-    assert result["Found Content"] == "Not Found"
+    assert result == (*task, None, None, "error", "Timed out")
 
 
 def test_process_row_exception(compare_command, monkeypatch):
     """
     Tests the _process_row method when the Crawler raises an exception.
     """
-    row_data = {
-        "URL": "http://broken.com",
-        "Meta Name": "description",
-        "Expected Content": "Anything",
-    }
-    row = pd.Series(row_data)
+    task = MetaCheckTask("http://broken.com", "description", "Anything")
 
     mock_crawler_instance = MagicMock(spec=Crawler)
     mock_crawler_instance.get_meta_content_by_name.side_effect = RequestException(
@@ -182,12 +223,11 @@ def test_process_row_exception(compare_command, monkeypatch):
     monkeypatch.setattr("commands.compare_metas.logger", mock_logger)
 
     with patch("commands.compare_metas.Crawler", return_value=mock_crawler_instance):
-        result = compare_command._process_row(
-            row, "URL", "Meta Name", "Expected Content", MagicMock(spec=rq.Session)
-        )
+        result = compare_command._process_row(task, MagicMock(spec=rq.Session))
 
-    mock_logger.error.assert_called_once_with(
+    mock_logger.error.assert_called_once()
+    message, *message_args = mock_logger.error.call_args.args
+    assert message % tuple(message_args) == (
         "Error processing URL http://broken.com: Network Error"
     )
-    assert result["Match?"] is False
-    assert "Error: Network Error" in result["Found Content"]
+    assert result == (*task, None, None, "error", "Network Error")
@@ -0,0 +1,85 @@
+import argparse
+import json
+import pytest
+from commands.merge_results import MergeResultsCommand
+from core.run_options import RunOptions
+from reporting.result_writers import create_result_writer
+
+COLUMNS = ["Input Row", "URL", "robots", "Status", "Error"]
+TYPES = {"Input Row": "int", "robots": "boolean"}
+SHARDS = {
+    1: [
+        (2, "http://a.com/2", True, "ok", None),
+        (0, "http://a.com/0", False, "ok", None),
+    ],
+    2: [
+        (1, "http://b.com/1", None, "error", "Timed out"),
+        (3, "http://b.com/3", True, "ok", None),
+    ],
+}
+
+
+def _write_shards(tmp_path, output_format):
+    paths = []
+    for shard, rows in SHARDS.items():
+        base = tmp_path / f"scan_metas_results.shard-{shard}-of-2"
+        writer = create_result_writer(output_format, str(base), COLUMNS, TYPES)
+        with writer:
+            for row in rows:
+                writer.write(row)
+        paths.append(writer.path)
+    return paths
+
+
+@pytest.mark.parametrize("shard_format", ["csv", "xlsx", "jsonl"])
+def test_merge_restores_input_order(tmp_path, monkeypatch, shard_format):
+    """
+    Verifies that shard reports are merged in input order, without the input row column.
+    """
+    paths = _write_shards(tmp_path, shard_format)
+    monkeypatch.chdir(tmp_path)
+
+    command = MergeResultsCommand()
+    command.run_options = RunOptions(output_format="jsonl")
+    command.execute(argparse.Namespace(reports=paths, name=None))
+
+    with open(tmp_path / "results" / "scan_metas_results.jsonl") as f:
+        records = [json.loads(line) for line in f]
+    assert [record["URL"] for record in records] == [
+        "http://a.com/0",
+        "http://b.com/1",
+        "http://a.com/2",
+        "http://b.com/3",
+    ]
+    assert [record["robots"] for record in records] == [False, None, True, True]
+    assert records[1]["Error"] == "Timed out"
+    assert "Input Row" not in records[0]
+
+
+def test_merge_warns_about_missing_shards(tmp_path, monkeypatch, capsys):
+    """
+    Verifies that merging only some of the shards warns about the missing ones.
+    """
+    paths = _write_shards(tmp_path, "csv")
+    monkeypatch.chdir(tmp_path)
+
+    command = MergeResultsCommand()
+    command.run_options = RunOptions(output_format="csv")
+    command.execute(argparse.Namespace(reports=paths[:1], name="partial"))
+
+    assert "shards 2/2 are missing" in capsys.readouterr().out
+    assert (tmp_path / "results" / "partial.csv").exists()
+
+
+def test_merge_rejects_reports_without_input_rows(tmp_path, monkeypatch, capsys):
+    """
+    Verifies that a report from a run without --shard is refused.
+    """
+    report = tmp_path / "plain.csv"
+    report.write_text("URL,robots\nhttp://a.com,True\n")
+    monkeypatch.chdir(tmp_path)
+
+    MergeResultsCommand().execute(argparse.Namespace(reports=[str(report)], name=None))
+
+    assert "was it run with --shard?" in capsys.readouterr().out
+    assert not (tmp_path / "results").exists()
@@ -1,8 +1,12 @@
+import json
 from unittest.mock import patch, MagicMock
 import pandas as pd
+from commands.registry import default_commands
 from commands.scan_metas import ScanMetasCommand
 import pytest
 from core.crawler import Crawler
+from core.run_options import RunOptions
+from core.timing import FetchTimings
 from requests.exceptions import RequestException
 import requests as rq
 
@@ -13,7 +17,7 @@ def scan_command():
     return ScanMetasCommand()
 
 
-def test_scan_metas_execute_flow_after_refactor(scan_command):
+def test_scan_metas_execute_flow_after_refactor(scan_command, tmp_path, monkeypatch):
     """
     Integration test for the refactored ScanMetasCommand execute method.
     Verifies the flow by mocking the new validation helper methods.
@@ -27,44 +31,57 @@ def test_scan_metas_execute_flow_after_refactor(scan_command):
     fake_urls = ["http://site1.com", "http://site2.com"]
 
     fake_report_data = [
-        {"URL": "http://site1.com", "robots": True},
-        {"URL": "http://site2.com", "robots": False},
+        ("http://site1.com", True, "ok", None),
+        ("http://site2.com", False, "ok", None),
     ]
 
+    def fake_run_tasks(*args, on_result=None, **kwargs):
+        for result in fake_report_data:
+            on_result(result)
+        return []
+
+    monkeypatch.chdir(tmp_path)
+
     with patch(
         "commands.scan_metas.ScanMetasCommand._get_valid_sheet_data"
     ) as mock_get_sheet, patch(
         "commands.scan_metas.ScanMetasCommand._get_validated_urls_from_column"
     ) as mock_get_urls, patch(
         "commands.scan_metas.ScanMetasCommand._run_concurrent_tasks"
-    ) as mock_run_tasks, patch(
-        "commands.scan_metas.ExcelWriter.create_spreadsheet_with_results"
-    ) as mock_excel_writer:
+    ) as mock_run_tasks:
 
         mock_get_sheet.return_value = fake_sheet_data
         mock_get_urls.return_value = fake_urls
-        mock_run_tasks.return_value = fake_report_data
+        mock_run_tasks.side_effect = fake_run_tasks
 
         scan_command.execute(fake_args)
 
         mock_get_sheet.assert_called_once()
-        mock_get_urls.assert_called_once()
         mock_run_tasks.assert_called_once()
-        mock_excel_writer.assert_called_once()
+        assert list(mock_run_tasks.call_args.kwargs["tasks"]) == fake_urls
+        mock_get_urls.assert_called_once()
 
-        called_df = mock_excel_writer.call_args[0][0]
-        expected_df = pd.DataFrame(fake_report_data)
+    called_df = pd.read_excel(
+        tmp_path / "results" / "scan_metas_results.xlsx",
+        nrows=len(fake_report_data),
+        dtype={"Error": object},
+    )
+    expected_df = pd.DataFrame(
+        fake_report_data, columns=["URL", "robots", "Status", "Error"]
+    )
 
-        called_df = called_df.sort_values(by="URL").reset_index(drop=True)
-        expected_df = expected_df.sort_values(by="URL").reset_index(drop=True)
+    called_df = called_df.sort_values(by="URL").reset_index(drop=True)
+    expected_df = expected_df.sort_values(by="URL").reset_index(drop=True)
 
-        pd.testing.assert_frame_equal(called_df, expected_df)
+    called_df = called_df.astype(object).where(called_df.notna(), None)
+    expected_df = expected_df.astype(object)
+    pd.testing.assert_frame_equal(called_df, expected_df)
 
 
 def test_process_url_success(scan_command):
     """
     Tests the _process_url method for a successful crawl.
-    Ensures it correctly calls the Crawler and formats the success dictionary.
+    Ensures it correctly calls the Crawler and returns the report row.
     """
     url_teste = "http://example.com"
     checks_teste = ["robots", "viewport"]
@@ -74,6 +91,7 @@ def test_process_url_success(scan_command):
 
     mock_crawler_instance = MagicMock(spec=Crawler)
     mock_crawler_instance.execute_scan.return_value = mock_scan_results
+    mock_crawler_instance.fetch_error = None
 
     with patch(
         "commands.scan_metas.Crawler", return_value=mock_crawler_instance
@@ -81,22 +99,19 @@ def test_process_url_success(scan_command):
 
         result = scan_command._process_url(url_teste, checks_teste, sessao_mock)
 
-        mock_crawler_class.assert_called_once_with(url_teste, sessao_mock, checks_teste)
+        mock_crawler_class.assert_called_once_with(
+            url_teste, sessao_mock, checks_teste, selectors=None
+        )
 
         mock_crawler_instance.execute_scan.assert_called_once()
 
-        expected_result = {
-            "URL": "http://example.com",
-            "robots": True,
-            "viewport": False,
-        }
-        assert result == expected_result
+        assert result == ("http://example.com", True, False, "ok", None)
 
 
 def test_process_url_exception(scan_command, monkeypatch):
     """
     Tests the _process_url method when the Crawler raises an exception.
-    Ensures the exception is caught, logged, and an error dictionary is returned.
+    Ensures the exception is caught, logged, and an error row is returned.
     """
     url_teste = "http://broken-site.com"
     checks_teste = ["robots"]
@@ -114,9 +129,102 @@ def test_process_url_exception(scan_command, monkeypatch):
 
         result = scan_command._process_url(url_teste, checks_teste, sessao_mock)
 
-        mock_logger.error.assert_called_once_with(
+        mock_logger.error.assert_called_once()
+        message, *message_args = mock_logger.error.call_args.args
+        assert message % tuple(message_args) == (
             f"'{url_teste}' generated an exception: Falha de conexão"
         )
 
-        expected_result = {"URL": "http://broken-site.com", "robots": "Error"}
+        expected_result = ("http://broken-site.com", None, "error", "Falha de conexão")
         assert result == expected_result
+
+
+def test_process_url_adds_timing_columns_when_enabled(scan_command):
+    """
+    Tests that _process_url appends the timing columns when --timings is set.
+    """
+    mock_crawler_instance = MagicMock(spec=Crawler)
+    mock_crawler_instance.execute_scan.return_value = {"robots": True}
+    mock_crawler_instance.timings = FetchTimings(ttfb=0.05, bytes=100, reused=True)
+    mock_crawler_instance.fetch_error = None
+
+    scan_command.run_options = RunOptions(timings=True)
+
+    with patch("commands.scan_metas.Crawler", return_value=mock_crawler_instance):
+        result = scan_command._process_url(
+            "http://example.com", ["robots"], MagicMock(spec=rq.Session)
+        )
+
+    assert result[:4] == ("http://example.com", True, "ok", None)
+    assert result[4:] == mock_crawler_instance.timings.as_row()
+
+
+def test_process_url_reports_fetch_error(scan_command):
+    """
+    Tests that a failed fetch yields an error status with empty check values
+    rather than a 'not found' result.
+    """
+    mock_crawler_instance = MagicMock(spec=Crawler)
+    mock_crawler_instance.execute_scan.return_value = {"robots": False}
+    mock_crawler_instance.fetch_error = RequestException("Timed out")
+
+    with patch("commands.scan_metas.Crawler", return_value=mock_crawler_instance):
+        result = scan_command._process_url(
+            "http://slow.com", ["robots"], MagicMock(spec=rq.Session)
+        )
+
+    assert result == ("http://slow.com", None, "error", "Timed out")
+
+
+def test_scan_metas_reports_select_checks(local_server, tmp_path, monkeypatch):
+    """
+    Verifies that --select checks get their own typed columns next to the meta checks.
+    """
+    (tmp_path / "urls.csv").write_text(f"URL\n{local_server}/a\n")
+    monkeypatch.chdir(tmp_path)
+    command, args = default_commands()["scan-metas"].prepare(
+        [
+            "urls.csv",
+            "URL",
+            "--select",
+            "metas:count=//meta",
+            "--select",
+            "robots_value:value=//meta[@name='robots']/@content",
+            "--output-format",
+            "jsonl",
+        ]
+    )
+
+    command.execute(args)
+
+    rows = [
+        json.loads(line)
+        for line in (tmp_path / "results" / "scan_metas_results.jsonl").read_text().splitlines()
+    ]
+    assert rows == [
+        {
+            "URL": f"{local_server}/a",
+            "robots": True,
+            "metas": 1,
+            "robots_value": "index, follow",
+            "Status": "ok",
+            "Error": None,
+        }
+    ]
+
+
+def test_scan_metas_refuses_invalid_select(tmp_path, monkeypatch, capsys):
+    """
+    Verifies that a check that doesn't compile stops the run before any fetch.
+    """
+    (tmp_path / "urls.csv").write_text("URL\nhttp://a.com/\n")
+    monkeypatch.chdir(tmp_path)
+    command, args = default_commands()["scan-metas"].prepare(
+        ["urls.csv", "URL", "--select", "broken=//meta["]
+    )
+
+    with patch.object(ScanMetasCommand, "_run_concurrent_tasks") as mock_run_tasks:
+        command.execute(args)
+
+    mock_run_tasks.assert_not_called()
+    assert "invalid XPath" in capsys.readouterr().out
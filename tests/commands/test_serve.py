@@ -0,0 +1,71 @@
+import os
+from unittest.mock import MagicMock
+import pytest
+from commands.serve import ServeCommand
+
+
+@pytest.fixture
+def app():
+    """Provides a fake CliApp whose run_direct_mode prints where and what it ran."""
+    fake_app = MagicMock()
+    fake_app._requested_command.side_effect = lambda argv: argv[0] if argv else None
+    fake_app.run_direct_mode.side_effect = lambda argv: print(
+        f"{os.getcwd()} {' '.join(argv)}"
+    )
+    return fake_app
+
+
+def test_run_job_runs_in_the_client_directory_and_captures_output(app, tmp_path):
+    """
+    Verifies that a job runs in the client's directory, without a progress bar, and returns its output.
+    """
+    previous_cwd = os.getcwd()
+
+    exit_code, output = ServeCommand()._run_job(
+        app, ["scan-metas", "urls.csv", "URL"], str(tmp_path)
+    )
+
+    assert exit_code == 0
+    assert output == f"{tmp_path} scan-metas urls.csv URL --progress none\n"
+    assert os.getcwd() == previous_cwd
+
+
+def test_run_job_reports_argument_errors(app, tmp_path):
+    """
+    Verifies that an argparse exit is turned into the job's exit code.
+    """
+
+    def bad_arguments(argv):
+        print("error: the following arguments are required")
+        raise SystemExit(2)
+
+    app.run_direct_mode.side_effect = bad_arguments
+
+    exit_code, output = ServeCommand()._run_job(
+        app, ["scan-metas", "--progress", "bar"], str(tmp_path)
+    )
+
+    assert exit_code == 2
+    assert "arguments are required" in output
+
+
+def test_run_job_refuses_nested_serve(app, tmp_path):
+    """
+    Verifies that the daemon does not start another daemon from a job.
+    """
+    exit_code, _ = ServeCommand()._run_job(app, ["serve"], str(tmp_path))
+
+    assert exit_code == 2
+    app.run_direct_mode.assert_not_called()
+
+
+def test_run_job_with_missing_directory(app, tmp_path):
+    """
+    Verifies that a job from a directory that doesn't exist fails cleanly.
+    """
+    exit_code, output = ServeCommand()._run_job(
+        app, ["scan-metas"], str(tmp_path / "missing")
+    )
+
+    assert exit_code == 1
+    assert "could not run" in output
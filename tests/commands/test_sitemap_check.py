@@ -13,7 +13,7 @@ def sitemap_command():
     return SitemapCheckCommand()
 
 
-def test_sitemap_check_execute_flow(sitemap_command):
+def test_sitemap_check_execute_flow(sitemap_command, tmp_path, monkeypatch):
     """
     Integration test for the SitemapCheck command's execute method.
 
@@ -45,37 +45,45 @@ def test_sitemap_check_execute_flow(sitemap_command):
     ]
     expected_df = pd.DataFrame(expected_report_data)
 
+    def fake_run_tasks(*args, on_result=None, **kwargs):
+        for result in expected_report_data:
+            on_result(result)
+        return []
+
+    monkeypatch.chdir(tmp_path)
+
     with patch(
         "commands.sitemap_check.SitemapCheckCommand._get_valid_sheet_data"
     ) as mock_get_sheet, patch(
-        "commands.sitemap_check.SitemapCheckCommand._ensure_multiple_columns_exist"
-    ) as mock_ensure_cols, patch(
         "commands.sitemap_check.SitemapCheckCommand._fetch_and_prepare_sitemap_set"
     ) as mock_fetch_sitemap, patch(
         "commands.sitemap_check.SitemapCheckCommand._run_concurrent_tasks"
-    ) as mock_run_tasks, patch(
-        "commands.sitemap_check.ExcelWriter.create_spreadsheet_with_results"
-    ) as mock_excel_writer:
+    ) as mock_run_tasks:
 
         mock_get_sheet.return_value = fake_sheet_data
-        mock_ensure_cols.return_value = ["Sitemap", "Expected URLs"]
         mock_fetch_sitemap.return_value = fake_sitemap_urls_set
-        mock_run_tasks.return_value = expected_report_data
+        mock_run_tasks.side_effect = fake_run_tasks
 
         sitemap_command.execute(fake_args)
 
         mock_get_sheet.assert_called_once()
-        mock_ensure_cols.assert_called_once()
+        required_columns = mock_get_sheet.call_args[0][1]
+        assert [col["name"] for col in required_columns] == [
+            "Sitemap",
+            "Expected URLs",
+        ]
         mock_fetch_sitemap.assert_called_once()
         mock_run_tasks.assert_called_once()
-        mock_excel_writer.assert_called_once()
 
-        called_df = mock_excel_writer.call_args[0][0]
+    called_df = pd.read_excel(
+        tmp_path / "results" / "sitemap_check_results.xlsx",
+        nrows=len(expected_report_data),
+    )
 
-        called_df = called_df.sort_values(by="Expected URLs").reset_index(drop=True)
-        expected_df = expected_df.sort_values(by="Expected URLs").reset_index(drop=True)
+    called_df = called_df.sort_values(by="Expected URLs").reset_index(drop=True)
+    expected_df = expected_df.sort_values(by="Expected URLs").reset_index(drop=True)
 
-        assert_frame_equal(called_df, expected_df)
+    assert_frame_equal(called_df, expected_df)
 
 
 def test_process_row_url_found(sitemap_command):
@@ -84,16 +92,9 @@ def test_process_row_url_found(sitemap_command):
     """
 
     sitemap_urls_set = {"http://example.com/page1", "http://example.com/page2"}
-    row_data = {"Expected URLS": "http://example.com/page1"}
-    row = pd.Series(row_data)
+    result = sitemap_command._process_row("http://example.com/page1", sitemap_urls_set)
 
-    result = sitemap_command._process_row(row, "Expected URLS", sitemap_urls_set)
-
-    expected_result = {
-        "Expected URLS": "http://example.com/page1",
-        "Found in Sitemap?": True,
-    }
-    assert result == expected_result
+    assert result == ("http://example.com/page1", True)
 
 
 def test_process_row_url_not_found(sitemap_command):
@@ -101,16 +102,9 @@ def test_process_row_url_not_found(sitemap_command):
     Tests that _process_row correctly identifies a URL that is NOT present in the sitemap set.
     """
     sitemap_urls_set = {"http://example.com/page1", "http://example.com/page2"}
-    row_data = {"Expected URLS": "http://example.com/page3"}
-    row = pd.Series(row_data)
+    result = sitemap_command._process_row("http://example.com/page3", sitemap_urls_set)
 
-    result = sitemap_command._process_row(row, "Expected URLS", sitemap_urls_set)
-
-    expected_result = {
-        "Expected URLS": "http://example.com/page3",
-        "Found in Sitemap?": False,
-    }
-    assert result == expected_result
+    assert result == ("http://example.com/page3", False)
 
 
 def test_process_row_url_strips_whitespace(sitemap_command):
@@ -120,13 +114,11 @@ def test_process_row_url_strips_whitespace(sitemap_command):
     """
     sitemap_urls_set = {"http://example.com/page1"}
 
-    row_data = {"Expected URLS": "  http://example.com/page1  "}
-    row = pd.Series(row_data)
-
-    result = sitemap_command._process_row(row, "Expected URLS", sitemap_urls_set)
+    result = sitemap_command._process_row(
+        "  http://example.com/page1  ", sitemap_urls_set
+    )
 
-    assert result["Found in Sitemap?"] is True
-    assert result["Expected URLS"] == "http://example.com/page1"
+    assert result == ("http://example.com/page1", True)
 
 
 def test_fetch_and_prepare_sitemap_set_success(sitemap_command):
@@ -147,7 +139,7 @@ def test_fetch_and_prepare_sitemap_set_success(sitemap_command):
     mock_session_context_manager.__enter__.return_value = mock_session
 
     with patch(
-        "commands.sitemap_check.rq.Session", return_value=mock_session_context_manager
+        "commands.sitemap_check.CrawlSession", return_value=mock_session_context_manager
     ), patch(
         "commands.sitemap_check.Crawler", return_value=mock_crawler_instance
     ) as mock_crawler_class:
@@ -179,7 +171,7 @@ def test_fetch_and_prepare_sitemap_set_failure(sitemap_command):
     mock_session_context_manager.__enter__.return_value = mock_session
 
     with patch(
-        "commands.sitemap_check.rq.Session", return_value=mock_session_context_manager
+        "commands.sitemap_check.CrawlSession", return_value=mock_session_context_manager
     ), patch(
         "commands.sitemap_check.Crawler", return_value=mock_crawler_instance
     ) as mock_crawler_class:
@@ -0,0 +1,199 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from commands.registry import default_commands
+from commands.sitemap_health import _is_noindex
+from core.crawler import Crawler
+from core.session import CrawlSession, SessionOptions
+
+INDEX = """<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>{base}/pages.xml</loc></sitemap>
+  <sitemap><loc>{base}/nested.xml</loc></sitemap>
+  <sitemap><loc>{base}/missing.xml</loc></sitemap>
+</sitemapindex>"""
+NESTED = """<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>{base}/posts.xml</loc></sitemap>
+  <sitemap><loc>{base}/pages.xml</loc></sitemap>
+</sitemapindex>"""
+BODY = b"<body>" + b"x" * 500_000 + b"</body></html>"
+PAGES = {
+    "/tagged": b'<html><head><meta name="robots" content="NOINDEX, follow"></head>' + BODY,
+    "/duplicate": b'<html><head><link rel="Canonical" href="/ok"></head>' + BODY,
+}
+URLSET = """<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{locs}</urlset>"""
+
+
+class _SiteHandler(BaseHTTPRequestHandler):
+    """Serves a sitemap index and pages with various status, redirect and robots headers."""
+
+    protocol_version = "HTTP/1.1"
+
+    def _send(self, code: int, body: bytes = b"", **headers):
+        self.send_response(code)
+        for name, value in headers.items():
+            self.send_header(name.replace("_", "-"), value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def do_GET(self):
+        base = f"http://{self.headers['Host']}"
+        locs = lambda *paths: "".join(f"<url><loc>{base}{p}</loc></url>" for p in paths)
+        documents = {
+            "/index.xml": INDEX.format(base=base),
+            "/nested.xml": NESTED.format(base=base),
+            "/pages.xml": URLSET.format(locs=locs("/ok", "/moved", "/hidden")),
+            "/posts.xml": URLSET.format(
+                locs=locs("/gone", "/copy", "/tagged", "/duplicate")
+            ),
+        }
+        if self.path in documents:
+            self._send(200, documents[self.path].encode())
+        elif self.path in PAGES:
+            self._send(200, PAGES[self.path])
+        else:
+            self.do_HEAD()
+
+    def do_HEAD(self):
+        if self.path == "/ok":
+            self._send(200, Link='</ok>; rel="canonical"')
+        elif self.path == "/moved":
+            self._send(301, Location="/ok")
+        elif self.path == "/hidden":
+            self._send(200, X_Robots_Tag="googlebot: noindex, nofollow")
+        elif self.path in PAGES:
+            self._send(200)
+        elif self.path == "/copy":
+            self._send(200, Link='<http://example.com/original>; rel="canonical"')
+        else:
+            self._send(404)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def site():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _SiteHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_iter_sitemap_urls_streams_every_child_once(site):
+    """
+    Verifies that nested indexes are followed, each child read once, and failed children reported.
+    """
+    errors = []
+    with CrawlSession(SessionOptions(delay=0.0)) as session:
+        entries = list(
+            Crawler(f"{site}/index.xml", session, []).iter_sitemap_urls(
+                on_error=lambda sitemap, error: errors.append(sitemap)
+            )
+        )
+
+    assert entries == [
+        (f"{site}/ok", f"{site}/pages.xml"),
+        (f"{site}/moved", f"{site}/pages.xml"),
+        (f"{site}/hidden", f"{site}/pages.xml"),
+        (f"{site}/gone", f"{site}/posts.xml"),
+        (f"{site}/copy", f"{site}/posts.xml"),
+        (f"{site}/tagged", f"{site}/posts.xml"),
+        (f"{site}/duplicate", f"{site}/posts.xml"),
+    ]
+    assert errors == [f"{site}/missing.xml"]
+
+
+def test_fetch_head_stops_reading_after_the_head(site):
+    """
+    Verifies that only the start of a page is read, up to the end of its <head>.
+    """
+    with CrawlSession(SessionOptions(delay=0.0)) as session:
+        res, head = session.fetch_head(f"{site}/tagged")
+
+    assert res.status_code == 200
+    assert b'content="NOINDEX, follow"' in head
+    assert len(head) < 100_000
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [("noindex", True), ("googlebot: none", True), ("index, nofollow", False), (None, False)],
+)
+def test_is_noindex_reads_every_directive(value, expected):
+    """
+    Verifies that noindex is found in X-Robots-Tag values, with or without a user agent.
+    """
+    assert _is_noindex(value) is expected
+
+
+def test_sitemap_health_reports_urls_and_per_sitemap_summary(
+    site, tmp_path, monkeypatch, capsys
+):
+    """
+    Verifies that each URL is checked with HEAD and the failures are summed per child sitemap.
+    """
+    monkeypatch.chdir(tmp_path)
+    command, args = default_commands()["sitemap-health"].prepare(
+        [f"{site}/index.xml", "--delay", "0", "--output-format", "jsonl", "--no-prewarm"]
+    )
+
+    command.execute(args)
+
+    with open(tmp_path / "results" / "sitemap_health_results.jsonl") as f:
+        rows = {row["URL"].removeprefix(site): row for row in map(json.loads, f)}
+    assert {path for path, row in rows.items() if row["Healthy?"]} == {"/ok"}
+    assert rows["/moved"]["Redirected?"] is True
+    assert rows["/moved"]["Final URL"] == f"{site}/ok"
+    assert rows["/hidden"]["Noindex?"] is True
+    assert rows["/copy"]["Canonical Elsewhere?"] is True
+    assert rows["/gone"]["Status Code"] == 404
+    assert rows["/tagged"]["Meta Robots"] == "NOINDEX, follow"
+    assert rows["/tagged"]["Noindex?"] is True
+    assert rows["/duplicate"]["Canonical"] == f"{site}/ok"
+    assert rows["/duplicate"]["Canonical Elsewhere?"] is True
+
+    with open(tmp_path / "results" / "sitemap_health_summary.jsonl") as f:
+        summary = {row["Sitemap"].removeprefix(site): row for row in map(json.loads, f)}
+    assert (summary["/pages.xml"]["URLs"], summary["/pages.xml"]["Healthy"]) == (3, 1)
+    assert summary["/posts.xml"]["Not 200"] == 1
+    assert summary["/missing.xml"]["URLs"] == 0
+    assert summary["/missing.xml"]["Sitemap Error"]
+    assert "1/7 URLs are healthy." in capsys.readouterr().out
+
+
+def test_sitemap_health_reports_an_unreadable_sitemap(site, tmp_path, monkeypatch, capsys):
+    """
+    Verifies that a sitemap that can't be fetched stops the run without a report.
+    """
+    monkeypatch.chdir(tmp_path)
+    command, args = default_commands()["sitemap-health"].prepare(
+        [f"{site}/nothing.xml", "--delay", "0", "--output-format", "jsonl"]
+    )
+
+    command.execute(args)
+
+    assert "Could not read the sitemap" in capsys.readouterr().out
+    assert not (tmp_path / "results").exists()
+
+
+def test_sitemap_health_headers_only_skips_the_html(site, tmp_path, monkeypatch):
+    """
+    Verifies that --headers-only sends HEAD requests and only reads the response headers.
+    """
+    monkeypatch.chdir(tmp_path)
+    command, args = default_commands()["sitemap-health"].prepare(
+        [f"{site}/index.xml", "--headers-only", "--delay", "0", "--output-format", "jsonl"]
+    )
+
+    command.execute(args)
+
+    with open(tmp_path / "results" / "sitemap_health_results.jsonl") as f:
+        rows = {row["URL"].removeprefix(site): row for row in map(json.loads, f)}
+    assert rows["/tagged"]["Meta Robots"] is None
+    assert rows["/tagged"]["Healthy?"] is True
+    assert rows["/hidden"]["Noindex?"] is True
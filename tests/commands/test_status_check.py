@@ -0,0 +1,138 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from commands.registry import default_commands
+from core.crawler import Crawler
+from core.negative_cache import unreachable_hosts
+from core.session import CrawlSession, SessionOptions
+
+
+class _RedirectingHandler(BaseHTTPRequestHandler):
+    """Redirects /old to /new, refuses HEAD on /no-head and counts body bytes sent."""
+
+    protocol_version = "HTTP/1.1"
+    body_bytes_sent = 0
+
+    def _respond(self, code: int, location: str = None, body: bytes = b""):
+        self.send_response(code)
+        if location:
+            self.send_header("Location", location)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            type(self).body_bytes_sent += len(body)
+            self.wfile.write(body)
+
+    def do_HEAD(self):
+        if self.path == "/old":
+            self._respond(301, "/mid")
+        elif self.path == "/mid":
+            self._respond(302, "/new")
+        elif self.path == "/new":
+            self._respond(200, body=b"x" * 1000)
+        elif self.path in ("/no-head", "/no-head-no-range"):
+            self._respond(405 if self.path == "/no-head" else 501)
+        else:
+            self._respond(404)
+
+    def do_GET(self):
+        if self.path == "/no-head" and self.headers.get("Range") == "bytes=0-0":
+            self._respond(206, body=b"x")
+        else:
+            self._respond(200, body=b"x" * 1000)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def redirecting_server():
+    _RedirectingHandler.body_bytes_sent = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _RedirectingHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_check_status_follows_redirects_with_head(redirecting_server):
+    """
+    Verifies that the redirect chain and final URL are recorded without downloading any body.
+    """
+    with CrawlSession(SessionOptions(delay=0.0)) as session:
+        result = Crawler(f"{redirecting_server}/old", session, []).check_status()
+
+    assert result.status_code == 200
+    assert result.final_url == f"{redirecting_server}/new"
+    assert result.method == "HEAD"
+    assert result.redirect_chain() == (
+        f"301 {redirecting_server}/old -> 302 {redirecting_server}/mid "
+        f"-> {redirecting_server}/new"
+    )
+    assert _RedirectingHandler.body_bytes_sent == 0
+
+
+def test_check_status_falls_back_to_a_ranged_get(redirecting_server):
+    """
+    Verifies that a refused HEAD is retried as a one-byte GET, also when the range is ignored.
+    """
+    with CrawlSession(SessionOptions(delay=0.0)) as session:
+        ranged = Crawler(f"{redirecting_server}/no-head", session, []).check_status()
+        assert _RedirectingHandler.body_bytes_sent == 1
+        unranged = Crawler(
+            f"{redirecting_server}/no-head-no-range", session, []
+        ).check_status()
+
+    assert (ranged.status_code, ranged.method, ranged.redirects) == (200, "GET", [])
+    assert (unranged.status_code, unranged.method) == (200, "GET")
+
+
+def test_status_check_reports_every_url(redirecting_server, tmp_path, monkeypatch):
+    """
+    Verifies that error statuses are results, and only failed requests are errors.
+    """
+    (tmp_path / "urls.csv").write_text(
+        f"URL\n{redirecting_server}/old\n{redirecting_server}/gone\nhttp://127.0.0.1:1/\n"
+    )
+    monkeypatch.chdir(tmp_path)
+    command, args = default_commands()["status-check"].prepare(
+        ["urls.csv", "URL", "--delay", "0", "--output-format", "jsonl", "--no-prewarm"]
+    )
+
+    command.execute(args)
+
+    with open(tmp_path / "results" / "status_check_results.jsonl") as f:
+        rows = {row["URL"]: row for row in map(json.loads, f)}
+    moved = rows[f"{redirecting_server}/old"]
+    assert (moved["Status Code"], moved["Redirects"], moved["Method"]) == (200, 2, "HEAD")
+    assert moved["Final URL"] == f"{redirecting_server}/new"
+    assert moved["Latency (ms)"] >= 0
+    gone = rows[f"{redirecting_server}/gone"]
+    assert (gone["Status Code"], gone["Redirect Chain"], gone["Status"]) == (404, "", "ok")
+    refused = rows["http://127.0.0.1:1/"]
+    assert refused["Status Code"] is None
+    assert refused["Status"] == "error" and refused["Error"]
+
+
+def test_status_check_marks_short_circuited_urls(tmp_path, monkeypatch, capsys):
+    """
+    Verifies that URLs skipped by the unreachable-host cache get their own status in the report.
+    """
+    unreachable_hosts.clear()
+    unreachable_hosts.record("127.0.0.1:1", "connect", "Connection refused")
+    (tmp_path / "urls.csv").write_text("URL\nhttp://127.0.0.1:1/a\nhttp://127.0.0.1:1/b\n")
+    monkeypatch.chdir(tmp_path)
+    command, args = default_commands()["status-check"].prepare(
+        ["urls.csv", "URL", "--delay", "0", "--output-format", "jsonl", "--no-prewarm"]
+    )
+
+    command.execute(args)
+
+    with open(tmp_path / "results" / "status_check_results.jsonl") as f:
+        rows = [json.loads(line) for line in f]
+    assert [row["Status"] for row in rows] == ["short_circuited", "short_circuited"]
+    assert "Connection refused" in rows[0]["Error"]
+    assert "2 fetches were short-circuited" in capsys.readouterr().out
+    unreachable_hosts.clear()
@@ -0,0 +1,47 @@
+import argparse
+from core.job_queue import JobQueue
+from commands.submit import SubmitCommand
+
+
+def _submit(tmp_path, command, job_args):
+    SubmitCommand().execute(
+        argparse.Namespace(
+            queue=tmp_path / "queue.db", job_command=command, job_args=job_args
+        )
+    )
+    return JobQueue(tmp_path / "queue.db")
+
+
+def test_submit_queues_one_task_per_input_row(tmp_path, monkeypatch, capsys):
+    """
+    Verifies that the input is read at submit time and the report layout is stored with the job.
+    """
+    (tmp_path / "urls.csv").write_text("URL\nhttp://a.com/\n\nhttp://b.com/\n")
+    monkeypatch.chdir(tmp_path)
+
+    queue = _submit(
+        tmp_path,
+        "scan-metas",
+        ["urls.csv", "URL", "--checks", "robots", "--output-format", "jsonl"],
+    )
+
+    (summary,) = queue.summaries()
+    assert summary.total == 2
+    assert summary.job.cwd == str(tmp_path)
+    assert summary.job.report["columns"] == ["URL", "robots", "Status", "Error"]
+    assert summary.job.report["output_format"] == "jsonl"
+    assert [task.payload for task in queue.lease("w", 10, 60)] == [
+        "http://a.com/",
+        "http://b.com/",
+    ]
+    assert "Queued job #1: 2 tasks" in capsys.readouterr().out
+
+
+def test_submit_refuses_commands_that_cant_be_queued(tmp_path, capsys):
+    """
+    Verifies that only the per-URL commands are accepted, and nothing is queued otherwise.
+    """
+    queue = _submit(tmp_path, "merge", ["a.csv"])
+
+    assert queue.summaries() == []
+    assert "'merge' can't be queued" in capsys.readouterr().out
@@ -0,0 +1,147 @@
+import argparse
+import json
+import time
+from commands.status import StatusCommand
+from commands.submit import SubmitCommand
+from commands.worker import QueueWorker
+from core.job_queue import JobQueue
+
+
+def test_worker_runs_queued_jobs_and_writes_their_reports(
+    local_server, tmp_path, monkeypatch, capsys
+):
+    """
+    Verifies that a worker runs every queued task and writes each job's report in input order.
+    """
+    urls = [f"{local_server}/{i}" for i in range(5)]
+    (tmp_path / "urls.csv").write_text("URL\n" + "\n".join(urls) + "\n")
+    (tmp_path / "metas.csv").write_text(
+        f"URL,Meta Name,Expected Content\n{local_server}/,robots,\"index, follow\"\n"
+    )
+    monkeypatch.chdir(tmp_path)
+    queue_path = tmp_path / "queue.db"
+    for command, job_args in [
+        ("scan-metas", ["urls.csv", "URL", "--output-format", "jsonl"]),
+        ("compare-metas", ["metas.csv", "--output-format", "jsonl"]),
+    ]:
+        SubmitCommand().execute(
+            argparse.Namespace(queue=queue_path, job_command=command, job_args=job_args)
+        )
+
+    with JobQueue(queue_path) as queue:
+        worker = QueueWorker(queue, host_interval=0.0, lease_seconds=30)
+        worker.run(exit_when_idle=True)
+
+    assert worker.tasks_run == 6
+    assert worker._jobs == {} and worker._sessions == {}
+    with open(tmp_path / "results" / "scan_metas_results.job-1.jsonl") as f:
+        records = [json.loads(line) for line in f]
+    assert [record["URL"] for record in records] == urls
+    assert all(record["robots"] is True for record in records)
+    with open(tmp_path / "results" / "compare_metas_results.job-2.jsonl") as f:
+        (record,) = [json.loads(line) for line in f]
+    assert record["Match?"] is True
+
+    capsys.readouterr()
+    StatusCommand().execute(argparse.Namespace(queue=queue_path, all=True))
+    output = capsys.readouterr().out
+    assert "scan-metas" in output and "5/5" in output
+    assert "results/scan_metas_results.job-1.jsonl" in output
+
+
+def test_worker_spaces_requests_with_the_host_budget(local_server, tmp_path):
+    """
+    Verifies that the worker books a slot in the shared per-host budget before each fetch.
+    """
+    with JobQueue(tmp_path / "queue.db") as queue:
+        queue.submit(
+            "scan-metas",
+            ["urls.csv", "URL"],
+            str(tmp_path),
+            {
+                "name": "scan",
+                "columns": ["URL", "robots", "Status", "Error"],
+                "column_types": {},
+                "output_format": "csv",
+                "output_compression": None,
+            },
+            [f"{local_server}/{i}" for i in range(3)],
+        )
+        worker = QueueWorker(queue, host_interval=0.2, lease_seconds=30)
+        start = time.perf_counter()
+        worker.run(exit_when_idle=True)
+        elapsed = time.perf_counter() - start
+
+    assert worker.tasks_run == 3
+    assert elapsed >= 0.4
+
+
+def test_worker_reports_failed_tasks_as_error_rows(local_server, tmp_path):
+    """
+    Verifies that a task given up on still gets a report row, with its URL and error.
+    """
+    urls = [f"{local_server}/ok", f"{local_server}/failed"]
+    with JobQueue(tmp_path / "queue.db") as queue:
+        queue.submit(
+            "scan-metas",
+            ["urls.csv", "URL"],
+            str(tmp_path),
+            {
+                "name": "scan",
+                "columns": ["URL", "robots", "Status", "Error"],
+                "column_types": {},
+                "output_format": "jsonl",
+                "output_compression": None,
+            },
+            urls,
+        )
+        _, failed = queue.lease("crashed", 2, lease_seconds=30)
+        queue.fail(failed.id, "crashed", "lease expired too many times")
+        queue.heartbeat("crashed", lease_seconds=-1)
+
+        worker = QueueWorker(queue, host_interval=0.0, lease_seconds=30)
+        worker.run(exit_when_idle=True)
+
+    with open(tmp_path / "results" / "scan.job-1.jsonl") as f:
+        records = [json.loads(line) for line in f]
+    assert [record["URL"] for record in records] == urls
+    assert records[0]["Status"] == "ok"
+    assert records[1] == {
+        "URL": f"{local_server}/failed",
+        "robots": None,
+        "Status": "error",
+        "Error": "lease expired too many times",
+    }
+
+
+def test_worker_runs_each_job_with_its_session_options(tmp_path):
+    """
+    Verifies that jobs get a session with their own --hedge, shared when equal, and keep their --timings.
+    """
+    report = {
+        "name": "scan",
+        "columns": ["URL", "robots", "Status", "Error"],
+        "column_types": {},
+        "output_format": "csv",
+        "output_compression": None,
+    }
+    with JobQueue(tmp_path / "queue.db") as queue:
+        argvs = [
+            ["urls.csv", "URL", "--delay", "5"],
+            ["urls.csv", "URL", "--hedge", "--hedge-budget", "0.1", "--timings"],
+            ["urls.csv", "URL", "--hedge", "--hedge-budget", "0.1", "--timings"],
+        ]
+        job_ids = [
+            queue.submit("scan-metas", argv, str(tmp_path), report, [])[0]
+            for argv in argvs
+        ]
+        worker = QueueWorker(queue, host_interval=0.0, lease_seconds=30)
+        plain, hedged, same = [worker._job(job_id).session for job_id in job_ids]
+
+        assert plain.options.delay == 0.0 and plain.hedger is None
+        assert hedged.hedger.budget == 0.1
+        assert worker._job(job_ids[1]).command.run_options.timings
+        assert same is hedged
+        worker.run(exit_when_idle=True)
+
+    assert worker._jobs == {} and worker._sessions == {}
@@ -0,0 +1,47 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+
+LOCAL_PAGE = b'<html><head><meta name="robots" content="index, follow"></head></html>'
+
+
+class _LocalPageHandler(BaseHTTPRequestHandler):
+    """Serves the same small HTML page (or its headers, to HEAD) on every path, with keep-alive."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(LOCAL_PAGE)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(LOCAL_PAGE)
+
+    do_HEAD = do_GET
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def local_server():
+    """Provides the base URL of an HTTP server running on localhost."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _LocalPageHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def isolated_daemon_state(monkeypatch, tmp_path):
+    """Keeps tests from finding (and forwarding to) a serve daemon running on this machine."""
+    monkeypatch.setattr("core.daemon.STATE_FILE", tmp_path / "daemon.json")
+
+
+@pytest.fixture(autouse=True)
+def isolated_job_queue(monkeypatch, tmp_path):
+    """Keeps tests from using the job queue in the user's home directory."""
+    monkeypatch.setattr("core.job_queue.DEFAULT_QUEUE", tmp_path / "queue.db")
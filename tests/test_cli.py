@@ -1,5 +1,8 @@
+import os
+import subprocess
 import sys
 import logging
+from pathlib import Path
 from unittest.mock import patch, MagicMock
 import pytest
 from cli import CliApp
@@ -92,13 +95,15 @@ def test_cli_run_interactive_mode_scan_metas(app, monkeypatch):
     )
 
     mock_responses = {
-        "Path to the .xlsx file with URLs.": "interactive/file.xlsx",
+        "Path to the file with URLs (.xlsx, .csv, .jsonl, .parquet, .txt) or - for stdin.": "interactive/file.xlsx",
         "Name of the column containing the URLs.": "MyURLs",
         "A list of meta tags to check (e.g., robots description viewport).": "robots og:title",
     }
 
     def mock_questionary_text(message, **kwargs):
         logging.info(f"Mock text prompt: {message}")
+        if message.startswith("An extra check"):
+            return MagicMock(ask=lambda: "canonical:value=link[rel=canonical] a")
         answer = mock_responses.get(message)
         if answer is None:
             logging.warning(f"No mock response for message: {message}")
@@ -128,9 +133,28 @@ def test_cli_run_interactive_mode_scan_metas(app, monkeypatch):
     assert called_args.file_path == "interactive/file.xlsx"
     assert called_args.column_name == "MyURLs"
     assert called_args.checks == ["robots", "og:title"]
+    (select,) = called_args.select
+    assert (select.name, select.expression) == ("canonical", "link[rel=canonical] a")
     assert called_args.command == "scan-metas"
 
 
+def test_interactive_answers_are_converted_like_the_command_line(app, monkeypatch, capsys):
+    """
+    Verifies that an invalid --select answer is asked again and a valid one becomes a check list.
+    """
+    answers = iter(["no equals sign", "hreflang:count=//link[@hreflang]"])
+    monkeypatch.setattr(
+        "questionary.text", lambda message: MagicMock(ask=lambda: next(answers))
+    )
+    parser = app.parser._actions[1].choices["scan-metas"]
+    (action,) = [a for a in parser._actions if a.dest == "select"]
+
+    (check,) = app._ask_argument(parser, action, "select?", optional=True)
+
+    assert (check.name, check.expression) == ("hreflang", "//link[@hreflang]")
+    assert "Invalid value" in capsys.readouterr().out
+
+
 def test_cli_run_interactive_mode_cancel_command(app, monkeypatch):
     """
     Verifies that the application gracefully handles command cancellation in interactive mode.
@@ -181,3 +205,111 @@ def test_cli_run_interactive_mode_cancel_args(app, monkeypatch):
     app.run()
 
     mock_scan_execute.assert_not_called()
+
+
+def test_cli_run_direct_with_profile(app, monkeypatch, tmp_path):
+    """
+    Verifies that --profile runs the command under the profiler and writes the output file.
+    """
+    profile_path = tmp_path / "run.folded"
+    test_args = [
+        "main.py",
+        "--profile",
+        str(profile_path),
+        "scan-metas",
+        "some/file.xlsx",
+        "URL",
+    ]
+    monkeypatch.setattr(sys, "argv", test_args)
+
+    mock_scan_execute = MagicMock()
+    app.parser._actions[1].choices["scan-metas"].set_defaults(func=mock_scan_execute)
+
+    app.run()
+
+    mock_scan_execute.assert_called_once()
+    assert profile_path.exists()
+
+
+def test_cli_import_does_not_load_heavy_dependencies():
+    """
+    Verifies that importing the CLI does not import the command modules or pandas.
+    """
+    code = (
+        "import sys, cli; "
+        "print(any(m in sys.modules for m in "
+        "('pandas', 'bs4', 'questionary', 'commands.scan_metas')))"
+    )
+    src_dir = Path(__file__).resolve().parent.parent / "src"
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=src_dir,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert result.stdout.strip() == "False"
+
+
+def test_cli_direct_mode_builds_only_the_requested_command(monkeypatch):
+    """
+    Verifies that direct mode only adds the options of the command being run.
+    """
+    app = CliApp()
+    monkeypatch.setattr(sys, "argv", ["main.py", "scan-metas", "some/file.xlsx", "URL"])
+
+    parser = app._setup_parser(load=[app._requested_command(sys.argv[1:])])
+    choices = parser._actions[1].choices
+
+    assert choices["scan-metas"].get_default("func") is not None
+    assert choices["sitemap-check"].get_default("func") is None
+    assert choices["sitemap-check"].description == (
+        "Scan a sitemap and audits against a excel spreadsheet"
+    )
+    assert app.command_specs["sitemap-check"]._instance is None
+
+
+def test_cli_forwards_to_a_running_daemon(app, monkeypatch, capsys):
+    """
+    Verifies that direct mode hands the command line to a running daemon and prints its output.
+    """
+    monkeypatch.setattr(sys, "argv", ["main.py", "scan-metas", "urls.csv", "URL"])
+    daemon = {"address": "http://127.0.0.1:1", "token": "t"}
+    monkeypatch.setattr("core.daemon.find_daemon", lambda: daemon)
+    mock_submit = MagicMock(return_value=(0, "Report created\n"))
+    monkeypatch.setattr("core.daemon.submit_job", mock_submit)
+    monkeypatch.setattr(app, "run_direct_mode", MagicMock())
+
+    app.run()
+
+    mock_submit.assert_called_once_with(
+        daemon, ["scan-metas", "urls.csv", "URL"], os.getcwd()
+    )
+    app.run_direct_mode.assert_not_called()
+    assert capsys.readouterr().out == "Report created\n"
+
+
+@pytest.mark.parametrize(
+    "argv",
+    [
+        ["scan-metas", "urls.csv", "URL", "--no-daemon"],
+        ["scan-metas", "-", "URL"],
+        ["serve"],
+        ["worker", "--procs", "2"],
+    ],
+)
+def test_cli_runs_locally_when_it_should_not_forward(app, monkeypatch, argv):
+    """
+    Verifies that --no-daemon, stdin input, the serve and worker commands always run locally.
+    """
+    monkeypatch.setattr(sys, "argv", ["main.py", *argv])
+    monkeypatch.setattr("core.daemon.find_daemon", lambda: {"address": "x"})
+    mock_submit = MagicMock()
+    monkeypatch.setattr("core.daemon.submit_job", mock_submit)
+    monkeypatch.setattr(app, "run_direct_mode", MagicMock())
+
+    app.run()
+
+    mock_submit.assert_not_called()
+    app.run_direct_mode.assert_called_once()
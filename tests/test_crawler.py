@@ -1,6 +1,13 @@
+import gzip
+import socket
 from unittest.mock import patch, Mock, MagicMock
+import pytest
 from core.crawler import Crawler
-from requests.exceptions import RequestException
+from core.negative_cache import HostUnreachableError, unreachable_hosts
+from core.selectors import SelectorSet, parse_html, parse_selector_check
+from core.session import CrawlSession
+from requests.exceptions import ConnectionError, RequestException
+from urllib3.exceptions import MaxRetryError, NameResolutionError
 
 
 def test_find_meta_by_name_should_return_true_if_tag_exists():
@@ -123,31 +130,55 @@ def test_get_meta_content_by_name_should_return_none_if_content_missing():
         assert result is None
 
 
-def test_execute_scan_calls_find_meta_by_name_for_each_check():
+def test_execute_scan_evaluates_every_check_on_one_parsed_page():
     """
-    Verifies that execute_scan iterates over all checks and calls find_meta_by_name for each.
+    Verifies that execute_scan fetches and parses the page once for all its meta checks.
     """
-    mock_session = Mock()
+    fake_html = '<html><head><meta name="robots" content="index"></head></html>'
     crawler_instance = Crawler(
-        "http://fakeurl.com", session=mock_session, tags_to_check=["robots", "viewport"]
+        "http://fakeurl.com", session=Mock(), tags_to_check=["robots", "viewport"]
     )
 
-    def mock_find_meta(meta_name):
-        if meta_name == "robots":
-            return True
-        if meta_name == "viewport":
-            return False
-
     with patch.object(
-        crawler_instance, "find_meta_by_name", side_effect=mock_find_meta
-    ) as mock_find:
+        crawler_instance, "html_search", return_value=fake_html
+    ) as mock_html_search, patch("core.crawler.parse_html", wraps=parse_html) as mock_parse:
         result = crawler_instance.execute_scan()
 
-        assert result == {"robots": True, "viewport": False}
+    assert result == {"robots": True, "viewport": False}
+    mock_html_search.assert_called_once()
+    mock_parse.assert_called_once()
 
-        assert mock_find.call_count == 2
-        mock_find.assert_any_call("robots")
-        mock_find.assert_any_call("viewport")
+
+def test_execute_scan_runs_compiled_selectors():
+    """
+    Verifies that user-defined selectors return existence, values and counts from the same tree.
+    """
+    fake_html = """<html><head>
+        <link rel="alternate" hreflang="en" href="http://fakeurl.com/en">
+        <link rel="alternate" hreflang="fr" href="http://fakeurl.com/fr">
+        <script type="application/ld+json">{}</script>
+    </head><body><h1> Title </h1></body></html>"""
+    selectors = SelectorSet(
+        [
+            parse_selector_check("hreflang:count=//link[@hreflang]"),
+            parse_selector_check("fr:value=//link[@hreflang='fr']/@href"),
+            parse_selector_check("h1:value=//h1"),
+            parse_selector_check('json_ld=//script[@type="application/ld+json"]'),
+            parse_selector_check("canonical:value=//link[@rel='canonical']/@href"),
+        ]
+    )
+    crawler_instance = Crawler("http://fakeurl.com", Mock(), [], selectors=selectors)
+
+    with patch.object(crawler_instance, "html_search", return_value=fake_html):
+        result = crawler_instance.execute_scan()
+
+    assert result == {
+        "hreflang": 2,
+        "fr": "http://fakeurl.com/fr",
+        "h1": "Title",
+        "json_ld": True,
+        "canonical": None,
+    }
 
 
 def test_fetch_sitemap_urls_parses_simple_sitemap():
@@ -321,7 +352,8 @@ def test_fetch_sitemap_urls_handles_child_sitemap_error(monkeypatch):
 
         assert result_urls == expected_urls
 
-        mock_logger.error.assert_called_with(
+        message, *message_args = mock_logger.error.call_args.args
+        assert message % tuple(message_args) == (
             "Error processing sitemap https://example.com/sitemap_broken.xml: Broken URL"
         )
 
@@ -358,3 +390,85 @@ def test_fetch_sitemap_urls_handles_tags_without_loc():
 
         assert result_urls == expected_urls
         mock_html_search.assert_called_once()
+
+
+def test_duplicate_urls_share_one_fetch_within_a_crawl_session():
+    """
+    Verifies that Crawlers sharing a CrawlSession fetch an equivalent URL only once.
+    """
+    fake_html = '<html><head><meta name="robots" content="index"></head></html>'
+
+    with patch("core.crawler.Crawler.html_search") as mock_html_search:
+        mock_html_search.return_value = fake_html
+        with CrawlSession() as session:
+            first = Crawler("http://fakeurl.com/page", session, ["robots"])
+            second = Crawler("HTTP://FAKEURL.COM/page#top", session, ["robots"])
+
+            assert first.execute_scan() == {"robots": True}
+            assert second.execute_scan() == {"robots": True}
+
+        mock_html_search.assert_called_once()
+
+
+def test_response_headers_are_shared_with_single_flight_followers(local_server):
+    """
+    Verifies that a Crawler served from another Crawler's fetch still sees the response headers.
+    """
+    with CrawlSession() as session:
+        first = Crawler(f"{local_server}/page", session, [])
+        second = Crawler(f"{local_server}/page#top", session, [])
+
+        assert first.fetch_page() and second.fetch_page()
+
+    assert session.single_flight.hits == 1
+    assert second.status_code == 200
+    assert second.response_headers["Content-Type"].startswith("text/html")
+
+
+def test_html_search_short_circuits_unreachable_hosts(monkeypatch):
+    """
+    Verifies that after a DNS failure, other URLs on the same host are failed without a request.
+    """
+    unreachable_hosts.clear()
+    monkeypatch.setattr("core.crawler.time.sleep", lambda _: None)
+
+    dns_error = NameResolutionError("dead.com", None, socket.gaierror("Name not known"))
+    mock_session = Mock()
+    mock_session.get.side_effect = ConnectionError(
+        MaxRetryError(None, "http://dead.com/a", reason=dns_error)
+    )
+
+    first = Crawler("http://dead.com/a", session=mock_session, tags_to_check=[])
+    second = Crawler("http://DEAD.com/b", session=mock_session, tags_to_check=[])
+
+    with pytest.raises(ConnectionError):
+        first.html_search()
+    with pytest.raises(HostUnreachableError):
+        second.html_search()
+
+    assert mock_session.get.call_count == 1
+    assert unreachable_hosts.short_circuited == 1
+    unreachable_hosts.clear()
+
+
+def test_fetch_sitemap_urls_decompresses_gzipped_sitemaps(monkeypatch):
+    """
+    Verifies that sitemaps served as raw .xml.gz files are decompressed before parsing.
+    """
+    monkeypatch.setattr("core.crawler.time.sleep", lambda _: None)
+    sitemap_xml = b"""
+    <urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+      <url><loc>https://example.com/page1</loc></url>
+    </urlset>
+    """
+    mock_response = Mock()
+    mock_response.content = gzip.compress(sitemap_xml)
+    mock_response.text = mock_response.content.decode("latin-1")
+    mock_session = Mock()
+    mock_session.get.return_value = mock_response
+
+    crawler_instance = Crawler(
+        "http://fakeurl.com/sitemap.xml.gz", session=mock_session, tags_to_check=[]
+    )
+
+    assert crawler_instance.fetch_sitemap_urls() == {"https://example.com/page1"}
@@ -0,0 +1,75 @@
+import json
+import os
+import pytest
+from core.daemon import DaemonServer, find_daemon, stop_daemon, submit_job
+
+
+def _echo_job(argv, cwd):
+    return (3 if "fail" in argv else 0), f"ran {' '.join(argv)} in {cwd}\n"
+
+
+@pytest.fixture(params=["tcp", "unix"])
+def daemon(request, tmp_path):
+    """Provides a running DaemonServer (on TCP and on a Unix socket) with an echo job runner."""
+    socket_path = str(tmp_path / "daemon.sock") if request.param == "unix" else None
+    server = DaemonServer(
+        _echo_job, port=0, socket_path=socket_path, state_file=tmp_path / "daemon.json"
+    )
+    server.start()
+    yield server
+    server.stop()
+
+
+def test_find_daemon_and_submit_job(daemon):
+    """
+    Verifies that a client finds the daemon from its state file and gets the job's output back.
+    """
+    found = find_daemon(daemon.state_file)
+
+    assert found["address"] == daemon.address
+    assert found["pid"] == os.getpid()
+    assert submit_job(found, ["scan-metas", "urls.csv", "URL"], "/work") == (
+        0,
+        "ran scan-metas urls.csv URL in /work\n",
+    )
+    assert submit_job(found, ["fail"], "/work")[0] == 3
+    assert daemon.jobs_run == 2
+
+
+def test_state_file_is_private(daemon):
+    """
+    Verifies that the state file holding the token is only readable by its owner.
+    """
+    assert daemon.state_file.stat().st_mode & 0o077 == 0
+
+
+def test_requests_without_the_token_are_refused(daemon):
+    """
+    Verifies that a client with the wrong token can't find or use the daemon.
+    """
+    state = json.loads(daemon.state_file.read_text())
+    state["token"] = "wrong"
+    daemon.state_file.write_text(json.dumps(state))
+
+    assert find_daemon(daemon.state_file) is None
+    with pytest.raises(ConnectionError):
+        submit_job(state, ["scan-metas"], "/work")
+    assert daemon.jobs_run == 0
+
+
+def test_stop_daemon_removes_the_state_file(daemon):
+    """
+    Verifies that /shutdown stops the daemon and that it is no longer found.
+    """
+    stop_daemon(find_daemon(daemon.state_file))
+    daemon.wait()
+
+    assert not daemon.state_file.exists()
+    assert find_daemon(daemon.state_file) is None
+
+
+def test_find_daemon_without_state_file(tmp_path):
+    """
+    Verifies that no daemon is found when none was started.
+    """
+    assert find_daemon(tmp_path / "missing.json") is None
@@ -0,0 +1,60 @@
+import socket
+from core.dns_cache import DnsCache
+
+
+def test_getaddrinfo_is_cached(monkeypatch):
+    """
+    Verifies that repeated lookups are answered from the cache.
+    """
+    calls = []
+
+    def fake_getaddrinfo(*args):
+        calls.append(args)
+        return [("address",)]
+
+    monkeypatch.setattr("core.dns_cache._original_getaddrinfo", fake_getaddrinfo)
+    cache = DnsCache()
+
+    assert cache.getaddrinfo("example.com", 443) == [("address",)]
+    assert cache.getaddrinfo("example.com", 443) == [("address",)]
+
+    assert len(calls) == 1
+    assert cache.hits == 1
+
+
+def test_failed_lookups_are_not_cached(monkeypatch):
+    """
+    Verifies that a failed lookup is retried on the next call.
+    """
+    outcomes = [socket.gaierror("Name not known"), [("address",)]]
+
+    def fake_getaddrinfo(*args):
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    monkeypatch.setattr("core.dns_cache._original_getaddrinfo", fake_getaddrinfo)
+    cache = DnsCache()
+
+    try:
+        cache.getaddrinfo("example.com", 80)
+    except socket.gaierror:
+        pass
+
+    assert cache.getaddrinfo("example.com", 80) == [("address",)]
+
+
+def test_installed_patches_and_restores_socket():
+    """
+    Verifies that installs are reference-counted and restore socket.getaddrinfo.
+    """
+    original = socket.getaddrinfo
+    cache = DnsCache()
+
+    with cache.installed():
+        with cache.installed():
+            assert socket.getaddrinfo == cache.getaddrinfo
+        assert socket.getaddrinfo == cache.getaddrinfo
+
+    assert socket.getaddrinfo is original
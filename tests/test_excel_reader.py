@@ -78,3 +78,88 @@ def test_read_column_is_case_insensitive():
     result_list = ExcelReader.read_column(test_df, "url")
 
     assert result_list == expected_list
+
+
+def _write_workbook(path):
+    pd.DataFrame(
+        {
+            "URL": ["http://site1.com", None, "http://site3.com"],
+            "Meta Name": ["description", None, "title"],
+            "Notes": ["a", None, "c"],
+        }
+    ).to_excel(path, index=False)
+
+
+def test_read_header_returns_column_names(tmp_path):
+    """
+    Verifies that read_header returns the first row without loading the data.
+    """
+    test_file_path = tmp_path / "test_data.xlsx"
+    _write_workbook(test_file_path)
+
+    assert ExcelReader(str(test_file_path)).read_header() == [
+        "URL",
+        "Meta Name",
+        "Notes",
+    ]
+
+
+def test_read_spreadsheet_selects_columns(tmp_path):
+    """
+    Verifies that only the requested columns are read, case-insensitively, skipping blank rows.
+    """
+    test_file_path = tmp_path / "test_data.xlsx"
+    _write_workbook(test_file_path)
+
+    result_df = ExcelReader(str(test_file_path)).read_spreadsheet(columns=["url"])
+
+    expected_df = pd.DataFrame({"URL": ["http://site1.com", "http://site3.com"]})
+    assert_frame_equal(result_df, expected_df)
+
+
+def test_read_spreadsheet_selects_columns_raises_key_error(tmp_path):
+    """
+    Verifies that requesting a missing column raises a KeyError.
+    """
+    test_file_path = tmp_path / "test_data.xlsx"
+    _write_workbook(test_file_path)
+
+    with pytest.raises(KeyError):
+        ExcelReader(str(test_file_path)).read_spreadsheet(columns=["Status"])
+
+
+def test_read_spreadsheet_uses_parquet_cache(tmp_path, monkeypatch):
+    """
+    Verifies that a second read of an unchanged workbook is served from the Parquet cache.
+    """
+    test_file_path = tmp_path / "test_data.xlsx"
+    _write_workbook(test_file_path)
+    reader = ExcelReader(str(test_file_path))
+
+    first_df = reader.read_spreadsheet(columns=["URL", "Meta Name"], use_cache=True)
+
+    def fail_load(*args, **kwargs):
+        raise AssertionError("the workbook should not be opened again")
+
+    monkeypatch.setattr("reporting.excel_reader.load_workbook", fail_load)
+    second_df = reader.read_spreadsheet(columns=["URL", "Meta Name"], use_cache=True)
+
+    assert_frame_equal(first_df, second_df)
+    assert len(list((tmp_path / ".seo-helper-cache").iterdir())) == 1
+
+
+def test_read_spreadsheet_cache_key_changes_with_file(tmp_path):
+    """
+    Verifies that modifying the workbook invalidates its cached copy.
+    """
+    test_file_path = tmp_path / "test_data.xlsx"
+    _write_workbook(test_file_path)
+    reader = ExcelReader(str(test_file_path))
+    first_path = reader._cache_path(["URL"])
+
+    pd.DataFrame({"URL": ["http://other.com"]}).to_excel(test_file_path, index=False)
+
+    assert reader._cache_path(["URL"]) != first_path
+    assert reader.read_spreadsheet(columns=["URL"], use_cache=True)["URL"].tolist() == [
+        "http://other.com"
+    ]
@@ -1,7 +1,7 @@
 import pytest
 import pandas as pd
 from pandas.testing import assert_frame_equal
-from reporting.excel_writer import ExcelWriter
+from reporting.excel_writer import ExcelWriter, StreamingExcelWriter
 
 
 def test_create_spreadsheet_with_results(tmp_path):
@@ -59,3 +59,46 @@ def test_assert_frame_equal_fails_for_different_data(tmp_path):
 
     with pytest.raises(AssertionError):
         assert_frame_equal(result_df, different_df)
+
+
+def test_streaming_writer_splits_sheets_at_row_limit(tmp_path):
+    """
+    Verifies that rows beyond the sheet limit continue on Results_1..N sheets, each
+    with its own header, conditional formats and signature.
+    """
+    openpyxl = pytest.importorskip("openpyxl")
+    output_file = tmp_path / "large.xlsx"
+
+    writer = StreamingExcelWriter(str(output_file), ["URL", "robots"], max_rows=8)
+    writer.write_rows((f"http://site{i}.com", i % 2 == 0) for i in range(12))
+    writer.close()
+
+    workbook = openpyxl.load_workbook(output_file)
+    assert workbook.sheetnames == ["Results_1", "Results_2", "Results_3"]
+
+    sheets = [pd.read_excel(output_file, sheet_name=name) for name in workbook.sheetnames]
+    urls = [url for sheet in sheets for url in sheet["URL"].dropna() if "site" in url]
+    assert urls == [f"http://site{i}.com" for i in range(12)]
+
+    first = workbook["Results_1"]
+    assert first["A1"].value == "URL"
+    assert first["A8"].value.startswith("Generated by SEOHelper")
+    ranges = {str(rule.sqref) for rule in first.conditional_formatting}
+    assert ranges == {"B2:B6"}
+    assert str(next(iter(workbook["Results_3"].conditional_formatting)).sqref) == "B2:B3"
+
+
+def test_streaming_writer_keeps_single_sheet_name(tmp_path):
+    """
+    Verifies that results that fit in one sheet are written to a 'Results' sheet, with blanks for missing values.
+    """
+    output_file = tmp_path / "small.xlsx"
+
+    writer = StreamingExcelWriter(str(output_file), ["URL", "Found Content"])
+    writer.write_row(["http://site1.com", None])
+    writer.write_row(["http://site2.com", float("nan")])
+    writer.close()
+
+    result_df = pd.read_excel(output_file, sheet_name="Results", nrows=2)
+    assert result_df["URL"].tolist() == ["http://site1.com", "http://site2.com"]
+    assert result_df["Found Content"].isna().all()
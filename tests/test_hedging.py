@@ -0,0 +1,79 @@
+import threading
+import time
+from unittest.mock import MagicMock
+from core.hedging import Hedger
+from core.latency import HostLatencyTracker
+
+
+def _tracker_with_p95(host: str, seconds: float) -> HostLatencyTracker:
+    tracker = HostLatencyTracker()
+    for _ in range(50):
+        tracker.record(host, seconds)
+    return tracker
+
+
+def test_hedger_returns_the_faster_duplicate():
+    """
+    Verifies that a stalled request is hedged and the duplicate's response wins.
+    """
+    slow_response, fast_response = MagicMock(), MagicMock()
+    release = threading.Event()
+    calls = []
+
+    def fake_get(url, **kwargs):
+        calls.append(url)
+        if len(calls) == 1:
+            release.wait(timeout=5)
+            return slow_response
+        return fast_response
+
+    session = MagicMock()
+    session.get.side_effect = fake_get
+
+    hedger = Hedger(_tracker_with_p95("a.com", 0.01), budget=1.0)
+    hedger.requests_seen = 10
+
+    result = hedger.get(session, "http://a.com/", "a.com")
+    release.set()
+    hedger.shutdown()
+
+    assert result is fast_response
+    assert hedger.hedges_sent == 1
+    time.sleep(0.05)
+    slow_response.close.assert_called_once()
+
+
+def test_hedger_respects_budget():
+    """
+    Verifies that no duplicate is sent once the hedge budget is spent.
+    """
+    response = MagicMock()
+
+    def fake_get(url, **kwargs):
+        time.sleep(0.05)
+        return response
+
+    session = MagicMock()
+    session.get.side_effect = fake_get
+
+    hedger = Hedger(_tracker_with_p95("a.com", 0.005), budget=0.0)
+
+    result = hedger.get(session, "http://a.com/", "a.com")
+    hedger.shutdown()
+
+    assert result is response
+    assert session.get.call_count == 1
+    assert hedger.hedges_sent == 0
+
+
+def test_hedger_skips_hosts_without_history():
+    """
+    Verifies that hosts without latency history are fetched directly.
+    """
+    session = MagicMock()
+    hedger = Hedger(HostLatencyTracker(), budget=1.0)
+
+    hedger.get(session, "http://new.com/", "new.com", timeout=5)
+    hedger.shutdown()
+
+    session.get.assert_called_once_with("http://new.com/", timeout=5)
@@ -0,0 +1,131 @@
+import gzip
+import io
+import json
+import pandas as pd
+import pytest
+from reporting.input_source import InputSource, detect_format
+
+
+def test_detect_format_by_suffix():
+    """
+    Verifies that formats are detected from the suffix, including compressed files.
+    """
+    assert detect_format("-") == "stdin"
+    assert detect_format("urls.csv") == "csv"
+    assert detect_format("urls.CSV.gz") == "csv"
+    assert detect_format("urls.jsonl.xz") == "jsonl"
+    assert detect_format("urls.parquet") == "parquet"
+    assert detect_format("urls.txt") == "lines"
+    assert detect_format("audit.xlsx") == "xlsx"
+    assert detect_format("audit") is None
+    assert detect_format("archive.xls") is None
+
+
+def test_csv_is_streamed_in_chunks(tmp_path):
+    """
+    Verifies that a CSV file is read in chunks holding only the requested columns.
+    """
+    path = tmp_path / "urls.csv.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write("URL,Notes\n")
+        for i in range(5):
+            f.write(f"http://site{i}.com,note {i}\n")
+        f.write(",missing url\n")
+
+    source = InputSource(str(path), chunk_size=2)
+
+    assert source.read_header() == ["URL", "Notes"]
+    chunks = list(source.iter_chunks(["URL"]))
+    assert [len(chunk) for chunk in chunks] == [2, 2, 2]
+    assert list(chunks[0].columns) == ["URL"]
+    assert chunks[-1]["URL"].tolist() == ["http://site4.com", None]
+
+
+def test_jsonl_selects_columns(tmp_path):
+    """
+    Verifies that JSONL records are reduced to the requested keys.
+    """
+    path = tmp_path / "urls.jsonl"
+    records = [{"url": "http://a.com", "meta": "robots", "extra": 1}, {"url": "http://b.com"}]
+    path.write_text("\n".join(json.dumps(r) for r in records) + "\n")
+
+    source = InputSource(str(path))
+
+    assert source.read_header() == ["url", "meta", "extra"]
+    (chunk,) = source.iter_chunks(["url", "meta"])
+    assert chunk.to_dict("records") == [
+        {"url": "http://a.com", "meta": "robots"},
+        {"url": "http://b.com", "meta": None},
+    ]
+
+
+def test_byte_order_marks_are_not_part_of_the_header(tmp_path, monkeypatch):
+    """
+    Verifies that a UTF-8 BOM (as Excel writes it) doesn't end up in the first column name.
+    """
+    csv_path = tmp_path / "urls.csv"
+    csv_path.write_text("URL,Notes\nhttp://a.com,x\n", encoding="utf-8-sig")
+    jsonl_path = tmp_path / "urls.jsonl.gz"
+    with gzip.open(jsonl_path, "wt", encoding="utf-8-sig") as f:
+        f.write('{"URL": "http://b.com"}\n')
+    monkeypatch.setattr("sys.stdin", io.StringIO("\ufeffURL\nhttp://c.com\n"))
+
+    cases = [(csv_path, "http://a.com"), (jsonl_path, "http://b.com"), ("-", "http://c.com")]
+    for path, url in cases:
+        source = InputSource(str(path))
+        assert source.read_header()[0] == "URL"
+        (chunk,) = source.iter_chunks(["URL"])
+        assert chunk["URL"].tolist() == [url]
+
+
+def test_stdin_url_list(monkeypatch):
+    """
+    Verifies that a piped plain URL list is sniffed as headerless lines.
+    """
+    monkeypatch.setattr("sys.stdin", io.StringIO("http://a.com\n\nhttp://b.com\n"))
+
+    source = InputSource("-")
+
+    assert source.format == "lines"
+    assert source.read_header() is None
+    (chunk,) = source.iter_chunks(["URL"])
+    assert chunk["URL"].tolist() == ["http://a.com", "http://b.com"]
+
+
+def test_stdin_csv_keeps_first_line(monkeypatch):
+    """
+    Verifies that the sniffed header line of piped CSV is not lost.
+    """
+    monkeypatch.setattr("sys.stdin", io.StringIO("URL,Status\nhttp://a.com,200\n"))
+
+    source = InputSource("-")
+
+    assert source.format == "csv"
+    assert source.read_header() == ["URL", "Status"]
+    (chunk,) = source.iter_chunks(["URL"])
+    assert chunk["URL"].tolist() == ["http://a.com"]
+
+
+def test_parquet_is_read_in_batches(tmp_path):
+    """
+    Verifies that Parquet files are read in batches of the requested columns.
+    """
+    path = tmp_path / "urls.parquet"
+    pd.DataFrame({"URL": ["http://a.com", "http://b.com", "http://c.com"], "n": [1, 2, 3]}).to_parquet(path)
+
+    source = InputSource(str(path), chunk_size=2)
+
+    assert source.read_header() == ["URL", "n"]
+    chunks = list(source.iter_chunks(["URL"]))
+    assert [chunk["URL"].tolist() for chunk in chunks] == [
+        ["http://a.com", "http://b.com"],
+        ["http://c.com"],
+    ]
+
+
+def test_missing_file_raises_file_not_found(tmp_path):
+    """
+    Verifies that a missing input raises FileNotFoundError.
+    """
+    with pytest.raises(FileNotFoundError):
+        InputSource(str(tmp_path / "missing.csv"))
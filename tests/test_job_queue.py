@@ -0,0 +1,148 @@
+import threading
+from core.job_queue import MAX_ATTEMPTS, FinishedTask, JobQueue
+
+REPORT = {
+    "name": "scan_metas_results",
+    "columns": ["URL", "robots"],
+    "column_types": {"robots": "boolean"},
+    "output_format": "csv",
+    "output_compression": None,
+}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_queue(tmp_path, clock=None):
+    return JobQueue(tmp_path / "queue.db", clock=clock or FakeClock())
+
+
+def test_submit_and_lease_hand_out_each_task_once(tmp_path):
+    """
+    Verifies that tasks are leased in input order, alternating between jobs, and never twice.
+    """
+    queue = make_queue(tmp_path)
+    first, count = queue.submit("scan-metas", [], "/work", REPORT, ["a", "b"])
+    second, _ = queue.submit("scan-metas", [], "/work", REPORT, ["c"])
+
+    leased = queue.lease("worker-1", 2, lease_seconds=60)
+    more = queue.lease("worker-2", 10, lease_seconds=60)
+
+    assert count == 2
+    assert [(task.job_id, task.payload) for task in leased] == [
+        (first, "a"),
+        (second, "c"),
+    ]
+    assert [task.payload for task in more] == ["b"]
+    assert queue.lease("worker-3", 10, lease_seconds=60) == []
+
+
+def test_expired_leases_are_requeued_and_the_old_owner_loses_them(tmp_path):
+    """
+    Verifies that a crashed worker's tasks go to another worker once its lease expires.
+    """
+    clock = FakeClock()
+    queue = make_queue(tmp_path, clock)
+    queue.submit("scan-metas", [], "/work", REPORT, ["a"])
+    (task,) = queue.lease("crashed", 1, lease_seconds=30)
+
+    clock.now += 10
+    assert queue.heartbeat("crashed", lease_seconds=30) == 1
+    clock.now += 25
+    assert queue.lease("worker-2", 1, lease_seconds=30) == []
+
+    clock.now += 10
+    (retried,) = queue.lease("worker-2", 1, lease_seconds=30)
+
+    assert retried.id == task.id
+    assert not queue.complete(task.id, "crashed", ["a", True])
+    assert queue.complete(task.id, "worker-2", ["a", False])
+    assert list(queue.results(task.job_id)) == [FinishedTask("a", False, ["a", False])]
+
+
+def test_tasks_are_given_up_after_too_many_expired_leases(tmp_path):
+    """
+    Verifies that a task whose leases keep expiring is marked failed, not retried forever.
+    """
+    clock = FakeClock()
+    queue = make_queue(tmp_path, clock)
+    queue.submit("scan-metas", [], "/work", REPORT, ["poison"])
+
+    for _ in range(MAX_ATTEMPTS):
+        assert queue.lease("worker", 1, lease_seconds=1)
+        clock.now += 2
+
+    assert queue.lease("worker", 1, lease_seconds=1) == []
+    (summary,) = queue.summaries()
+    assert (summary.total, summary.done, summary.failed) == (1, 0, 1)
+    assert list(queue.results(summary.job.id)) == [
+        FinishedTask("poison", True, "lease expired too many times")
+    ]
+
+
+def test_reserve_host_spaces_requests_to_a_host(tmp_path):
+    """
+    Verifies that slots for the same host are booked an interval apart, and other hosts are free.
+    """
+    clock = FakeClock()
+    queue = make_queue(tmp_path, clock)
+
+    slots = [queue.reserve_host("a.com", 2.0) for _ in range(3)]
+    other = queue.reserve_host("b.com", 2.0)
+
+    assert slots == [1_000.0, 1_002.0, 1_004.0]
+    assert other == 1_000.0
+
+
+def test_reserve_host_is_shared_between_connections(tmp_path):
+    """
+    Verifies that concurrent workers with their own connections never get the same slot.
+    """
+    slots = []
+    lock = threading.Lock()
+
+    def book():
+        with JobQueue(tmp_path / "queue.db") as queue:
+            for _ in range(20):
+                slot = queue.reserve_host("a.com", 1.0)
+                with lock:
+                    slots.append(slot)
+
+    threads = [threading.Thread(target=book) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    slots.sort()
+    assert all(later - earlier >= 0.999 for earlier, later in zip(slots, slots[1:]))
+
+
+def test_finished_jobs_are_claimed_once_and_rows_kept_in_input_order(tmp_path):
+    """
+    Verifies that a job is claimed for its report only when no task is left, by one worker.
+    """
+    queue = make_queue(tmp_path)
+    job_id, _ = queue.submit("scan-metas", ["urls.csv"], "/work", REPORT, ["a", "b"])
+    first, second = queue.lease("worker", 2, lease_seconds=60)
+
+    queue.complete(second.id, "worker", ["b", False])
+    assert queue.claim_finished_jobs("worker", 60) == []
+    queue.complete(first.id, "worker", ["a", True])
+
+    (job,) = queue.claim_finished_jobs("worker", 60)
+    assert queue.claim_finished_jobs("other", 60) == []
+    assert (job.id, job.argv, job.report) == (job_id, ["urls.csv"], REPORT)
+    assert [task.result for task in queue.results(job_id)] == [
+        ["a", True],
+        ["b", False],
+    ]
+
+    queue.finish_job(job_id, "/work/results/report.csv")
+    assert queue.is_idle()
+    assert queue.job(job_id).report_path == "/work/results/report.csv"
@@ -0,0 +1,45 @@
+from core.latency import (
+    DEFAULT_TIMEOUT,
+    MIN_CONNECT_TIMEOUT,
+    HostLatencyTracker,
+    LatencyHistogram,
+)
+
+
+def test_histogram_percentile_returns_bucket_bound():
+    """
+    Verifies that percentiles land on the bucket holding the requested quantile.
+    """
+    histogram = LatencyHistogram()
+    for _ in range(99):
+        histogram.record(0.1)
+    histogram.record(5.0)
+
+    assert 0.1 <= histogram.percentile(0.5) < 0.13
+    assert histogram.percentile(1.0) >= 5.0
+    assert LatencyHistogram().percentile(0.5) is None
+
+
+def test_timeout_for_unknown_host_uses_default():
+    """
+    Verifies that hosts without enough samples keep the fixed default timeout.
+    """
+    tracker = HostLatencyTracker()
+    tracker.record("example.com", 0.2)
+
+    assert tracker.timeout_for("example.com") == (DEFAULT_TIMEOUT, DEFAULT_TIMEOUT)
+    assert tracker.timeout_for("other.com") == (DEFAULT_TIMEOUT, DEFAULT_TIMEOUT)
+
+
+def test_timeout_for_fast_host_is_tightened():
+    """
+    Verifies that a consistently fast host gets shorter, clamped timeouts.
+    """
+    tracker = HostLatencyTracker()
+    for _ in range(50):
+        tracker.record("fast.com", 0.1)
+
+    connect, read = tracker.timeout_for("fast.com")
+
+    assert connect == MIN_CONNECT_TIMEOUT
+    assert read < DEFAULT_TIMEOUT
@@ -0,0 +1,122 @@
+import json
+import logging
+import logging.handlers
+import threading
+import pytest
+from core import logging_setup
+from core.logging_setup import DuplicateFilter, JsonFormatter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def captured():
+    """Provides a logger whose records pass through a DuplicateFilter into a list."""
+    records = []
+
+    class ListHandler(logging.Handler):
+        def emit(self, record):
+            records.append(record)
+
+    clock = FakeClock()
+    duplicate_filter = DuplicateFilter(burst=2, interval=60, clock=clock)
+    handler = ListHandler()
+    handler.addFilter(duplicate_filter)
+
+    logger = logging.getLogger("tests.logging_setup")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(handler)
+    yield logger, records, duplicate_filter, clock
+    logger.removeHandler(handler)
+
+
+def test_duplicate_filter_suppresses_repeats_per_host(captured):
+    """
+    Verifies that repeats of a message beyond the burst are dropped, per host.
+    """
+    logger, records, _, _ = captured
+
+    for i in range(10):
+        logger.error(
+            "Failed to access URL %s", f"http://a.com/{i}", extra={"host": "a.com"}
+        )
+    logger.error("Failed to access URL %s", "http://b.com/", extra={"host": "b.com"})
+
+    assert [record.getMessage() for record in records] == [
+        "Failed to access URL http://a.com/0",
+        "Failed to access URL http://a.com/1",
+        "Failed to access URL http://b.com/",
+    ]
+
+
+def test_duplicate_filter_summarizes_suppressed_records(captured):
+    """
+    Verifies that the number of dropped records is logged when the window ends and on flush.
+    """
+    logger, records, duplicate_filter, clock = captured
+
+    def log_failure():
+        logger.error("Failed to access URL %s", "http://a.com/", extra={"host": "a.com"})
+
+    for _ in range(3_414):
+        log_failure()
+    clock.now = 61
+    log_failure()
+
+    summary = records[2].getMessage()
+    assert summary.startswith("a.com: 3,412 similar messages suppressed")
+    assert records[3].getMessage() == "Failed to access URL http://a.com/"
+
+    log_failure()
+    log_failure()
+    duplicate_filter.flush()
+
+    assert records[-1].getMessage().startswith("a.com: 1 similar messages suppressed")
+
+
+def test_json_formatter_writes_one_object_per_record():
+    """
+    Verifies that the JSON formatter includes the formatted message, level and host.
+    """
+    record = logging.LogRecord(
+        "core.crawler", logging.ERROR, __file__, 1, "Failed %s", ("x",), None
+    )
+    record.host = "a.com"
+
+    entry = json.loads(JsonFormatter().format(record))
+
+    assert entry["message"] == "Failed x"
+    assert entry["level"] == "ERROR"
+    assert entry["host"] == "a.com"
+
+
+def test_configure_logging_writes_from_the_listener_thread(tmp_path):
+    """
+    Verifies that records logged from worker threads reach app.log and the JSON log.
+    """
+    json_path = tmp_path / "app.jsonl"
+    logging_setup.configure_logging(tmp_path, json_path=str(json_path))
+    try:
+        worker = threading.Thread(
+            target=logging.getLogger("tests.worker").warning,
+            args=("Slow host %s", "a.com"),
+        )
+        worker.start()
+        worker.join()
+    finally:
+        logging_setup.shutdown_logging()
+
+    assert "WARNING - Slow host a.com" in (tmp_path / "app.log").read_text()
+    entries = [json.loads(line) for line in json_path.read_text().splitlines()]
+    assert entries[-1]["message"] == "Slow host a.com"
+    assert not any(
+        isinstance(handler, logging.handlers.QueueHandler)
+        for handler in logging.getLogger().handlers
+    )
@@ -0,0 +1,94 @@
+import requests
+from core.metrics import (
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsRegistry,
+    MetricsServer,
+    TextfileExporter,
+)
+
+
+def _registry():
+    registry = MetricsRegistry()
+    requests_total = registry.register(
+        Counter("test_requests", "Requests.", ["status_class"])
+    )
+    in_flight = registry.register(Gauge("test_in_flight", "In flight."))
+    duration = registry.register(
+        Histogram("test_duration_seconds", "Duration.", ["host"], buckets=(0.1, 1.0))
+    )
+    return registry, requests_total, in_flight, duration
+
+
+def test_render_prometheus_text_format():
+    """
+    Verifies that counters, gauges and histograms render with labels and cumulative buckets.
+    """
+    registry, requests_total, in_flight, duration = _registry()
+    requests_total.inc(status_class="2xx")
+    requests_total.inc(2, status_class="2xx")
+    in_flight.inc()
+    in_flight.inc()
+    in_flight.dec()
+    duration.observe(0.05, host="a.com")
+    duration.observe(0.5, host="a.com")
+
+    text = registry.render()
+
+    assert "# TYPE test_requests_total counter" in text
+    assert 'test_requests_total{status_class="2xx"} 3' in text
+    assert "test_in_flight 1" in text
+    assert 'test_duration_seconds_bucket{host="a.com",le="0.1"} 1' in text
+    assert 'test_duration_seconds_bucket{host="a.com",le="1.0"} 2' in text
+    assert 'test_duration_seconds_bucket{host="a.com",le="+Inf"} 2' in text
+    assert 'test_duration_seconds_count{host="a.com"} 2' in text
+    assert "# EOF" not in text
+
+
+def test_render_openmetrics_format():
+    """
+    Verifies that the OpenMetrics variant names counter families without _total and ends with EOF.
+    """
+    registry, requests_total, _, _ = _registry()
+    requests_total.inc(status_class="5xx")
+
+    text = registry.render(openmetrics=True)
+
+    assert "# TYPE test_requests counter" in text
+    assert 'test_requests_total{status_class="5xx"} 1' in text
+    assert text.endswith("# EOF\n")
+
+
+def test_metrics_server_serves_registry():
+    """
+    Verifies that the HTTP endpoint serves the rendered registry on /metrics only.
+    """
+    registry, requests_total, _, _ = _registry()
+    requests_total.inc(status_class="2xx")
+    server = MetricsServer(0, metrics=registry)
+    server.start()
+    try:
+        res = requests.get(f"http://127.0.0.1:{server.port}/metrics", timeout=5)
+        missing = requests.get(f"http://127.0.0.1:{server.port}/other", timeout=5)
+    finally:
+        server.stop()
+
+    assert res.status_code == 200
+    assert 'test_requests_total{status_class="2xx"} 1' in res.text
+    assert missing.status_code == 404
+
+
+def test_textfile_exporter_writes_final_snapshot(tmp_path):
+    """
+    Verifies that stopping the textfile exporter writes the latest values.
+    """
+    registry, requests_total, _, _ = _registry()
+    path = tmp_path / "seo_helper.prom"
+    exporter = TextfileExporter(str(path), interval=60, metrics=registry)
+    exporter.start()
+    requests_total.inc(status_class="4xx")
+    exporter.stop()
+
+    assert 'test_requests_total{status_class="4xx"} 1' in path.read_text()
+    assert list(tmp_path.iterdir()) == [path]
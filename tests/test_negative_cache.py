@@ -0,0 +1,57 @@
+import socket
+from requests.exceptions import ConnectionError, ReadTimeout, SSLError
+from urllib3.exceptions import MaxRetryError, NameResolutionError, NewConnectionError
+from core import metrics
+from core.negative_cache import HostNegativeCache, classify_host_failure
+
+
+def _wrapped(reason: Exception) -> ConnectionError:
+    """Builds a ConnectionError nested the way requests raises it."""
+    return ConnectionError(MaxRetryError(None, "http://dead.com/", reason=reason))
+
+
+def test_classify_host_failure_detects_dns_errors():
+    """
+    Verifies that name resolution failures are classified as host-level.
+    """
+    reason = NameResolutionError("dead.com", None, socket.gaierror("Name not known"))
+
+    assert classify_host_failure(_wrapped(reason)) == "dns"
+
+
+def test_classify_host_failure_detects_refused_connections():
+    """
+    Verifies that refused connections are classified as host-level.
+    """
+    reason = NewConnectionError(None, "Failed to establish a new connection")
+    reason.__cause__ = ConnectionRefusedError(111, "Connection refused")
+
+    assert classify_host_failure(_wrapped(reason)) == "connection refused"
+
+
+def test_classify_host_failure_ignores_url_level_errors():
+    """
+    Verifies that TLS errors are host-level while timeouts are not.
+    """
+    assert classify_host_failure(SSLError("bad certificate")) == "tls"
+    assert classify_host_failure(ReadTimeout("too slow")) is None
+
+
+def test_negative_cache_expires_entries(monkeypatch):
+    """
+    Verifies that cached hosts are short-circuited until their TTL expires.
+    """
+    now = [100.0]
+    monkeypatch.setattr("core.negative_cache.time.monotonic", lambda: now[0])
+    cache = HostNegativeCache(ttl=10)
+    counted_before = metrics.fetches_short_circuited.value()
+
+    cache.record("dead.com", "dns", "Name not known")
+
+    assert cache.check("dead.com") == "dns failure: Name not known"
+    assert cache.check("alive.com") is None
+
+    now[0] = 111.0
+    assert cache.check("dead.com") is None
+    assert cache.short_circuited == 1
+    assert metrics.fetches_short_circuited.value() == counted_before + 1
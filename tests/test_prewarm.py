@@ -0,0 +1,66 @@
+import socket
+import time
+from core.dns_cache import DnsCache
+from core.negative_cache import unreachable_hosts
+from core.prewarm import prewarm
+from core.session import CrawlSession
+
+
+def test_prewarm_parks_a_connection_that_the_first_request_reuses(local_server):
+    """
+    Verifies that pre-warming opens one connection per host and the crawl reuses it.
+    """
+    urls = [f"{local_server}/a", f"{local_server}/b"]
+
+    with CrawlSession() as session:
+        report = prewarm(session, urls, DnsCache())
+
+        assert report.hosts == 1
+        assert report.connected == 1
+
+        pools = session.get_adapter(urls[0]).poolmanager.pools
+        opened = lambda: sum(
+            pools[key].num_connections for key in pools.keys()
+        )
+        connections_before = opened()
+
+        assert session.get(urls[0]).status_code == 200
+        assert opened() == connections_before == 1
+
+
+def test_prewarm_records_unresolvable_hosts(monkeypatch):
+    """
+    Verifies that hosts failing DNS resolution during pre-warm are negatively cached.
+    """
+    unreachable_hosts.clear()
+
+    def failing_getaddrinfo(*args):
+        raise socket.gaierror("Name not known")
+
+    monkeypatch.setattr("core.dns_cache._original_getaddrinfo", failing_getaddrinfo)
+
+    with CrawlSession() as session:
+        report = prewarm(session, ["https://dead.example/page"], DnsCache())
+
+    assert report.resolved == 0
+    assert unreachable_hosts.check("dead.example") is not None
+    unreachable_hosts.clear()
+
+
+def test_prewarm_gives_up_on_blackholed_hosts_after_the_connect_timeout(monkeypatch):
+    """
+    Verifies that a host that never answers is abandoned after the session's connect timeout.
+    """
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(0)  # Accepted by the kernel, but never answered.
+    port = listener.getsockname()[1]
+
+    with CrawlSession() as session:
+        monkeypatch.setattr(session.latency, "timeout_for", lambda host: (0.2, 0.2))
+        start = time.perf_counter()
+        report = prewarm(session, [f"http://127.0.0.1:{port}/"], DnsCache())
+
+    listener.close()
+    assert report.connected == 0
+    assert time.perf_counter() - start < 5
@@ -0,0 +1,88 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from core.profiling import (
+    CProfileProfiler,
+    SamplingProfiler,
+    classify_builtin,
+    classify_path,
+)
+
+
+def _busy_worker():
+    total = 0
+    for i in range(200_000):
+        total += i
+    return total
+
+
+def test_classify_path_maps_files_to_stages():
+    """
+    Verifies that library and project files are attributed to the right stage.
+    """
+    assert classify_path("/venv/site-packages/bs4/element.py") == "parse"
+    assert classify_path("/venv/site-packages/urllib3/response.py") == "fetch"
+    assert classify_path("/venv/site-packages/pandas/io/excel/_base.py") == "read input"
+    assert classify_path("/venv/site-packages/xlsxwriter/worksheet.py") == "write excel"
+    assert classify_path("/app/src/commands/compare_metas.py") == "compare"
+    assert classify_path("/venv/site-packages/pandas/core/frame.py") is None
+    assert classify_builtin("<built-in method time.sleep>") == "sleep"
+
+
+def test_sampling_profiler_samples_worker_threads(tmp_path):
+    """
+    Verifies that the sampling profiler sees other threads and writes collapsed stacks.
+    """
+    profiler = SamplingProfiler(interval=0.001)
+    profiler.start()
+    worker = threading.Thread(target=lambda: time.sleep(0.2))
+    worker.start()
+    worker.join()
+    profiler.stop()
+
+    output = tmp_path / "profile.folded"
+    profiler.dump(str(output))
+
+    assert profiler.samples > 0
+    assert profiler.stages["sleep"] > 0
+    assert "<lambda>" in output.read_text()
+    assert profiler.summary()[0].startswith("Samples:")
+
+
+def test_cprofile_profiler_merges_thread_profiles(tmp_path):
+    """
+    Verifies that functions run on threads started while profiling are captured.
+    """
+    profiler = CProfileProfiler()
+    profiler.start()
+    worker = threading.Thread(target=_busy_worker)
+    worker.start()
+    worker.join()
+    profiler.stop()
+
+    functions = {name for _, _, name in profiler.stats.stats}
+    output = tmp_path / "profile.pstats"
+    profiler.dump(str(output))
+
+    assert "_busy_worker" in functions
+    assert output.exists()
+
+
+def test_cprofile_profiler_profiles_a_worker_pool(tmp_path):
+    """
+    Verifies that cprofile mode works with several live worker threads, as in a crawl.
+    """
+    profiler = CProfileProfiler()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        executor.submit(time.sleep, 0)  # Threads already running when profiling starts.
+        profiler.start()
+        results = list(executor.map(lambda _: _busy_worker(), range(8)))
+    profiler.stop()
+
+    output = tmp_path / "profile.pstats"
+    profiler.dump(str(output))
+
+    assert len(results) == 8
+    assert "_busy_worker" in {name for _, _, name in profiler.stats.stats}
+    assert output.exists()
+    assert profiler.summary()
@@ -0,0 +1,131 @@
+import io
+import json
+import pytest
+from core.progress import ProgressReporter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_jsonl_mode_is_throttled_and_reports_rate():
+    """
+    Verifies that jsonl progress lines are emitted at most once per interval, plus a final line.
+    """
+    clock = FakeClock()
+    stream = io.StringIO()
+    reporter = ProgressReporter(
+        total=100, mode="jsonl", interval=1.0, stream=stream, clock=clock
+    )
+
+    for _ in range(10):
+        clock.now += 0.125
+        reporter.advance("task", "a.com")
+    reporter.close()
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [line["event"] for line in lines] == ["progress", "done"]
+    assert lines[0]["done"] == 8
+    assert lines[0]["rate_per_s"] == pytest.approx(8.0)
+    assert lines[0]["eta_s"] == pytest.approx(11.5)
+    assert lines[-1]["hosts"] == {"a.com": 10}
+
+
+def test_tick_emits_progress_while_no_task_completes():
+    """
+    Verifies that jsonl progress lines keep coming every interval during a stall.
+    """
+    clock = FakeClock()
+    stream = io.StringIO()
+    reporter = ProgressReporter(
+        total=10, mode="jsonl", interval=1.0, stream=stream, clock=clock
+    )
+
+    for _ in range(6):
+        clock.now += 0.5
+        reporter.tick()
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [line["elapsed_s"] for line in lines] == [1.0, 2.0, 3.0]
+    assert all(line["done"] == 0 for line in lines)
+
+
+def test_rate_uses_rolling_window():
+    """
+    Verifies that throughput only counts completions inside the rolling window.
+    """
+    clock = FakeClock()
+    reporter = ProgressReporter(total=10, mode="none", window=5.0, clock=clock)
+
+    for _ in range(5):
+        reporter.advance()
+    clock.now += 10
+    reporter.advance()
+
+    assert reporter.rate() == pytest.approx(1 / 5)
+    assert reporter.eta() == pytest.approx(4 / (1 / 5))
+
+
+def test_host_counts_use_the_rolling_window_and_show_in_the_bar(monkeypatch):
+    """
+    Verifies that per-host counts drop old completions and are shown in the bar's postfix.
+    """
+    monkeypatch.setattr("core.progress.tqdm", lambda **kwargs: _FakeBar())
+    clock = FakeClock()
+    reporter = ProgressReporter(
+        total=10, mode="bar", interval=1.0, window=5.0, clock=clock
+    )
+
+    for _ in range(3):
+        reporter.advance("task", "old.com")
+    clock.now += 10
+    reporter.advance("task", "new.com")
+
+    assert reporter.snapshot()["hosts"] == {"new.com": 1}
+    assert reporter._pbar.postfix == "0.2 URLs/s | new.com 1"
+
+
+def test_description_is_only_computed_on_refresh(monkeypatch):
+    """
+    Verifies that the bar's description is built on refresh, not on every completion.
+    """
+    monkeypatch.setattr("core.progress.tqdm", lambda **kwargs: _FakeBar())
+    clock = FakeClock()
+    calls = []
+    reporter = ProgressReporter(
+        total=50,
+        mode="bar",
+        desc_provider=lambda task: calls.append(task) or task,
+        interval=1.0,
+        clock=clock,
+    )
+
+    for i in range(50):
+        clock.now += 0.05
+        reporter.advance(f"task-{i}")
+    reporter.close()
+
+    assert len(calls) == 2
+    assert reporter._pbar.n == 50
+
+
+class _FakeBar:
+    def __init__(self):
+        self.n = 0
+        self.postfix = ""
+
+    def set_description(self, desc, refresh=True):
+        pass
+
+    def set_postfix_str(self, s, refresh=True):
+        self.postfix = s
+
+    def update(self, n):
+        self.n += n
+
+    def close(self):
+        pass
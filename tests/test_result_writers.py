@@ -0,0 +1,133 @@
+import gzip
+import json
+import pandas as pd
+import pytest
+from core import metrics
+from reporting.result_writers import SectionedResultWriter, create_result_writer
+
+COLUMNS = ["URL", "Meta Name", "Match?"]
+TYPES = {"Meta Name": "category", "Match?": "boolean"}
+RESULTS = [
+    {"URL": "http://a.com", "Meta Name": "robots", "Match?": True},
+    {"URL": "http://b.com", "Meta Name": "robots", "Match?": "Error"},
+    {"URL": "http://c.com", "Meta Name": "title"},
+]
+
+
+def _write(output_format, tmp_path, compression=None):
+    writer = create_result_writer(
+        output_format, str(tmp_path / "report"), COLUMNS, TYPES, compression
+    )
+    with writer:
+        for result in RESULTS:
+            writer.write(result)
+    return writer
+
+
+def test_csv_writer_streams_typed_rows_with_compression(tmp_path):
+    """
+    Verifies that CSV reports are gzipped, with empty cells for values that are not booleans.
+    """
+    writer = _write("csv", tmp_path, "gzip")
+
+    assert writer.path.endswith("report.csv.gz")
+    with gzip.open(writer.path, "rt") as f:
+        lines = f.read().splitlines()
+    assert lines == [
+        "URL,Meta Name,Match?",
+        "http://a.com,robots,True",
+        "http://b.com,robots,",
+        "http://c.com,title,",
+    ]
+
+
+def test_jsonl_writer_uses_nulls(tmp_path):
+    """
+    Verifies that JSONL reports hold one object per result with nullable booleans.
+    """
+    writer = _write("jsonl", tmp_path)
+
+    with open(writer.path) as f:
+        records = [json.loads(line) for line in f]
+    assert records[0] == {"URL": "http://a.com", "Meta Name": "robots", "Match?": True}
+    assert records[1]["Match?"] is None
+
+
+def test_parquet_writer_keeps_column_types(tmp_path):
+    """
+    Verifies that Parquet reports load back with nullable booleans and categorical meta names.
+    """
+    writer = _write("parquet", tmp_path, "zstd")
+
+    df = pd.read_parquet(writer.path)
+    assert isinstance(df["Meta Name"].dtype, pd.CategoricalDtype)
+    assert df["Match?"].tolist() == [True, None, None]
+    assert df["URL"].tolist() == ["http://a.com", "http://b.com", "http://c.com"]
+
+
+def test_tuple_rows_are_written_in_column_order(tmp_path):
+    """
+    Verifies that tuple results are written positionally, with missing trailing values left empty.
+    """
+    writer = create_result_writer("csv", str(tmp_path / "report"), COLUMNS, TYPES)
+    with writer:
+        writer.write(("http://a.com", "robots", False))
+        writer.write(("http://b.com", "title"))
+
+    with open(writer.path) as f:
+        lines = f.read().splitlines()
+    assert lines[1:] == ["http://a.com,robots,False", "http://b.com,title,"]
+
+
+def test_rows_are_counted_as_they_are_written(tmp_path):
+    """
+    Verifies that the results_written metric grows with each row, not when the report is closed.
+    """
+    before = metrics.results_written.value()
+    with create_result_writer("jsonl", str(tmp_path / "report"), COLUMNS) as writer:
+        writer.write(RESULTS[0])
+        writer.write(RESULTS[1])
+        assert metrics.results_written.value() == before + 2
+
+    assert metrics.results_written.value() == before + 2
+
+
+def test_no_file_without_results(tmp_path):
+    """
+    Verifies that no report file is created when nothing was written.
+    """
+    writer = create_result_writer("csv", str(tmp_path / "report"), COLUMNS)
+    writer.close()
+
+    assert writer.rows_written == 0
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_unsupported_compression_raises(tmp_path):
+    """
+    Verifies that compressions a format can't use are rejected up front.
+    """
+    with pytest.raises(ValueError):
+        create_result_writer("xlsx", str(tmp_path / "report"), COLUMNS, compression="gzip")
+    with pytest.raises(ValueError):
+        create_result_writer("parquet", str(tmp_path / "report"), COLUMNS, compression="xz")
+
+
+def test_sectioned_writer_groups_rows_by_section(tmp_path):
+    """
+    Verifies that rows arriving in any order are written one section after the other.
+    """
+    writer = create_result_writer("csv", str(tmp_path / "report"), COLUMNS, TYPES)
+    with SectionedResultWriter(writer, ["first", "second"]) as sections:
+        sections.write("second", ("http://a.com", "title", True))
+        sections.write("first", ("http://b.com", "robots", False))
+        sections.write("second", ("http://c.com", "title", None))
+
+    assert sections.rows_written == 3
+    with open(writer.path) as f:
+        lines = f.read().splitlines()
+    assert lines[1:] == [
+        "http://b.com,robots,False",
+        "http://a.com,title,True",
+        "http://c.com,title,",
+    ]
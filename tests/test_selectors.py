@@ -0,0 +1,114 @@
+import argparse
+import pytest
+from core.selectors import (
+    COUNT,
+    CSS,
+    VALUE,
+    XPATH,
+    SelectorCheck,
+    SelectorSet,
+    meta_selector,
+    parse_html,
+    parse_selector_check,
+)
+
+PAGE = parse_html(
+    """<html><head>
+    <meta name="robots" content="noindex">
+    <link rel="canonical" href="http://example.com/a">
+    <link rel="alternate" hreflang="en" href="http://example.com/en">
+    <link rel="alternate" hreflang="fr" href="http://example.com/fr">
+    </head><body><h1>  Hello </h1></body></html>"""
+)
+
+
+def test_parse_selector_check_detects_language_and_result():
+    """
+    Verifies that XPath is recognised by its leading slash and CSS attributes are split off.
+    """
+    assert parse_selector_check("links:count=//link") == SelectorCheck(
+        "links", "//link", XPATH, COUNT
+    )
+    assert parse_selector_check(
+        "canonical:value=link[rel=canonical]::attr(href)"
+    ) == SelectorCheck("canonical", "link[rel=canonical]", CSS, VALUE, "href")
+    assert parse_selector_check("h1=xpath:descendant::h1").language == XPATH
+
+
+@pytest.mark.parametrize("spec", ["no-expression", "name:average=//a"])
+def test_parse_selector_check_rejects_malformed_specs(spec):
+    """
+    Verifies that a malformed spec or an unknown result type is an argparse error.
+    """
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_selector_check(spec)
+
+
+def test_xpath_checks_return_existence_value_and_count():
+    """
+    Verifies that one compiled set evaluates every result type on the same tree.
+    """
+    selectors = SelectorSet(
+        [
+            parse_selector_check("h1=//h1"),
+            parse_selector_check("title=//title"),
+            parse_selector_check("heading:value=//h1"),
+            parse_selector_check("canonical:value=//link[@rel='canonical']/@href"),
+            parse_selector_check("hreflang:count=//link[@hreflang]"),
+            parse_selector_check("links:count=xpath:count(//link)"),
+        ]
+    )
+
+    assert selectors.evaluate(PAGE) == {
+        "h1": True,
+        "title": False,
+        "heading": "Hello",
+        "canonical": "http://example.com/a",
+        "hreflang": 2,
+        "links": 3,
+    }
+    assert selectors.column_types()["hreflang"] == "int"
+
+
+def test_selector_set_rejects_invalid_and_duplicate_checks():
+    """
+    Verifies that compile errors and name clashes are reported before any page is fetched.
+    """
+    with pytest.raises(ValueError, match="invalid XPath"):
+        SelectorSet([parse_selector_check("bad=//link[")])
+    with pytest.raises(ValueError, match="Two checks are named 'robots'"):
+        SelectorSet([meta_selector("robots").check, parse_selector_check("robots=//h1")])
+
+
+def test_meta_selector_reads_the_content_attribute():
+    """
+    Verifies that the meta checks are compiled once and read the tag's content.
+    """
+    assert meta_selector("robots") is meta_selector("robots")
+    assert meta_selector("robots", VALUE).evaluate(PAGE) == "noindex"
+    assert meta_selector("viewport", VALUE).evaluate(PAGE) is None
+
+
+def test_css_checks_are_translated_to_xpath():
+    """
+    Verifies that CSS selectors, with ::attr(), run on the same tree.
+    """
+    selectors = SelectorSet(
+        [
+            parse_selector_check("fr:value=link[hreflang=fr]::attr(href)"),
+            parse_selector_check("alternates:count=link[rel=alternate]"),
+        ]
+    )
+
+    assert selectors.evaluate(PAGE) == {"fr": "http://example.com/fr", "alternates": 2}
+
+
+def test_parse_html_tolerates_empty_and_declared_encoding_pages():
+    """
+    Verifies that empty pages and str pages with an XML declaration still parse.
+    """
+    assert SelectorSet([parse_selector_check("h1=//h1")]).evaluate(parse_html("")) == {
+        "h1": False
+    }
+    declared = '<?xml version="1.0" encoding="utf-8"?><html><body><h1>x</h1></body></html>'
+    assert meta_selector("robots").evaluate(parse_html(declared)) is False
@@ -0,0 +1,48 @@
+import argparse
+import pytest
+from core.sharding import parse_shard, select_shard, shard_of, with_input_row
+
+
+def test_parse_shard():
+    """
+    Verifies that K/N specs are parsed and invalid ones rejected.
+    """
+    assert parse_shard("2/8") == (2, 8)
+    for spec in ["0/4", "5/4", "1", "a/b", "1/0"]:
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_shard(spec)
+
+
+def test_shard_of_groups_urls_by_host():
+    """
+    Verifies that every URL of a host (in any spelling) lands in the same shard.
+    """
+    shard = shard_of("https://Example.com/a", 8)
+
+    assert shard_of("https://example.com:443/b?x=1", 8) == shard
+    assert 1 <= shard <= 8
+
+
+def test_select_shard_partitions_the_tasks_with_input_positions():
+    """
+    Verifies that the N shards together hold every task exactly once, with its input position.
+    """
+    urls = [f"http://host{i}.example/page" for i in range(40)]
+
+    selected = [
+        item for shard in range(1, 5) for item in select_shard(urls, (shard, 4), str)
+    ]
+
+    assert sorted(selected) == list(enumerate(urls))
+    assert len({shard_of(url, 4) for url in urls}) > 1
+
+
+def test_with_input_row():
+    """
+    Verifies that the input position is prepended to tuples and added to dicts.
+    """
+    assert with_input_row(3, ("http://a.com", True)) == (3, "http://a.com", True)
+    assert with_input_row(3, {"URL": "http://a.com"}) == {
+        "Input Row": 3,
+        "URL": "http://a.com",
+    }
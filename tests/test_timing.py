@@ -0,0 +1,86 @@
+from core.crawler import Crawler
+from core.negative_cache import unreachable_hosts
+from core.session import CrawlSession
+from core.timing import FetchTimings, TimingCollector
+
+
+def test_fetch_records_connection_setup_then_reuse(local_server, monkeypatch):
+    """
+    Verifies that the first fetch records a new connection and the second reuses it.
+    """
+    monkeypatch.setattr("core.crawler.time.sleep", lambda _: None)
+
+    with CrawlSession() as session:
+        first = Crawler(f"{local_server}/a", session, ["robots"])
+        second = Crawler(f"{local_server}/b", session, ["robots"])
+
+        assert first.execute_scan() == {"robots": True}
+        assert second.execute_scan() == {"robots": True}
+
+    assert first.timings.reused is False
+    assert first.timings.connect > 0
+    assert first.timings.bytes > 0
+    assert first.timings.parse > 0
+    assert second.timings.reused is True
+    assert second.timings.connect == 0
+    assert second.timings.ttfb > 0
+
+
+def test_as_columns_reports_milliseconds():
+    """
+    Verifies that timings are exported as rounded millisecond columns.
+    """
+    timings = FetchTimings(host="a.com", ttfb=0.1234, bytes=512, reused=True)
+
+    columns = timings.as_columns()
+
+    assert columns["TTFB (ms)"] == 123.4
+    assert columns["Bytes"] == 512
+    assert columns["Connection Reused?"] is True
+
+
+def test_timing_collector_summarizes_per_host():
+    """
+    Verifies that the collector prints one summary line per host.
+    """
+    collector = TimingCollector()
+    collector.add(FetchTimings(host="a.com", ttfb=0.05))
+    collector.add(FetchTimings(host="a.com", ttfb=0.07))
+    collector.add(FetchTimings(host="b.com", ttfb=0.2))
+
+    lines = collector.summary_lines()
+
+    assert len(lines) == 3
+    assert lines[1].startswith("a.com")
+    assert TimingCollector().summary_lines() == []
+
+
+def test_record_timings_counts_every_fetch_once_with_its_extraction(
+    local_server, monkeypatch
+):
+    """
+    Verifies that page checks, status probes and failed fetches all reach the summary, once.
+    """
+    monkeypatch.setattr("core.crawler.time.sleep", lambda _: None)
+    unreachable_hosts.clear()
+    host = local_server.split("//")[1]
+
+    with CrawlSession() as session:
+        scanned = Crawler(f"{local_server}/a", session, ["robots"])
+        scanned.execute_scan()
+        scanned.record_timings()
+        scanned.record_timings()
+        probed = Crawler(f"{local_server}/b", session, [])
+        probed.check_status()
+        probed.record_timings()
+        failed = Crawler("http://127.0.0.1:1/", session, ["robots"])
+        failed.execute_scan()
+        failed.record_timings()
+
+        per_phase = session.timing_stats._histograms
+
+    assert scanned.timings.extract > 0
+    assert per_phase[host]["total"].total == 2
+    assert per_phase[host]["extract"].percentile(1.0) > 0
+    assert per_phase["127.0.0.1:1"]["total"].total == 1
+    unreachable_hosts.clear()
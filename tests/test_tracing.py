@@ -0,0 +1,64 @@
+import json
+import threading
+from core.crawler import Crawler
+from core.session import CrawlSession
+from core.tracing import Tracer, tracer
+
+
+def test_disabled_tracer_records_nothing():
+    """
+    Verifies that spans are no-ops while the tracer is disabled.
+    """
+    local_tracer = Tracer()
+
+    with local_tracer.span("fetch", url="https://a.com"):
+        pass
+
+    assert local_tracer.events == []
+
+
+def test_spans_record_complete_events_with_thread_names(tmp_path):
+    """
+    Verifies that spans from several threads become X events with thread_name metadata.
+    """
+    local_tracer = Tracer()
+    local_tracer.start()
+
+    def work():
+        with local_tracer.span("fetch"):
+            pass
+
+    worker = threading.Thread(target=work, name="worker-1")
+    worker.start()
+    worker.join()
+    with local_tracer.span("result"):
+        pass
+    local_tracer.stop()
+
+    path = tmp_path / "trace.json"
+    local_tracer.dump(str(path))
+    events = json.loads(path.read_text())["traceEvents"]
+
+    spans = [e for e in events if e["ph"] == "X"]
+    names = {e["args"]["name"] for e in events if e["ph"] == "M"}
+    assert [e["name"] for e in spans] == ["fetch", "result"]
+    assert spans[0]["tid"] != spans[1]["tid"]
+    assert all(e["dur"] >= 0 for e in spans)
+    assert "worker-1" in names
+
+
+def test_crawler_records_fetch_wait_parse_and_compare(local_server, monkeypatch):
+    """
+    Verifies that a traced scan records the fetch, rate-limit wait, parse and compare stages.
+    """
+    monkeypatch.setattr("core.crawler.time.sleep", lambda _: None)
+
+    tracer.start()
+    try:
+        with CrawlSession() as session:
+            Crawler(f"{local_server}/a", session, ["robots"]).execute_scan()
+    finally:
+        tracer.stop()
+
+    stages = [e["name"] for e in tracer.events if e["ph"] == "X"]
+    assert stages == ["fetch", "wait-for-rate-limit", "parse", "compare"]